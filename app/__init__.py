@@ -20,8 +20,20 @@ def create_app(config_name=None):
     config_class = get_config() if config_name is None else config_name
     app.config.from_object(config_class)
     
+    # Size the connection pool before the engine is created
+    configure_database_pool(app)
+    
     # Initialize extensions
     init_extensions(app)
+    register_read_replicas(app)
+    register_pool_monitoring(app)
+    register_query_profiler(app)
+    register_cache_tiers(app)
+    register_statement_timeouts(app)
+    
+    # Register response compression first so it runs after all other
+    # after_request handlers
+    register_response_compression(app)
     
     # Initialize Flask-Migrate
     migrate = Migrate(app, db)
@@ -48,6 +60,9 @@ def create_app(config_name=None):
     # Initialize monitoring and tracing
     initialize_monitoring_tracing(app)
     
+    # Initialize background workers
+    register_background_workers(app)
+    
     # Register shutdown handlers
     register_shutdown_handlers(app)
     
@@ -91,6 +106,48 @@ def register_error_handlers(app):
     register_all_handlers(app)
 
 
+def configure_database_pool(app):
+    """Derive engine pool options from worker and thread counts."""
+    from app.utils.db_pool import configure_engine_options
+    configure_engine_options(app)
+
+
+def register_read_replicas(app):
+    """Route read-only endpoints and analytics reads to replicas."""
+    from app.utils.db_routing import read_replicas
+    read_replicas.init_app(app)
+
+
+def register_pool_monitoring(app):
+    """Record connection pool checkout latency, waiters and connection ages."""
+    from app.utils.db_pool import instrument_pool
+    instrument_pool(app)
+
+
+def register_query_profiler(app):
+    """Aggregate SQL fingerprints per endpoint and flag N+1 patterns."""
+    from app.utils.query_profiler import query_profiler
+    query_profiler.init_app(app)
+
+
+def register_cache_tiers(app):
+    """Put a per-worker L1 cache in front of the shared cache backend."""
+    from app.utils.caching import tiered_cache
+    tiered_cache.init_app(app)
+
+
+def register_statement_timeouts(app):
+    """Enforce per-statement database timeouts by endpoint class."""
+    from app.utils.database_timeout import statement_timeouts
+    statement_timeouts.init_app(app)
+
+
+def register_response_compression(app):
+    """Register fast JSON encoding and response compression."""
+    from app.utils.compression import configure_response_compression
+    configure_response_compression(app)
+
+
 def register_security_headers(app):
     """Register security headers."""
     from app.utils.security_headers import configure_security_headers
@@ -172,6 +229,44 @@ def initialize_monitoring_tracing(app):
     app.logger.info('Monitoring services initialized and ready')
 
 
+def register_background_workers(app):
+    """Initialize background workers that run outside the request path."""
+    from app.services.outbox_service import outbox_service
+    
+    outbox_service.init_app(app)
+    # In debug mode the worker starts lazily on the first enqueued event
+    if app.config.get('OUTBOX_WORKER_ENABLED') and not (app.debug or app.testing):
+        outbox_service.start()
+        app.logger.info('Outbox worker started')
+    
+    from app.services.optimizer_facade import optimizer_facade
+    from app.services.plan_catalogue import plan_catalogue
+    
+    optimizer_facade.init_app(app)
+    plan_catalogue.init_app(app)
+    if app.config.get('PLAN_CATALOGUE_WARM_ON_STARTUP') and not (app.debug or app.testing):
+        plan_catalogue.warm_in_background()
+    
+    if app.config.get('PLAN_STORAGE_MIGRATE_ON_STARTUP') and not (app.debug or app.testing):
+        from app.services.plan_storage import compress_stored_plans_in_background
+        compress_stored_plans_in_background(app)
+    
+    from app.services.cache_warmer import cache_warmer
+    
+    cache_warmer.init_app(app)
+    # The first run happens immediately, so every deploy starts with warm caches
+    if app.config.get('CACHE_WARM_ON_STARTUP') and not (app.debug or app.testing):
+        cache_warmer.start()
+        app.logger.info('Cache warmer started')
+    
+    from app.services.usage_rollup import usage_rollup
+    
+    usage_rollup.init_app(app)
+    if app.config.get('USAGE_ROLLUP_ENABLED') and not (app.debug or app.testing):
+        usage_rollup.start()
+        app.logger.info('Usage rollup worker started')
+
+
 def register_commands(app):
     """Register CLI commands."""
     @app.cli.command()
@@ -207,6 +302,49 @@ def register_commands(app):
         db.session.commit()
         
         print(f'Admin user {email} created successfully!')
+    
+    @app.cli.command()
+    def process_outbox():
+        """Deliver pending outbox events once."""
+        from app.services.outbox_service import outbox_service
+        processed = outbox_service.process_pending()
+        print(f'Processed {processed} outbox events')
+    
+    @app.cli.command()
+    def warm_caches():
+        """Run every cache warm-up task once."""
+        from app.services.cache_warmer import cache_warmer
+        results = cache_warmer.run_once(force=True)
+        print(f'Ran {len(results)} cache warm-up tasks')
+    
+    @app.cli.command()
+    def compress_meal_plans():
+        """Move JSON-stored saved plans to compressed storage."""
+        from app.services.plan_storage import compress_stored_plans
+        results = compress_stored_plans()
+        print(f'Compressed {sum(results.values())} meal plans')
+    
+    @app.cli.command()
+    def rollup_usage():
+        """Roll up usage logs into daily totals and apply raw log retention."""
+        from app.services.usage_rollup import usage_rollup
+        results = usage_rollup.run_once()
+        print(f"Wrote {results['rollup_rows']} rollup rows, "
+              f"removed {results['raw_rows_removed']} raw usage logs")
+    
+    @app.cli.command()
+    def refill_credits():
+        """Refill free tier credits for the current billing period."""
+        from app.services.credit_refill import refill_free_credits, billing_period
+        refilled = refill_free_credits()
+        print(f'Refilled credits for {refilled} free tier users ({billing_period()})')
+    
+    @app.cli.command()
+    def warm_plan_catalogue():
+        """Pre-generate meal plans for all catalogue presets."""
+        from app.services.plan_catalogue import plan_catalogue
+        generated = plan_catalogue.warm()
+        print(f'Generated {generated} catalogue plans')
 
 
 def register_shutdown_handlers(app):
@@ -6,9 +6,10 @@ from flask_limiter.util import get_remote_address
 from flask_mail import Mail
 from flask_caching import Cache
 from flask_wtf.csrf import CSRFProtect
+from app.utils.db_routing import RoutingSession
 
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 limiter = Limiter(
     key_func=get_remote_address,
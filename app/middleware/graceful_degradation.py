@@ -209,6 +209,11 @@ class GracefulDegradationMiddleware:
         self.feature_flags['fallback_meal_generation'] = True
         logger.warning("Enabled fallback meal generation due to AI service issues")
     
+    def _disable_fallback_meal_generation(self):
+        """Return to the primary meal generation engine"""
+        self.feature_flags['fallback_meal_generation'] = False
+        logger.info("Disabled fallback meal generation, primary engine recovered")
+    
     def is_feature_enabled(self, feature: str) -> bool:
         """Check if a feature is enabled"""
         return self.feature_flags.get(feature, True)
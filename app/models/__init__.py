@@ -1,20 +1,26 @@
 """Database models package."""
 from app.extensions import db
 from .user import User
-from .payment import Payment, PricingPlan
+from .payment import Payment, PricingPlan, CreditRefillBatch
 from .meal_plan import SavedMealPlan, SharedMealPlan, MealPlanShare
-from .usage import UsageLog, APIKey
+from .usage import UsageLog, UsageDailyRollup, APIKey
 from .error_log import ErrorLog
+from .outbox import OutboxEvent
+from .stats import StatCounter
 
 __all__ = [
     'db',
     'User',
     'Payment',
     'PricingPlan',
+    'CreditRefillBatch',
     'SavedMealPlan',
     'SharedMealPlan',
     'MealPlanShare',
     'UsageLog',
+    'UsageDailyRollup',
     'APIKey',
-    'ErrorLog'
+    'ErrorLog',
+    'OutboxEvent',
+    'StatCounter'
 ]
\ No newline at end of file
@@ -26,6 +26,13 @@ class ErrorLog(db.Model):
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     
+    __table_args__ = (
+        # Recent errors by severity (monitoring, critical error panels)
+        db.Index('idx_error_logs_severity_created', 'severity', 'created_at'),
+        # Admin error list filtered by resolved and severity, newest first
+        db.Index('idx_error_logs_resolved_severity_created', 'resolved', 'severity', 'created_at'),
+    )
+    
     # Relationships
     user = db.relationship('User', foreign_keys=[user_id], backref='error_logs')
     resolver = db.relationship('User', foreign_keys=[resolved_by])
@@ -1,10 +1,53 @@
 """Meal plan related models."""
 from datetime import datetime, timezone
 import secrets
+from flask import current_app, has_app_context
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import deferred
 from app.extensions import db
+from app.utils.compression import pack_plan, unpack_plan
 
+# Deferred group holding both storage forms of a plan; undefer_group it for detail views
+PLAN_DATA_GROUP = 'plan_data'
 
-class SavedMealPlan(db.Model):
+
+def plan_storage_format():
+    """'compressed' stores new plans as packed binary, 'json' as plain JSON."""
+    if has_app_context():
+        return current_app.config.get('PLAN_STORAGE_FORMAT', 'compressed')
+    return 'compressed'
+
+
+class PlanStorageMixin:
+    """Transparent ``meal_plan_data`` over JSON or compressed binary storage."""
+    
+    @hybrid_property
+    def meal_plan_data(self):
+        blob = self.meal_plan_blob
+        if blob is None:
+            return self._meal_plan_json
+        cached = self.__dict__.get('_unpacked_plan')
+        if cached is None or cached[0] is not blob:
+            cached = (blob, unpack_plan(blob))
+            self.__dict__['_unpacked_plan'] = cached
+        return cached[1]
+    
+    @meal_plan_data.setter
+    def meal_plan_data(self, value):
+        self.__dict__.pop('_unpacked_plan', None)
+        if plan_storage_format() == 'compressed' and value is not None:
+            self.meal_plan_blob = pack_plan(value)
+            self._meal_plan_json = None
+        else:
+            self._meal_plan_json = value
+            self.meal_plan_blob = None
+    
+    @meal_plan_data.expression
+    def meal_plan_data(cls):
+        return cls._meal_plan_json
+
+
+class SavedMealPlan(PlanStorageMixin, db.Model):
     """Saved meal plans for users."""
     __tablename__ = 'saved_meal_plans'
     
@@ -13,7 +56,10 @@ class SavedMealPlan(db.Model):
     
     # Plan details
     name = db.Column(db.String(200), nullable=False)
-    meal_plan_data = db.Column(db.JSON, nullable=False)  # Complete meal plan JSON
+    # Complete meal plan, as JSON or packed binary (see PlanStorageMixin); deferred
+    # so listings don't load it
+    _meal_plan_json = deferred(db.Column('meal_plan_data', db.JSON(none_as_null=True)), group=PLAN_DATA_GROUP)
+    meal_plan_blob = deferred(db.Column(db.LargeBinary), group=PLAN_DATA_GROUP)
     
     # Metadata
     total_calories = db.Column(db.Integer)
@@ -54,8 +100,9 @@ class SharedMealPlan(db.Model):
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
     
-    # Plan data
-    meal_plan_data = db.Column(db.JSON, nullable=False)
+    # Plan data (deferred, see SavedMealPlan.meal_plan_data); stays plain JSON
+    # because the share routes write it through the legacy models.SharedMealPlan
+    meal_plan_data = deferred(db.Column(db.JSON, nullable=False))
     total_calories = db.Column(db.Integer)
     diet_type = db.Column(db.String(50))
     
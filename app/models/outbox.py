@@ -0,0 +1,34 @@
+"""Transactional outbox model for deferred side effects."""
+from datetime import datetime, timezone
+from app.extensions import db
+
+
+class OutboxEvent(db.Model):
+    """Side effect recorded in the same transaction as the write that caused it."""
+    __tablename__ = 'outbox_events'
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # Event details
+    event_type = db.Column(db.String(100), nullable=False)  # meal_plan_generated, etc.
+    payload = db.Column(db.JSON)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+
+    # Delivery state
+    status = db.Column(db.String(20), default='pending', nullable=False)  # pending, processing, done, failed
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text)
+    available_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    locked_at = db.Column(db.DateTime)
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    processed_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('idx_outbox_events_status_available', 'status', 'available_at'),
+    )
+
+    def __repr__(self):
+        """String representation."""
+        return f'<OutboxEvent {self.id} - {self.event_type} ({self.status})>'
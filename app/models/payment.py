@@ -70,4 +70,24 @@ class PricingPlan(db.Model):
     
     def __repr__(self):
         """String representation."""
-        return f'<PricingPlan {self.name} - ${self.price_monthly}/mo>'
\ No newline at end of file
+        return f'<PricingPlan {self.name} - ${self.price_monthly}/mo>'
+
+
+class CreditRefillBatch(db.Model):
+    """Audit row for one id range of a monthly free-tier credit refill."""
+    __tablename__ = 'credit_refill_batches'
+    __table_args__ = (
+        db.UniqueConstraint('period', 'first_user_id', name='uq_credit_refill_period_range'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    period = db.Column(db.String(7), nullable=False)  # YYYY-MM
+    first_user_id = db.Column(db.Integer, nullable=False)
+    last_user_id = db.Column(db.Integer, nullable=False)
+    users_refilled = db.Column(db.Integer, default=0, nullable=False)
+    credits = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    def __repr__(self):
+        """String representation."""
+        return f'<CreditRefillBatch {self.period} {self.first_user_id}-{self.last_user_id}>'
@@ -0,0 +1,61 @@
+"""Tracked counters for admin statistics."""
+from datetime import datetime, timezone
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from app.extensions import db
+from .meal_plan import SavedMealPlan
+
+
+class StatCounter(db.Model):
+    """Running total maintained as the counted things are created or removed."""
+    __tablename__ = 'stat_counters'
+
+    name = db.Column(db.String(50), primary_key=True)  # saved_plans, videos
+    value = db.Column(db.BigInteger, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
+                           onupdate=lambda: datetime.now(timezone.utc))
+
+    @classmethod
+    def increment(cls, name, amount=1, connection=None):
+        """Atomically add ``amount``; runs in the caller's transaction.
+        
+        PostgreSQL and SQLite upsert in one statement, so concurrent first
+        increments of a missing counter can't collide on its primary key.
+        """
+        connection = connection or db.session.connection()
+        table = cls.__table__
+        now = datetime.now(timezone.utc)
+        dialects = {'postgresql': postgresql, 'sqlite': sqlite}
+        dialect = dialects.get(connection.dialect.name)
+        if dialect is not None:
+            statement = dialect.insert(table).values(name=name, value=amount, updated_at=now)
+            connection.execute(statement.on_conflict_do_update(
+                index_elements=[table.c.name],
+                set_={'value': table.c.value + amount, 'updated_at': now}
+            ))
+            return
+        
+        result = connection.execute(
+            table.update().where(table.c.name == name).values(value=table.c.value + amount, updated_at=now)
+        )
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(name=name, value=amount, updated_at=now))
+
+    @classmethod
+    def values(cls):
+        """All counters as a dict."""
+        return dict(db.session.query(cls.name, cls.value).all())
+
+    def __repr__(self):
+        """String representation."""
+        return f'<StatCounter {self.name}={self.value}>'
+
+
+@event.listens_for(SavedMealPlan, 'after_insert')
+def _count_saved_plan(mapper, connection, target):
+    StatCounter.increment('saved_plans', 1, connection)
+
+
+@event.listens_for(SavedMealPlan, 'after_delete')
+def _uncount_saved_plan(mapper, connection, target):
+    StatCounter.increment('saved_plans', -1, connection)
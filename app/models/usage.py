@@ -31,17 +31,60 @@ class UsageLog(db.Model):
     credits_used = db.Column(db.Integer, default=0)
     credits_remaining = db.Column(db.Integer)
     
+    # Monitoring events: slow operation name or security event type, and severity
+    operation = db.Column(db.String(100))
+    severity = db.Column(db.String(20))
+    
     # Metadata
     usage_metadata = db.Column(db.JSON)
     
     # Timestamp
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), index=True)
     
+    __table_args__ = (
+        # Rate limiting, streaks and per-user counts
+        db.Index('idx_usage_logs_user_action_created', 'user_id', 'action', 'created_at'),
+        # Admin monitoring of one action over a time window
+        db.Index('idx_usage_logs_action_created', 'action', 'created_at'),
+        # Slow-request lookups; only timed requests are indexed
+        db.Index('idx_usage_logs_action_response_time', 'action', 'response_time_ms',
+                 sqlite_where=db.text('response_time_ms IS NOT NULL'),
+                 postgresql_where=db.text('response_time_ms IS NOT NULL')),
+        # Monitoring pages: per-operation aggregates and drill-down within a window
+        db.Index('idx_usage_logs_action_operation_created', 'action', 'operation', 'created_at'),
+    )
+    
     def __repr__(self):
         """String representation."""
         return f'<UsageLog {self.id} - {self.action}>'
 
 
+class UsageDailyRollup(db.Model):
+    """Daily usage_logs totals per action and subscription tier."""
+    __tablename__ = 'usage_daily_rollups'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    action = db.Column(db.String(100), nullable=False)
+    tier = db.Column(db.String(20), nullable=False)  # user's tier when the day was rolled up
+    
+    # Totals
+    event_count = db.Column(db.Integer, default=0, nullable=False)
+    unique_users = db.Column(db.Integer, default=0, nullable=False)
+    credits_used = db.Column(db.Integer, default=0, nullable=False)
+    
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
+                           onupdate=lambda: datetime.now(timezone.utc))
+    
+    __table_args__ = (
+        db.UniqueConstraint('day', 'action', 'tier', name='uq_usage_daily_rollups_day_action_tier'),
+    )
+    
+    def __repr__(self):
+        """String representation."""
+        return f'<UsageDailyRollup {self.day} {self.action}/{self.tier}: {self.event_count}>'
+
+
 class APIKey(db.Model):
     """API keys for premium users."""
     __tablename__ = 'api_keys'
@@ -13,10 +13,13 @@ import meal_optimizer as mo
 import asyncio
 from app.extensions import db, csrf
 from app.models.user import User
-from app.models.usage import UsageLog
+from app.models.usage import UsageLog, UsageDailyRollup
 from app.models.payment import Payment
 from app.models.error_log import ErrorLog
+from app.models.stats import StatCounter
 from app.services.monitoring_service import monitoring_service
+from app.utils.caching import get_or_compute
+from app.utils.db_routing import read_replica
 from sqlalchemy import func, case
 
 # Create admin blueprint
@@ -34,6 +37,11 @@ if not ADMIN_USERNAME or not ADMIN_PASSWORD:
     ADMIN_USERNAME = 'disabled'
     ADMIN_PASSWORD = 'disabled'
 
+# Aggregate snapshots refreshed by the cache warmer; pages only read them
+DASHBOARD_STATS_KEY = 'admin:dashboard_stats'
+ANALYTICS_SNAPSHOT_KEY = 'admin:analytics_snapshot'
+DASHBOARD_STATS_TIMEOUT = 900
+
 # Initialize services
 video_service = VideoService(upload_enabled=True)
 optimizer = mo.MealPlanOptimizer(skip_validation=True)
@@ -77,6 +85,12 @@ def logout():
 @admin_required
 def dashboard():
     """Admin dashboard"""
+    stats = get_or_compute(DASHBOARD_STATS_KEY, compute_dashboard_stats, timeout=DASHBOARD_STATS_TIMEOUT)
+    return render_template('admin/dashboard.html', stats=stats)
+
+@read_replica()
+def compute_dashboard_stats():
+    """Aggregate totals shown on the admin dashboard"""
     # Get statistics with optimized queries
     user_stats = db.session.query(
         func.count(User.id).label('total'),
@@ -90,16 +104,18 @@ def dashboard():
     # Get usage log count
     usage_count = db.session.query(func.count(UsageLog.id)).scalar() or 0
     
-    stats = {
+    # Plans and videos are counted as they are created
+    counters = StatCounter.values()
+    
+    return {
         'total_users': user_stats.total or 0,
         'active_users': user_stats.active or 0,
-        'total_plans': len(os.listdir('saved_plans')) if os.path.exists('saved_plans') else 0,
-        'total_videos': len(os.listdir('videos')) if os.path.exists('videos') else 0,
+        'total_plans': counters.get('saved_plans', 0),
+        'total_videos': counters.get('videos', 0),
         'revenue': revenue_formatted,
-        'usage_logs': usage_count
+        'usage_logs': usage_count,
+        'computed_at': datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')
     }
-    
-    return render_template('admin/dashboard.html', stats=stats)
 
 @admin_bp.route('/video-generator')
 @admin_required
@@ -159,6 +175,9 @@ def generate_content_video():
                 )
             )
             
+            StatCounter.increment('videos', results['summary']['successful_generations'])
+            db.session.commit()
+            
             return jsonify({
                 'success': True,
                 'results': results,
@@ -238,6 +257,8 @@ def batch_generate():
                     })
                     
                     total_generated += video_results['summary']['successful_generations']
+                    StatCounter.increment('videos', video_results['summary']['successful_generations'])
+                    db.session.commit()
                     
                 finally:
                     loop.close()
@@ -273,9 +294,14 @@ def batch_generate():
 @admin_required
 def analytics():
     """Analytics dashboard"""
-    from datetime import datetime, timedelta
-    from sqlalchemy import func
+    analytics_data = get_or_compute(ANALYTICS_SNAPSHOT_KEY, compute_analytics_snapshot,
+                                    timeout=DASHBOARD_STATS_TIMEOUT)
     
+    return render_template('admin/analytics.html', analytics=analytics_data)
+
+@read_replica()
+def compute_analytics_snapshot():
+    """Registration, subscription, usage and revenue aggregates for the analytics page"""
     # Get user registration trends (last 30 days)
     thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
     user_registrations = db.session.query(
@@ -289,26 +315,23 @@ def analytics():
         func.count(User.id).label('count')
     ).group_by(User.subscription_tier).all()
     
-    # Get usage statistics
+    # Get usage statistics from the daily rollups (raw logs are only kept for the retention window)
     usage_stats = db.session.query(
-        func.date(UsageLog.created_at).label('date'),
-        func.count(UsageLog.id).label('count')
-    ).filter(UsageLog.created_at >= thirty_days_ago).group_by(func.date(UsageLog.created_at)).all()
+        UsageDailyRollup.day.label('date'),
+        func.sum(UsageDailyRollup.event_count).label('count')
+    ).filter(UsageDailyRollup.day >= thirty_days_ago.date()).group_by(
+        UsageDailyRollup.day
+    ).order_by(UsageDailyRollup.day).all()
     
     # Get revenue statistics (compatible with SQLite and PostgreSQL)
-    try:
-        # Try PostgreSQL date_trunc function first
-        revenue_stats = db.session.query(
-            func.date_trunc('month', Payment.created_at).label('month'),
-            func.sum(Payment.amount).label('revenue')
-        ).group_by(func.date_trunc('month', Payment.created_at)).all()
-    except Exception as e:
-        # Fallback to SQLite strftime function
-        current_app.logger.warning(f"PostgreSQL date_trunc failed, using SQLite fallback: {str(e)}")
-        revenue_stats = db.session.query(
-            func.strftime('%Y-%m', Payment.created_at).label('month'),
-            func.sum(Payment.amount).label('revenue')
-        ).group_by(func.strftime('%Y-%m', Payment.created_at)).all()
+    if db.engine.dialect.name == 'postgresql':
+        month = func.date_trunc('month', Payment.created_at)
+    else:
+        month = func.strftime('%Y-%m', Payment.created_at)
+    revenue_stats = db.session.query(
+        month.label('month'),
+        func.sum(Payment.amount).label('revenue')
+    ).group_by(month).all()
     
     # Calculate total revenue and MRR
     total_revenue = db.session.query(func.sum(Payment.amount)).scalar() or 0
@@ -325,8 +348,12 @@ def analytics():
     current_mrr = (active_pro * 9.99) + (active_premium * 19.99)
     
     # Calculate totals
-    total_users = User.query.count()
-    paying_users = User.query.filter(User.subscription_tier.in_(['pro', 'premium'])).count()
+    totals = db.session.query(
+        func.count(User.id).label('total'),
+        func.sum(case((User.subscription_tier.in_(['pro', 'premium']), 1), else_=0)).label('paying')
+    ).first()
+    total_users = totals.total or 0
+    paying_users = totals.paying or 0
     conversion_rate = (paying_users / total_users * 100) if total_users > 0 else 0
     
     analytics_data = {
@@ -342,10 +369,11 @@ def analytics():
             'current_mrr': round(current_mrr, 2),
             'active_pro': active_pro,
             'active_premium': active_premium
-        }
+        },
+        'computed_at': datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')
     }
     
-    return render_template('admin/analytics.html', analytics=analytics_data)
+    return analytics_data
 
 @admin_bp.route('/refill-credits', methods=['POST'])
 @admin_required
@@ -512,41 +540,45 @@ def performance_monitoring():
     """Performance monitoring dashboard"""
     # Get slow operations from last 24 hours
     twenty_four_hours_ago = datetime.now(timezone.utc) - timedelta(hours=24)
+    page = request.args.get('page', 1, type=int)
+    operation = request.args.get('operation')
     
-    slow_ops = UsageLog.query.filter(
+    window = UsageLog.query.filter(
         UsageLog.action == 'slow_operation',
         UsageLog.created_at >= twenty_four_hours_ago
-    ).order_by(UsageLog.created_at.desc()).all()
+    )
     
     # Group by operation type
-    operation_stats = {}
-    for op in slow_ops:
-        metadata = op.metadata or {}
-        operation_name = metadata.get('operation', 'unknown')
-        duration = metadata.get('duration_ms', 0)
-        
-        if operation_name not in operation_stats:
-            operation_stats[operation_name] = {
-                'count': 0,
-                'total_duration': 0,
-                'max_duration': 0,
-                'min_duration': float('inf')
-            }
-        
-        stats = operation_stats[operation_name]
-        stats['count'] += 1
-        stats['total_duration'] += duration
-        stats['max_duration'] = max(stats['max_duration'], duration)
-        stats['min_duration'] = min(stats['min_duration'], duration)
-    
-    # Calculate averages
-    for stats in operation_stats.values():
-        stats['avg_duration'] = stats['total_duration'] / stats['count'] if stats['count'] > 0 else 0
-        if stats['min_duration'] == float('inf'):
-            stats['min_duration'] = 0
+    operation_rows = window.with_entities(
+        func.coalesce(UsageLog.operation, 'unknown').label('operation'),
+        func.count(UsageLog.id).label('count'),
+        func.coalesce(func.sum(UsageLog.response_time_ms), 0).label('total_duration'),
+        func.coalesce(func.avg(UsageLog.response_time_ms), 0).label('avg_duration'),
+        func.coalesce(func.max(UsageLog.response_time_ms), 0).label('max_duration'),
+        func.coalesce(func.min(UsageLog.response_time_ms), 0).label('min_duration')
+    ).group_by(func.coalesce(UsageLog.operation, 'unknown')).all()
+    
+    operation_stats = {
+        row.operation: {
+            'count': row.count,
+            'total_duration': row.total_duration,
+            'avg_duration': float(row.avg_duration),
+            'max_duration': row.max_duration,
+            'min_duration': row.min_duration
+        } for row in operation_rows
+    }
+    
+    # Raw rows for drill-down, one page at a time
+    if operation:
+        window = window.filter(UsageLog.operation == operation)
+    slow_ops_paginated = window.order_by(UsageLog.created_at.desc()).paginate(
+        page=page, per_page=50, error_out=False
+    )
     
     return render_template('admin/performance.html',
-                         slow_operations=slow_ops,
+                         slow_operations=slow_ops_paginated.items,
+                         pagination=slow_ops_paginated,
+                         current_operation=operation,
                          operation_stats=operation_stats)
 
 @admin_bp.route('/monitoring/security')
@@ -555,34 +587,63 @@ def security_monitoring():
     """Security monitoring dashboard"""
     # Get security events from last 7 days
     seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
+    page = request.args.get('page', 1, type=int)
+    event_type = request.args.get('event_type')
+    severity = request.args.get('severity')
     
-    security_events = UsageLog.query.filter(
+    window = UsageLog.query.filter(
         UsageLog.action == 'security_event',
         UsageLog.created_at >= seven_days_ago
-    ).order_by(UsageLog.created_at.desc()).all()
+    )
+    event_type_col = func.coalesce(UsageLog.operation, 'unknown')
+    severity_col = func.coalesce(UsageLog.severity, 'unknown')
     
     # Group by event type and severity
-    event_stats = {}
-    for event in security_events:
-        metadata = event.metadata or {}
-        event_type = metadata.get('event_type', 'unknown')
-        severity = metadata.get('severity', 'unknown')
-        
-        key = f"{event_type}_{severity}"
-        if key not in event_stats:
-            event_stats[key] = {
-                'event_type': event_type,
-                'severity': severity,
-                'count': 0,
-                'recent_events': []
-            }
-        
-        event_stats[key]['count'] += 1
-        if len(event_stats[key]['recent_events']) < 5:
+    event_counts = window.with_entities(
+        event_type_col.label('event_type'),
+        severity_col.label('severity'),
+        func.count(UsageLog.id).label('count')
+    ).group_by(event_type_col, severity_col).all()
+    
+    event_stats = {
+        f"{row.event_type}_{row.severity}": {
+            'event_type': row.event_type,
+            'severity': row.severity,
+            'count': row.count,
+            'recent_events': []
+        } for row in event_counts
+    }
+    
+    # Five most recent events per group, ranked in SQL
+    ranked = window.with_entities(
+        UsageLog.id.label('id'),
+        func.row_number().over(
+            partition_by=(event_type_col, severity_col),
+            order_by=UsageLog.created_at.desc()
+        ).label('position')
+    ).subquery()
+    recent_events = UsageLog.query.join(ranked, ranked.c.id == UsageLog.id).filter(
+        ranked.c.position <= 5
+    ).order_by(UsageLog.created_at.desc()).all()
+    for event in recent_events:
+        key = f"{event.operation or 'unknown'}_{event.severity or 'unknown'}"
+        if key in event_stats:
             event_stats[key]['recent_events'].append(event)
     
+    # Raw rows for drill-down, one page at a time
+    if event_type:
+        window = window.filter(UsageLog.operation == event_type)
+    if severity:
+        window = window.filter(UsageLog.severity == severity)
+    security_events_paginated = window.order_by(UsageLog.created_at.desc()).paginate(
+        page=page, per_page=50, error_out=False
+    )
+    
     return render_template('admin/security.html',
-                         security_events=security_events,
+                         security_events=security_events_paginated.items,
+                         pagination=security_events_paginated,
+                         current_event_type=event_type,
+                         current_severity=severity,
                          event_stats=event_stats)
 
 @admin_bp.route('/api/monitoring/health')
@@ -9,6 +9,7 @@ from flask_login import current_user
 from app.extensions import db
 from app.models import UsageLog
 from app.services.monitoring_service import get_monitoring_service
+from app.utils.caching import cached_route
 from sqlalchemy import func, desc
 from collections import defaultdict
 
@@ -84,6 +85,7 @@ def track_events():
 
 
 @analytics_bp.route('/dashboard')
+@cached_route(timeout=60)
 def analytics_dashboard():
     """Get analytics dashboard data"""
     try:
@@ -5,25 +5,34 @@ import time
 import tempfile
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from flask import Blueprint, request, jsonify, send_file, current_app
+from flask import Blueprint, request, jsonify, send_file, current_app, g
 from flask_login import login_required, current_user
 from sqlalchemy import text
+from sqlalchemy.orm import undefer_group
 from app.models import User, UsageLog, SavedMealPlan
+from app.models.meal_plan import PLAN_DATA_GROUP
 # Import from root directory
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-import meal_optimizer
 from app.services.pdf_generator import PDFGenerator
 from app.services.video_generator import VideoGenerator
 from app.extensions import db, csrf
 from app.utils.decorators import check_credits_or_premium
 from app.utils.validators import sanitize_input, validate_diet_type
-from app.services.email_service import email_service
+from app.utils.compression import json_response
+from app.utils.caching import (
+    cache_user_data, cached_route, invalidate_user_cache, invalidate_plan_cache, plan_tag
+)
+from app.services.outbox_service import outbox_service
+from app.services.optimizer_facade import optimizer_facade
 from app.services.monitoring_service import monitoring_service, monitor_errors, monitor_performance
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
+# Usage actions that feed the cached dashboard stats
+USER_STATS_ACTIONS = {'meal_generation', 'pdf_export'}
+
 # Input validation helpers
 def validate_calories(calories):
     """Validate calorie input"""
@@ -658,53 +667,16 @@ def generate_meal_plan():
         if meal_structure == 'standard':
             meals_per_day = 3
         
-        # Initialize optimizer (using the global meal_optimizer module)
-        optimizer = meal_optimizer.MealPlanOptimizer(skip_validation=True)
-        
-        # Generate meal plan for each day
-        all_days = []
-        total_calories = 0
-        
-        for day_num in range(1, days + 1):
-            day_meals, metrics = optimizer.generate_single_day_plan({
-                'diet': diet_type,
-                'calories': calories,
-                'pattern': meal_structure,
-                'restrictions': restrictions,
-                'cuisines': ['all'],
-                'cooking_methods': ['all'],
-                'measurement_system': 'US',
-                'allow_substitutions': True,
-                'timestamp': datetime.now().isoformat()
-            })
-            
-            # Convert day_meals dict to list of meal dictionaries
-            meals_list = list(day_meals.values())
-            day_calories = sum(meal.get('calories', 0) for meal in meals_list)
-            total_calories += day_calories
-            
-            all_days.append({
-                'day': day_num,
-                'meals': meals_list,
-                'total_calories': day_calories,
-                'macros': {
-                    'protein': sum(meal.get('macros', {}).get('protein', 0) for meal in meals_list),
-                    'carbs': sum(meal.get('macros', {}).get('carbs', 0) for meal in meals_list),
-                    'fat': sum(meal.get('macros', {}).get('fat', 0) for meal in meals_list)
-                }
-            })
-        
-        # Create meal plan structure
-        meal_plan = {
-            'days': all_days,
-            'total_calories': total_calories,
-            'diet_type': diet_type,
-            'summary': {
-                'total_days': days,
-                'total_meals': sum(len(day['meals']) for day in all_days),
-                'average_daily_calories': total_calories / days if days > 0 else 0
-            }
-        }
+        # Most accurate engine that fits the latency budget, cheaper ones otherwise
+        meal_plan = optimizer_facade.generate(
+            target_calories=calories,
+            diet_type=diet_type,
+            meals_per_day=meals_per_day,
+            days=days,
+            restrictions=restrictions,
+            cuisine_preference=cuisine,
+            meal_structure=meal_structure
+        )
         
         # Fix portions to be realistic and kitchen-friendly
         realistic_plan = fix_meal_plan_portions(meal_plan, measurement_system)
@@ -712,44 +684,37 @@ def generate_meal_plan():
         # Format for frontend
         formatted_plan = format_meal_plan_for_frontend(realistic_plan)
         
-        # Deduct credits if not premium
-        if not current_user.is_premium():
-            current_user.use_credits(1)
-            db.session.commit()
-        
-        # Log usage
-        log_usage('meal_generation', {
+        # Log usage and queue side effects in a single commit; the credit
+        # was reserved by check_credits_or_premium
+        usage_log = log_usage('meal_generation', {
             'calories': calories,
             'diet_type': diet_type,
             'days': days,
             'meal_structure': meal_structure
-        })
-        
-        # Check if this is user's first meal plan and send celebration email
-        user_plans_count = UsageLog.query.filter_by(
-            user_id=current_user.id,
-            action='meal_generation'
-        ).count()
-        
-        if user_plans_count == 1:  # This is their first meal plan
-            meal_plan_info = {
-                'days': days,
-                'calories': calories,
-                'diet_type': diet_type
-            }
-            email_service.send_first_meal_plan_celebration(
-                current_user.email, 
-                current_user.full_name, 
-                meal_plan_info
-            )
+        }, commit=False)
+        usage_log.credits_used = g.credits_reserved
+        usage_log.credits_remaining = current_user.credits_balance
+        db.session.flush()
+        
+        # Emails and analytics are delivered by the outbox worker after commit
+        outbox_service.enqueue('meal_plan_generated', {
+            'usage_log_id': usage_log.id,
+            'calories': calories,
+            'diet_type': diet_type,
+            'days': days
+        }, user_id=current_user.id)
+        db.session.commit()
+        outbox_service.notify()
+        invalidate_user_cache(current_user.id)
         
-        return jsonify({
+        return json_response({
             'success': True,
             'meal_plan': formatted_plan,
             'credits_remaining': current_user.credits_balance
         })
         
     except Exception as e:
+        db.session.rollback()
         import traceback
         error_details = traceback.format_exc()
         current_app.logger.error(f"Error generating meal plan: {str(e)}")
@@ -827,6 +792,7 @@ def save_meal_plan():
         
         db.session.add(saved_plan)
         db.session.commit()
+        invalidate_user_cache(current_user.id)
         
         # Log usage
         try:
@@ -849,27 +815,33 @@ def save_meal_plan():
         })
         return jsonify({'error': 'Failed to save meal plan'}), 500
 
+@cache_user_data()
+def get_saved_plan_summaries():
+    """Saved plan list for the current user, cached until a plan changes"""
+    plans = db.session.query(
+        SavedMealPlan.id, SavedMealPlan.name, SavedMealPlan.created_at,
+        SavedMealPlan.total_calories, SavedMealPlan.diet_type, SavedMealPlan.days
+    ).filter_by(
+        user_id=current_user.id
+    ).order_by(SavedMealPlan.created_at.desc()).all()
+    
+    return [{
+        'id': plan.id,
+        'name': plan.name,
+        'created_at': plan.created_at.isoformat(),
+        'total_calories': plan.total_calories,
+        'diet_type': plan.diet_type,
+        'days': plan.days
+    } for plan in plans]
+
 @api_bp.route('/load-meal-plans', methods=['GET'])
 @login_required
 def load_meal_plans():
     """Load user's saved meal plans."""
     try:
-        plans = SavedMealPlan.query.filter_by(
-            user_id=current_user.id
-        ).order_by(SavedMealPlan.created_at.desc()).all()
-        
-        plans_data = [{
-            'id': plan.id,
-            'name': plan.name,
-            'created_at': plan.created_at.isoformat(),
-            'total_calories': plan.total_calories,
-            'diet_type': plan.diet_type,
-            'days': plan.days
-        } for plan in plans]
-        
         return jsonify({
             'success': True,
-            'meal_plans': plans_data
+            'meal_plans': get_saved_plan_summaries()
         })
         
     except Exception as e:
@@ -878,10 +850,13 @@ def load_meal_plans():
 
 @api_bp.route('/load-meal-plan/<int:plan_id>', methods=['GET'])
 @login_required
+@cached_route(timeout=300, tags=lambda plan_id: [plan_tag(plan_id)])
 def load_meal_plan(plan_id):
     """Load specific meal plan."""
     try:
-        plan = SavedMealPlan.query.filter_by(
+        plan = SavedMealPlan.query.options(
+            undefer_group(PLAN_DATA_GROUP)
+        ).filter_by(
             id=plan_id,
             user_id=current_user.id
         ).first()
@@ -889,7 +864,7 @@ def load_meal_plan(plan_id):
         if not plan:
             return jsonify({'error': 'Meal plan not found'}), 404
         
-        return jsonify({
+        return json_response({
             'success': True,
             'meal_plan': plan.meal_plan_data,
             'name': plan.name
@@ -927,6 +902,8 @@ def delete_meal_plan(plan_id):
         
         db.session.delete(plan)
         db.session.commit()
+        invalidate_user_cache(current_user.id)
+        invalidate_plan_cache(plan_id)
         
         # Log usage
         log_usage('meal_plan_deleted', {'plan_id': plan_id})
@@ -1246,19 +1223,30 @@ def generate_grocery_list_text(grocery_list):
     
     return text
 
-def log_usage(action, metadata=None):
-    """Log user action."""
+def log_usage(action, metadata=None, commit=True):
+    """Log user action.
+    
+    With commit=False the log is only added to the session so it is persisted
+    by the caller's commit together with the write it describes.
+    """
+    usage_log = UsageLog(
+        user_id=current_user.id,
+        action=action,
+        usage_metadata=metadata or {},
+        ip_address=request.remote_addr,
+        user_agent=request.headers.get('User-Agent'),
+        endpoint=request.endpoint,
+        method=request.method
+    )
+    db.session.add(usage_log)
+    if not commit:
+        return usage_log
+    
     try:
-        usage_log = UsageLog(
-            user_id=current_user.id,
-            action=action,
-            metadata=metadata or {},
-            ip_address=request.remote_addr,
-            user_agent=request.headers.get('User-Agent'),
-            endpoint=request.endpoint,
-            method=request.method
-        )
-        db.session.add(usage_log)
         db.session.commit()
+        if action in USER_STATS_ACTIONS:
+            invalidate_user_cache(current_user.id)
     except Exception as e:
-        current_app.logger.error(f"Failed to log usage: {str(e)}")
\ No newline at end of file
+        db.session.rollback()
+        current_app.logger.error(f"Failed to log usage: {str(e)}")
+    return usage_log
@@ -1,17 +1,24 @@
 """Main application routes."""
-from flask import Blueprint, render_template, request, jsonify, session, redirect, url_for, flash, current_app
+from flask import Blueprint, render_template, request, jsonify, session, redirect, url_for, flash, current_app, g
 from flask_login import login_required, current_user
 from app.models import SavedMealPlan, UsageLog
+from app.models.meal_plan import PLAN_DATA_GROUP
 from app.utils.database_timeout import db_ops, with_database_timeout
 from app.services.enhanced_meal_optimizer import EnhancedMealOptimizer
 from app.services.pdf_generator import PDFGenerator
 from app.services.video_generator import VideoGenerator
 from app.extensions import db, limiter
 from app.utils.decorators import check_credits_or_premium
-from datetime import datetime, timedelta
+from app.services.plan_catalogue import plan_catalogue, generate_plan
+from app.utils.caching import invalidate_user_cache, get_or_compute, tagged_key, user_tag
+from sqlalchemy import func
+from sqlalchemy.orm import undefer_group
+from datetime import datetime, date, timedelta
 
 main_bp = Blueprint('main', __name__)
 
+USER_STATS_TIMEOUT = 24 * 3600  # invalidated through the user's cache tag on writes
+
 @main_bp.route('/health')
 def health_check():
     """Health check endpoint for Railway."""
@@ -23,24 +30,19 @@ def health_check():
 
 def calculate_user_stats(user_id):
     """Calculate comprehensive user statistics for dashboard."""
-    from app.models import SavedMealPlan, UsageLog
-    
-    # Get all user's meal plans - using ORM for security
-    meal_plans = SavedMealPlan.query.filter_by(user_id=user_id).all()
-    
-    # Get usage logs for streak calculation - using ORM for security
-    usage_logs = UsageLog.query.filter_by(
-        user_id=user_id,
-        action='meal_generation'
-    ).order_by(UsageLog.created_at.desc()).all()
+    aggregates = get_or_compute(
+        tagged_key(f"user_stats:{user_id}", [user_tag(user_id)]),
+        lambda: query_user_aggregates(user_id),
+        timeout=USER_STATS_TIMEOUT
+    )
     
     # Basic stats
-    total_plans = len(meal_plans)
-    total_days = sum(plan.days or 1 for plan in meal_plans)
-    total_calories = sum(plan.total_calories or 0 for plan in meal_plans)
+    total_plans = aggregates['total_plans']
+    total_days = aggregates['total_days']
+    total_calories = aggregates['total_calories']
     
     # Calculate weekly streak
-    weekly_streak = calculate_weekly_streak(usage_logs)
+    weekly_streak = calculate_weekly_streak(aggregates['active_weeks'])
     
     # Calculate progress percentage (based on milestones)
     progress_percentage = calculate_progress_percentage(total_plans, weekly_streak, current_user.is_premium())
@@ -49,13 +51,7 @@ def calculate_user_stats(user_id):
     next_milestone = get_next_milestone(total_plans, weekly_streak, current_user.is_premium())
     
     # Premium-specific stats
-    pdfs_generated = 0
-    if current_user.is_premium():
-        pdf_logs = UsageLog.query.filter_by(
-            user_id=user_id,
-            action='pdf_export'
-        ).count()
-        pdfs_generated = pdf_logs
+    pdfs_generated = aggregates['pdfs_generated'] if current_user.is_premium() else 0
     
     return {
         'total_plans': total_plans,
@@ -67,26 +63,47 @@ def calculate_user_stats(user_id):
         'pdfs_generated': pdfs_generated
     }
 
-def calculate_weekly_streak(usage_logs):
-    """Calculate user's weekly streak."""
-    if not usage_logs:
-        return 0
+def week_start(column):
+    """SQL expression for the Monday of the week containing ``column``."""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return func.date(func.date_trunc('week', column))
+    # SQLite: forward to the next Sunday (or stay on one), then back six days
+    return func.date(column, 'weekday 0', '-6 days')
+
+def query_user_aggregates(user_id):
+    """Plan totals, PDF count and active weeks computed in SQL."""
+    plan_totals = db.session.query(
+        func.count(SavedMealPlan.id),
+        func.coalesce(func.sum(func.coalesce(SavedMealPlan.days, 1)), 0),
+        func.coalesce(func.sum(SavedMealPlan.total_calories), 0)
+    ).filter(SavedMealPlan.user_id == user_id).one()
     
-    # Group logs by week
-    weekly_activity = {}
-    for log in usage_logs:
-        # Get Monday of the week for this log
-        log_date = log.created_at.date()
-        days_since_monday = log_date.weekday()
-        monday = log_date - timedelta(days=days_since_monday)
-        
-        if monday not in weekly_activity:
-            weekly_activity[monday] = True
+    pdfs_generated = db.session.query(func.count(UsageLog.id)).filter(
+        UsageLog.user_id == user_id,
+        UsageLog.action == 'pdf_export'
+    ).scalar() or 0
+    
+    week = week_start(UsageLog.created_at)
+    weeks = db.session.query(week).filter(
+        UsageLog.user_id == user_id,
+        UsageLog.action == 'meal_generation'
+    ).group_by(week).order_by(week.desc()).all()
     
-    # Calculate consecutive weeks from most recent
-    if not weekly_activity:
+    return {
+        'total_plans': plan_totals[0],
+        'total_days': int(plan_totals[1]),
+        'total_calories': int(plan_totals[2]),
+        'pdfs_generated': pdfs_generated,
+        'active_weeks': [str(monday)[:10] for (monday,) in weeks if monday is not None]
+    }
+
+def calculate_weekly_streak(active_weeks):
+    """Calculate user's weekly streak from the Mondays of weeks with activity."""
+    if not active_weeks:
         return 0
     
+    weekly_activity = {date.fromisoformat(monday) for monday in active_weeks}
+    
     # Get current Monday
     today = datetime.now().date()
     current_monday = today - timedelta(days=today.weekday())
@@ -233,48 +250,28 @@ def generate_meal_plan():
             if field not in data:
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
-        # Initialize enhanced meal optimizer
-        print("DEBUG: About to import EnhancedMealOptimizer")
-        try:
-            from app.services.enhanced_meal_optimizer import EnhancedMealOptimizer
-            print("DEBUG: Import successful")
-            optimizer = EnhancedMealOptimizer()
-            print(f"DEBUG: Optimizer initialized - class: {type(optimizer).__name__}")
-        except Exception as e:
-            print(f"DEBUG: Enhanced optimizer failed: {e}")
-            print("DEBUG: Falling back to old optimizer")
-            from app.services.meal_optimizer import MealOptimizer
-            optimizer = MealOptimizer()
-            print(f"DEBUG: Using fallback - class: {type(optimizer).__name__}")
-        
-        # Generate meal plan
-        meal_plan = optimizer.generate_meal_plan(
-            target_calories=int(data['calories']),
-            diet_type=data['diet_type'],
-            meals_per_day=int(data['meals_per_day']),
-            days=int(data.get('days', 1)),
-            restrictions=data.get('restrictions', []),
-            cuisine_preference=data.get('cuisine_preference')
-        )
-        
-        print(f"DEBUG: Generated meal plan with variety score: {meal_plan.get('variety_score', 'N/A')}")
-        if meal_plan.get('days'):
-            day1_meals = [meal['name'] for meal in meal_plan['days'][0]['meals']]
-            print(f"DEBUG: Day 1 meals: {day1_meals}")
-        
-        # Deduct credits if not premium
-        if not current_user.is_premium():
-            current_user.use_credits(1)
-            db.session.commit()
-        
-        # Log usage
+        plan_params = {
+            'target_calories': int(data['calories']),
+            'diet_type': data['diet_type'],
+            'meals_per_day': int(data['meals_per_day']),
+            'days': int(data.get('days', 1)),
+            'restrictions': data.get('restrictions', []),
+            'cuisine_preference': data.get('cuisine_preference')
+        }
+        
+        # Preset combinations are served from the precomputed catalogue
+        meal_plan = plan_catalogue.get(**plan_params)
+        if meal_plan is None:
+            meal_plan = generate_plan(**plan_params)
+        
+        # The credit was reserved by check_credits_or_premium
         usage_log = UsageLog(
             user_id=current_user.id,
             action='meal_plan_generated',
             resource_type='meal_plan',
-            credits_used=1 if not current_user.is_premium() else 0,
+            credits_used=g.credits_reserved,
             credits_remaining=current_user.credits_balance,
-            metadata={
+            usage_metadata={
                 'calories': data['calories'],
                 'diet_type': data['diet_type'],
                 'days': data.get('days', 1)
@@ -318,6 +315,7 @@ def save_meal_plan():
         
         # Use timeout-protected database operation
         created_plan = db_ops.create(saved_plan)
+        invalidate_user_cache(current_user.id)
         
         return jsonify({
             'success': True,
@@ -337,7 +335,9 @@ def export_pdf(meal_plan_id):
     """Export meal plan as PDF."""
     try:
         # Get meal plan
-        meal_plan = SavedMealPlan.query.get_or_404(meal_plan_id)
+        meal_plan = SavedMealPlan.query.options(
+            undefer_group(PLAN_DATA_GROUP)
+        ).get_or_404(meal_plan_id)
         
         # Check ownership
         if meal_plan.user_id != current_user.id:
@@ -385,7 +385,9 @@ def generate_video(meal_plan_id):
     """Generate video for meal plan."""
     try:
         # Get meal plan
-        meal_plan = SavedMealPlan.query.get_or_404(meal_plan_id)
+        meal_plan = SavedMealPlan.query.options(
+            undefer_group(PLAN_DATA_GROUP)
+        ).get_or_404(meal_plan_id)
         
         # Check ownership
         if meal_plan.user_id != current_user.id:
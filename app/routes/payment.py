@@ -371,33 +371,20 @@ def deduct_credit(user, amount=1):
             user.credits_balance = 0  # Reset to free tier
             db.session.commit()
     
-    # Check free tier credits
-    if user.credits_balance >= amount:
-        user.credits_balance -= amount
-        db.session.commit()
-        return True
-    return False
+    # Check free tier credits with one conditional decrement
+    from app.services.credits import deduct_credits
+    
+    if deduct_credits(user.id, amount) is None:
+        return False
+    db.session.commit()
+    return True
 
 def refill_monthly_credits():
     """Refill credits for free tier users at the start of each month"""
-    from datetime import datetime, timezone
-    from models import User, db
-    
-    # Get all free tier users
-    free_users = User.query.filter_by(subscription_tier='free').all()
-    
-    refilled_count = 0
-    for user in free_users:
-        # Give free users 3 credits per month
-        if user.credits_balance < 3:
-            user.credits_balance = 3
-            refilled_count += 1
-    
-    if refilled_count > 0:
-        db.session.commit()
-        logger.info(f"Refilled credits for {refilled_count} free tier users")
+    from app.services.credit_refill import refill_free_credits
     
-    return refilled_count
+    # Set-based and idempotent per billing period
+    return refill_free_credits()
 
 def add_credits(user, amount):
     """Add credits to user's balance (for credit purchases)"""
@@ -5,8 +5,10 @@ Routes for meal plan sharing functionality
 from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash, session
 from flask_login import login_required, current_user
 from app.extensions import db
+from app.utils.compression import json_response
 from app.models.user import User
 from models import SharedMealPlan
+from sqlalchemy.orm import undefer
 from datetime import datetime, timedelta, timezone
 import bcrypt
 import json
@@ -81,7 +83,9 @@ def view_shared_plan(share_code):
     """View a shared meal plan"""
     try:
         # Find the shared plan
-        shared_plan = SharedMealPlan.query.filter_by(share_code=share_code).first()
+        shared_plan = SharedMealPlan.query.options(
+            undefer(SharedMealPlan.meal_plan_data)
+        ).filter_by(share_code=share_code).first()
         
         if not shared_plan:
             flash('Shared meal plan not found', 'error')
@@ -149,7 +153,9 @@ def verify_password(share_code):
 def copy_shared_plan(share_code):
     """Copy a shared meal plan to user's account"""
     try:
-        shared_plan = SharedMealPlan.query.filter_by(share_code=share_code).first()
+        shared_plan = SharedMealPlan.query.options(
+            undefer(SharedMealPlan.meal_plan_data)
+        ).filter_by(share_code=share_code).first()
         
         if not shared_plan:
             return jsonify({'error': 'Shared plan not found'}), 404
@@ -166,13 +172,13 @@ def copy_shared_plan(share_code):
         
         logger.info(f"User {current_user.id} copied shared meal plan {share_code}")
         
-        return jsonify({
+        return json_response({
             'success': True,
             'meal_plan_data': shared_plan.meal_plan_data,
             'title': shared_plan.title,
             'calorie_target': shared_plan.calorie_target,
             'diet_type': shared_plan.diet_type
-        }), 200
+        })
         
     except Exception as e:
         logger.error(f"Error copying shared meal plan {share_code}: {str(e)}")
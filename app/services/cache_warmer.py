@@ -0,0 +1,144 @@
+"""
+Scheduled cache warm-up for Cibozer
+Re-populates hot cache entries after a deploy and at a fixed interval so the
+first requests after a restart do not all land on cold caches.
+"""
+
+import os
+import logging
+import threading
+import time
+from typing import Callable, Dict, Any, Optional
+
+from app.extensions import cache
+
+
+logger = logging.getLogger('cibozer.cache_warmer')
+
+WARM_LOCK_KEY = 'lock:cache_warm'
+
+
+class CacheWarmer:
+    """Runs registered warm-up tasks on startup and then every interval"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.last_run: Dict[str, Any] = {}
+
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize warmer with Flask app"""
+        self.app = app
+        app.config.setdefault('CACHE_WARM_ON_STARTUP', not app.testing)
+        app.config.setdefault('CACHE_WARM_INTERVAL', 600)
+
+        if not hasattr(app, 'extensions'):
+            app.extensions = {}
+        app.extensions['cache_warmer'] = self
+
+    def register_task(self, name: str, shared: bool = True):
+        """Register a warm-up task.
+
+        Shared tasks fill the shared cache and run in one worker per interval;
+        the rest fill in-process caches and run in every worker.
+        """
+        def decorator(func: Callable[[], Any]):
+            self._tasks[name] = {'func': func, 'shared': shared}
+            return func
+        return decorator
+
+    def run_once(self, force: bool = False) -> Dict[str, Any]:
+        """Run every task once; returns per-task duration or error"""
+        interval = self.app.config.get('CACHE_WARM_INTERVAL', 600) if self.app else 600
+        # Another worker warmed the shared cache within this interval
+        run_shared = force or cache.add(WARM_LOCK_KEY, os.getpid(), timeout=max(int(interval), 1))
+
+        results = {}
+        for name, task in self._tasks.items():
+            if task['shared'] and not run_shared:
+                continue
+            started = time.time()
+            try:
+                task['func']()
+                results[name] = {'seconds': round(time.time() - started, 3)}
+            except Exception as e:
+                logger.error(f"Cache warm-up task {name} failed: {e}")
+                results[name] = {'error': str(e)}
+
+        self.last_run = {'finished_at': time.time(), 'tasks': results}
+        logger.info(f"Cache warm-up ran {len(results)} tasks")
+        return results
+
+    def start(self):
+        """Start the background warm-up thread for this process"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._thread_pid == os.getpid():
+                return
+            self._stop.clear()
+            self._thread_pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='cache-warmer', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Signal the warm-up thread to stop and wait for it"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        """Warm immediately, then every CACHE_WARM_INTERVAL seconds (0 warms once)"""
+        interval = self.app.config.get('CACHE_WARM_INTERVAL', 600)
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    self.run_once()
+            except Exception as e:
+                logger.error(f"Cache warm-up iteration failed: {e}")
+
+            if not interval:
+                return
+            self._stop.wait(interval)
+
+
+# Global warmer instance
+cache_warmer = CacheWarmer()
+
+
+@cache_warmer.register_task('public_plans')
+def warm_public_plans():
+    """Recent public meal plans"""
+    from app.models import SavedMealPlan
+    from app.utils.caching import tiered_cache
+
+    public_plans = SavedMealPlan.query.with_entities(
+        SavedMealPlan.id, SavedMealPlan.name, SavedMealPlan.diet_type, SavedMealPlan.total_calories
+    ).filter_by(is_public=True).order_by(SavedMealPlan.created_at.desc()).limit(10).all()
+
+    tiered_cache.set('public:recent_plans', [{
+        'id': plan.id,
+        'name': plan.name,
+        'diet_type': plan.diet_type,
+        'total_calories': plan.total_calories
+    } for plan in public_plans], timeout=1800)
+
+
+@cache_warmer.register_task('admin_aggregates')
+def warm_admin_aggregates():
+    """Admin dashboard and analytics snapshots, and the public user count"""
+    from app.routes.admin import (
+        compute_dashboard_stats, compute_analytics_snapshot,
+        DASHBOARD_STATS_KEY, ANALYTICS_SNAPSHOT_KEY, DASHBOARD_STATS_TIMEOUT
+    )
+    from app.utils.caching import refresh, tiered_cache
+
+    stats = refresh(DASHBOARD_STATS_KEY, compute_dashboard_stats, timeout=DASHBOARD_STATS_TIMEOUT)
+    refresh(ANALYTICS_SNAPSHOT_KEY, compute_analytics_snapshot, timeout=DASHBOARD_STATS_TIMEOUT)
+    tiered_cache.set('stats:user_count', stats['total_users'], timeout=3600)
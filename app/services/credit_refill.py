@@ -0,0 +1,71 @@
+"""
+Monthly free-tier credit refill for Cibozer
+Tops up free users with set-based UPDATEs over fixed id ranges instead of
+loading every user. Each range commits together with an audit row keyed by
+(billing period, first id), so a rerun in the same period skips finished
+ranges and an interrupted run resumes where it stopped.
+"""
+
+import logging
+from datetime import datetime, timezone
+
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models import User, CreditRefillBatch
+
+
+logger = logging.getLogger('cibozer.credit_refill')
+
+
+def billing_period(now: datetime = None) -> str:
+    """Billing period a refill belongs to, as YYYY-MM"""
+    return (now or datetime.now(timezone.utc)).strftime('%Y-%m')
+
+
+def refill_free_credits(period: str = None, credits: int = None, batch_size: int = None) -> int:
+    """Top up free users below ``credits`` for ``period``; returns users refilled.
+
+    Ranges already recorded for the period are skipped, so calling this twice
+    in a month does not refill users who spent their credits in between.
+    """
+    period = period or billing_period()
+    credits = credits if credits is not None else current_app.config.get('FREE_TIER_MONTHLY_CREDITS', 3)
+    batch_size = batch_size or current_app.config.get('CREDIT_REFILL_BATCH_SIZE', 50000)
+
+    lowest, highest = db.session.query(func.min(User.id), func.max(User.id)).one()
+    if lowest is None:
+        return 0
+    done = {first for (first,) in db.session.query(CreditRefillBatch.first_user_id).filter(
+        CreditRefillBatch.period == period
+    )}
+
+    refilled = 0
+    # Ranges are aligned to multiples of batch_size so every run sees the same ones
+    for index in range((lowest - 1) // batch_size, (highest - 1) // batch_size + 1):
+        first_id, last_id = index * batch_size + 1, (index + 1) * batch_size
+        if first_id in done:
+            continue
+        try:
+            count = User.query.filter(
+                User.subscription_tier == 'free',
+                User.credits_balance < credits,
+                User.id.between(first_id, last_id)
+            ).update({User.credits_balance: credits}, synchronize_session=False)
+            db.session.add(CreditRefillBatch(period=period, first_user_id=first_id, last_user_id=last_id,
+                                             users_refilled=count, credits=credits))
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent run already refilled this range for the period
+            db.session.rollback()
+            continue
+        except Exception:
+            db.session.rollback()
+            raise
+        refilled += count
+
+    if refilled:
+        logger.info(f"Refilled credits for {refilled} free tier users ({period})")
+    return refilled
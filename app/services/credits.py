@@ -0,0 +1,61 @@
+"""
+Atomic credit accounting for Cibozer
+Balances change with a single conditional UPDATE, so concurrent requests
+from one user cannot double-spend and never wait on row locks held across
+plan generation. Functions run in the caller's transaction and do not commit.
+"""
+
+import logging
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+
+from app.extensions import db
+from app.models import User
+
+
+logger = logging.getLogger('cibozer.credits')
+
+
+def _sync_loaded_user(user_id: int, balance: int):
+    # Keep an already loaded User (e.g. current_user) in line without a flush
+    user = db.session.identity_map.get(identity_key(User, user_id))
+    if user is not None:
+        set_committed_value(user, 'credits_balance', balance)
+
+
+def _apply(user_id: int, delta: int, condition=None) -> Optional[int]:
+    table = User.__table__
+    statement = table.update().where(table.c.id == user_id)
+    if condition is not None:
+        statement = statement.where(condition)
+    statement = statement.values(credits_balance=table.c.credits_balance + delta)
+
+    if getattr(db.engine.dialect, 'update_returning', False):
+        balance = db.session.execute(statement.returning(table.c.credits_balance)).scalar()
+    else:
+        if db.session.execute(statement).rowcount == 0:
+            return None
+        # The row stays locked by our UPDATE until commit, so this read is exact
+        balance = db.session.execute(select(table.c.credits_balance).where(table.c.id == user_id)).scalar()
+
+    if balance is not None:
+        _sync_loaded_user(user_id, balance)
+    return balance
+
+
+def deduct_credits(user_id: int, amount: int = 1) -> Optional[int]:
+    """Take ``amount`` credits if the balance covers them.
+
+    Returns the new balance, or None when the user has too few credits.
+    """
+    return _apply(user_id, -amount, User.__table__.c.credits_balance >= amount)
+
+
+def refund_credits(user_id: int, amount: int = 1) -> Optional[int]:
+    """Give back ``amount`` credits; returns the new balance"""
+    balance = _apply(user_id, amount)
+    logger.info(f"Refunded {amount} credits to user {user_id}")
+    return balance
@@ -2,8 +2,7 @@
 import random
 import sys
 import os
-from typing import Dict, List, Any, Set
-from copy import deepcopy
+from typing import Dict, List, Any, Set, Tuple
 
 # Add root directory to path to import nutrition_data
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
@@ -14,6 +13,57 @@ except ImportError:
     print("Warning: Could not import comprehensive nutrition_data. Using fallback.")
     nd = None
 
+from app.services.meal_index import MealIndex, get_meal_index
+
+
+def template_base_nutrition(template: Dict[str, Any], ingredients: Dict[str, Any]) -> Tuple[float, Dict[str, float]]:
+    """Calories and macros of a template at its base (unscaled) portions."""
+    base_calories = 0
+    template_macros = {'protein': 0, 'carbs': 0, 'fat': 0}
+    
+    for ingredient in template.get('base_ingredients', []):
+        item_name = ingredient['item']
+        amount = ingredient['amount']
+        unit = ingredient['unit']
+        
+        if item_name in ingredients:
+            item_data = ingredients[item_name]
+            
+            # Convert to 100g basis for calculation
+            if unit == 'g':
+                calories_per_100g = item_data['calories']
+                actual_calories = (amount / 100) * calories_per_100g
+            elif unit == 'ml':
+                # Assume 1ml = 1g for liquids (close enough)
+                calories_per_100g = item_data['calories']
+                actual_calories = (amount / 100) * calories_per_100g
+            else:
+                actual_calories = item_data['calories'] * 0.5  # Rough estimate
+            
+            base_calories += actual_calories
+            
+            # Calculate macros
+            if unit in ['g', 'ml']:
+                factor = amount / 100
+                template_macros['protein'] += item_data['protein'] * factor
+                template_macros['carbs'] += item_data['carbs'] * factor
+                template_macros['fat'] += item_data['fat'] * factor
+    
+    return base_calories, template_macros
+
+
+def build_template_index(meal_templates: Dict[str, Dict[str, Any]]) -> MealIndex:
+    """Index MEAL_TEMPLATES by diet tag, meal type and cuisine."""
+    return MealIndex(
+        meal_templates,
+        meal_templates.values(),
+        diets=lambda template: template.get('tags', []),
+        meal_types=lambda template: [template.get('meal_type')],
+        cuisine=lambda template: template.get('cuisine'),
+        tags=lambda template: template.get('tags', []),
+        calories=lambda template: template_base_nutrition(template, nd.INGREDIENTS)[0]
+    )
+
 
 class EnhancedMealOptimizer:
     """Enhanced service for generating diverse, accurate meal plans."""
@@ -26,6 +76,7 @@ class EnhancedMealOptimizer:
         self.ingredients = nd.INGREDIENTS
         self.meal_templates = nd.MEAL_TEMPLATES
         self.diet_profiles = nd.DIET_PROFILES
+        self.index = get_meal_index(self.meal_templates, build_template_index)
         
         # Track meal history to prevent repetition
         self.recent_meals = set()
@@ -174,30 +225,7 @@ class EnhancedMealOptimizer:
         cuisine_preference: str
     ) -> List[Dict[str, Any]]:
         """Filter meal templates based on criteria."""
-        suitable_templates = []
-        
-        for template_name, template in self.meal_templates.items():
-            # Check meal type
-            if template.get('meal_type') != meal_type:
-                continue
-            
-            # Check diet compatibility
-            template_tags = template.get('tags', [])
-            if diet_type != 'standard':
-                if diet_type not in template_tags:
-                    continue
-            
-            # Check restrictions
-            if any(restriction in template_tags for restriction in restrictions):
-                continue
-            
-            # Check cuisine preference
-            if cuisine_preference and template.get('cuisine') != cuisine_preference:
-                continue
-            
-            suitable_templates.append(template)
-        
-        return suitable_templates
+        return self.index.candidates(diet_type, meal_type, restrictions, cuisine_preference)
     
     def _select_diverse_template(self, templates: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Select template with preference for unused ones."""
@@ -222,36 +250,7 @@ class EnhancedMealOptimizer:
         """Build meal from template with accurate calorie calculation."""
         
         # Calculate template's base calories
-        base_calories = 0
-        template_macros = {'protein': 0, 'carbs': 0, 'fat': 0}
-        
-        for ingredient in template.get('base_ingredients', []):
-            item_name = ingredient['item']
-            amount = ingredient['amount']
-            unit = ingredient['unit']
-            
-            if item_name in self.ingredients:
-                item_data = self.ingredients[item_name]
-                
-                # Convert to 100g basis for calculation
-                if unit == 'g':
-                    calories_per_100g = item_data['calories']
-                    actual_calories = (amount / 100) * calories_per_100g
-                elif unit == 'ml':
-                    # Assume 1ml = 1g for liquids (close enough)
-                    calories_per_100g = item_data['calories']
-                    actual_calories = (amount / 100) * calories_per_100g
-                else:
-                    actual_calories = item_data['calories'] * 0.5  # Rough estimate
-                
-                base_calories += actual_calories
-                
-                # Calculate macros
-                if unit in ['g', 'ml']:
-                    factor = amount / 100
-                    template_macros['protein'] += item_data['protein'] * factor
-                    template_macros['carbs'] += item_data['carbs'] * factor
-                    template_macros['fat'] += item_data['fat'] * factor
+        base_calories, template_macros = template_base_nutrition(template, self.ingredients)
         
         # Calculate scaling factor
         if base_calories > 0:
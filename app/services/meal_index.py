@@ -0,0 +1,155 @@
+"""
+Shared lookup index for meal selection
+Meals are bucketed by (diet, meal_type, cuisine), restriction tags are encoded
+as bitmasks and every bucket is kept sorted by calories, so the nearest-calorie
+candidates are found with a bisect instead of scanning and sorting the database.
+"""
+
+import bisect
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+ANY_CUISINE = None
+
+
+class MealBucket:
+    """Calorie-sorted parallel arrays for one (diet, meal_type, cuisine) key"""
+
+    __slots__ = ('calories', 'items', 'masks')
+
+    def __init__(self):
+        self.calories: List[float] = []
+        self.items: List[Any] = []
+        self.masks: List[int] = []
+
+
+class MealIndex:
+    """Immutable index over a meal database.
+
+    ``wildcard_diet`` matches every meal, mirroring the optimizers treating
+    'standard' as "no diet filter".
+    """
+
+    def __init__(
+        self,
+        source: Any,
+        items: Iterable[Any],
+        diets: Callable[[Any], Iterable[str]],
+        meal_types: Callable[[Any], Iterable[str]],
+        cuisine: Callable[[Any], Optional[str]],
+        tags: Callable[[Any], Iterable[str]],
+        calories: Callable[[Any], float],
+        wildcard_diet: str = 'standard'
+    ):
+        self.source = source
+        self.wildcard_diet = wildcard_diet
+        self._bits: Dict[str, int] = {}
+        self._buckets: Dict[Tuple[str, str, Optional[str]], MealBucket] = {}
+
+        staged: Dict[Tuple[str, str, Optional[str]], List[Tuple[float, int, int, Any]]] = {}
+        for position, item in enumerate(items):
+            mask = 0
+            for tag in tags(item):
+                mask |= self._bit_for(tag)
+
+            item_calories = calories(item)
+            item_diets = set(diets(item)) | {wildcard_diet}
+            for diet in item_diets:
+                for meal_type in meal_types(item):
+                    for item_cuisine in {cuisine(item), ANY_CUISINE}:
+                        staged.setdefault((diet, meal_type, item_cuisine), []).append(
+                            (item_calories, position, mask, item)
+                        )
+
+        # Ties keep database order so selection matches a stable sort
+        for key, rows in staged.items():
+            rows.sort(key=lambda row: (row[0], row[1]))
+            bucket = MealBucket()
+            for item_calories, _, mask, item in rows:
+                bucket.calories.append(item_calories)
+                bucket.masks.append(mask)
+                bucket.items.append(item)
+            self._buckets[key] = bucket
+
+    def _bit_for(self, tag: str) -> int:
+        if tag not in self._bits:
+            self._bits[tag] = 1 << len(self._bits)
+        return self._bits[tag]
+
+    def restriction_mask(self, restrictions: Iterable[str]) -> int:
+        """Bitmask for restrictions; tags no meal carries cannot exclude anything"""
+        mask = 0
+        for restriction in restrictions or []:
+            mask |= self._bits.get(restriction, 0)
+        return mask
+
+    def _bucket(self, diet_type: str, meal_type: str, cuisine: Optional[str]) -> Optional[MealBucket]:
+        return self._buckets.get((diet_type, meal_type, cuisine or ANY_CUISINE))
+
+    def candidates(
+        self,
+        diet_type: str,
+        meal_type: str,
+        restrictions: Iterable[str] = None,
+        cuisine: Optional[str] = None
+    ) -> List[Any]:
+        """All matching meals, ordered by calories"""
+        bucket = self._bucket(diet_type, meal_type, cuisine)
+        if bucket is None:
+            return []
+        excluded = self.restriction_mask(restrictions)
+        if not excluded:
+            return list(bucket.items)
+        return [item for item, mask in zip(bucket.items, bucket.masks) if not mask & excluded]
+
+    def nearest(
+        self,
+        diet_type: str,
+        meal_type: str,
+        target_calories: float,
+        restrictions: Iterable[str] = None,
+        cuisine: Optional[str] = None,
+        limit: int = 5
+    ) -> List[Any]:
+        """Up to ``limit`` matching meals closest to the calorie target"""
+        bucket = self._bucket(diet_type, meal_type, cuisine)
+        if bucket is None:
+            return []
+
+        excluded = self.restriction_mask(restrictions)
+        calories = bucket.calories
+        masks = bucket.masks
+        above = bisect.bisect_left(calories, target_calories)
+        below = above - 1
+
+        selected = []
+        while len(selected) < limit and (below >= 0 or above < len(calories)):
+            take_below = above >= len(calories) or (
+                below >= 0 and target_calories - calories[below] <= calories[above] - target_calories
+            )
+            if take_below:
+                position, below = below, below - 1
+            else:
+                position, above = above, above + 1
+            if not masks[position] & excluded:
+                selected.append(bucket.items[position])
+        return selected
+
+
+_indexes: Dict[int, MealIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_meal_index(source: Any, builder: Callable[[Any], MealIndex]) -> MealIndex:
+    """Index for a meal database, built once per process and shared by optimizers"""
+    index = _indexes.get(id(source))
+    if index is not None and index.source is source:
+        return index
+
+    with _indexes_lock:
+        index = _indexes.get(id(source))
+        if index is None or index.source is not source:
+            index = builder(source)
+            _indexes[id(source)] = index
+    return index
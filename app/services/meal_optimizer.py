@@ -2,6 +2,20 @@
 import random
 from typing import Dict, List, Any
 from app.core.nutrition_data import MEAL_DATABASE, NUTRITION_TARGETS
+from app.services.meal_index import MealIndex, get_meal_index
+
+
+def build_meal_database_index(meal_database: List[Dict[str, Any]]) -> MealIndex:
+    """Index MEAL_DATABASE-style entries by diet, meal type and cuisine."""
+    return MealIndex(
+        meal_database,
+        meal_database,
+        diets=lambda meal: meal.get('diet_types', []),
+        meal_types=lambda meal: meal.get('meal_types', []),
+        cuisine=lambda meal: meal.get('cuisine'),
+        tags=lambda meal: meal.get('contains', []),
+        calories=lambda meal: meal['calories']
+    )
 
 
 class MealOptimizer:
@@ -10,6 +24,7 @@ class MealOptimizer:
     def __init__(self):
         self.meal_database = MEAL_DATABASE
         self.nutrition_targets = NUTRITION_TARGETS
+        self.index = get_meal_index(self.meal_database, build_meal_database_index)
     
     def generate_meal_plan(
         self,
@@ -104,23 +119,21 @@ class MealOptimizer:
         cuisine_preference: str = None
     ) -> Dict[str, Any]:
         """Generate a single meal."""
-        # Filter available meals
-        available_meals = self._filter_meals(
+        # Nearest-calorie matches from the index
+        closest_meals = self.index.nearest(
             diet_type,
             meal_type,
+            target_calories,
             restrictions,
             cuisine_preference
         )
         
-        if not available_meals:
+        if not closest_meals:
             # Fallback to a basic meal if no matches
             return self._create_basic_meal(target_calories, meal_type)
         
-        # Select a meal close to target calories
-        selected_meal = self._select_meal_by_calories(
-            available_meals,
-            target_calories
-        )
+        # Add some randomness to avoid repetition
+        selected_meal = random.choice(closest_meals)
         
         # Adjust portion size if needed
         portion_multiplier = target_calories / selected_meal['calories']
@@ -150,47 +163,7 @@ class MealOptimizer:
         cuisine_preference: str = None
     ) -> List[Dict[str, Any]]:
         """Filter meals based on criteria."""
-        filtered_meals = []
-        
-        for meal in self.meal_database:
-            # Check diet type
-            if diet_type != 'standard' and diet_type not in meal.get('diet_types', []):
-                continue
-            
-            # Check meal type
-            if meal_type not in meal.get('meal_types', []):
-                continue
-            
-            # Check restrictions
-            if any(restriction in meal.get('contains', []) for restriction in restrictions):
-                continue
-            
-            # Check cuisine preference
-            if cuisine_preference and cuisine_preference != meal.get('cuisine'):
-                continue
-            
-            filtered_meals.append(meal)
-        
-        return filtered_meals
-    
-    def _select_meal_by_calories(
-        self,
-        meals: List[Dict[str, Any]],
-        target_calories: int
-    ) -> Dict[str, Any]:
-        """Select meal closest to target calories."""
-        if not meals:
-            return None
-        
-        # Sort by calorie difference
-        sorted_meals = sorted(
-            meals,
-            key=lambda m: abs(m['calories'] - target_calories)
-        )
-        
-        # Add some randomness to avoid repetition
-        top_choices = sorted_meals[:5]
-        return random.choice(top_choices)
+        return self.index.candidates(diet_type, meal_type, restrictions, cuisine_preference)
     
     def _create_basic_meal(
         self,
@@ -500,7 +500,24 @@ class MonitoringService:
             except Exception as e:
                 return {'healthy': False, 'message': f'Memory check error: {str(e)}'}
         
+        def database_pool_check():
+            """Check connection pool headroom"""
+            try:
+                stats = self.collect_pool_metrics()
+                if 'size' not in stats:
+                    return {'healthy': True, 'message': 'Connection pool not bounded'}
+                
+                capacity = stats['size'] + stats['max_overflow']
+                if stats['waiting'] and stats['checked_out'] >= capacity:
+                    return {'healthy': False,
+                            'message': f"Connection pool exhausted: {stats['waiting']} waiting"}
+                return {'healthy': True,
+                        'message': f"Connection pool OK: {stats['checked_out']}/{capacity} in use"}
+            except Exception as e:
+                return {'healthy': False, 'message': f'Connection pool check error: {str(e)}'}
+        
         self.health.register_check('database', database_check)
+        self.health.register_check('database_pool', database_pool_check)
         self.health.register_check('disk_space', disk_space_check)
         self.health.register_check('memory', memory_check)
     
@@ -559,6 +576,16 @@ class MonitoringService:
         except Exception as e:
             current_app.logger.error(f"Error collecting system metrics: {e}")
     
+    def collect_pool_metrics(self) -> Dict[str, Any]:
+        """Publish connection pool gauges and return the full pool statistics"""
+        from app.utils.db_pool import get_pool_stats
+        
+        stats = get_pool_stats()
+        for name in ('checked_out', 'overflow', 'waiting', 'timeouts'):
+            if name in stats:
+                self.metrics.gauge(f'db.pool.{name}', stats[name])
+        return stats
+    
     def get_dashboard_data(self) -> Dict[str, Any]:
         """Get comprehensive dashboard data"""
         now = datetime.utcnow()
@@ -582,6 +609,14 @@ class MonitoringService:
         # Get error summary
         error_summary = self.error_tracker.get_error_summary(24)
         
+        try:
+            pool_stats = self.collect_pool_metrics()
+        except Exception as e:
+            pool_stats = {'error': str(e)}
+        
+        from app.utils.query_profiler import query_profiler
+        query_stats = query_profiler.summary(top=10)
+        
         return {
             'overview': {
                 'requests_last_hour': request_count,
@@ -593,6 +628,8 @@ class MonitoringService:
             'performance': response_time_stats,
             'health': health_status,
             'errors': error_summary,
+            'database_pool': pool_stats,
+            'queries': query_stats,
             'alerts': list(self.alerts.alert_history)[-10:],  # Last 10 alerts
             'timestamp': now.isoformat()
         }
@@ -757,7 +794,9 @@ class MonitoringService:
                 user_id=perf_data.get('user_id'),
                 action='slow_operation',
                 resource_type='performance',
-                metadata={
+                operation=perf_data['operation'][:100],
+                response_time_ms=int(perf_data['duration_ms']),
+                usage_metadata={
                     'operation': perf_data['operation'],
                     'duration_ms': perf_data['duration_ms'],
                     'metadata': perf_data['metadata']
@@ -782,7 +821,9 @@ class MonitoringService:
                 user_id=security_data.get('user_id'),
                 action='security_event',
                 resource_type='security',
-                metadata={
+                operation=security_data['event_type'][:100],
+                severity=security_data['severity'],
+                usage_metadata={
                     'event_type': security_data['event_type'],
                     'severity': security_data['severity'],
                     'details': security_data['details']
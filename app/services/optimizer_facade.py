@@ -0,0 +1,320 @@
+"""
+Meal plan optimizer facade for Cibozer
+Engines register with a declared cost profile and are tried from most accurate
+to cheapest within a per-request latency budget. An engine that overruns its
+budget or keeps failing is skipped in favour of a cheaper one or a cached plan.
+"""
+
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+from app.middleware.graceful_degradation import CircuitBreaker, ServiceUnavailableError, graceful_degradation
+
+
+logger = logging.getLogger('cibozer.optimizer')
+
+
+class EngineBudgetExceeded(Exception):
+    """Raised when an engine does not finish within its latency budget"""
+    pass
+
+
+@dataclass
+class EngineProfile:
+    """Registered engine and its declared cost profile"""
+    name: str
+    generate: Callable[[Dict[str, Any]], Dict[str, Any]]
+    cost_ms_per_day: float  # Expected latency, refined from observed runs
+    budget_ms: float  # Hard limit for one run of this engine
+    fallback: bool = False  # Allowed while fallback meal generation is forced
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker)
+    observed_ms_per_day: Optional[float] = None
+
+    def expected_ms(self, days: int) -> float:
+        per_day = self.observed_ms_per_day if self.observed_ms_per_day is not None else self.cost_ms_per_day
+        return per_day * max(1, days)
+
+    def record_latency(self, elapsed_ms: float, days: int, alpha: float = 0.2):
+        per_day = elapsed_ms / max(1, days)
+        if self.observed_ms_per_day is None:
+            self.observed_ms_per_day = per_day
+        else:
+            self.observed_ms_per_day += alpha * (per_day - self.observed_ms_per_day)
+
+
+def run_accurate_engine(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Iterative MealPlanOptimizer, one optimized day at a time"""
+    import meal_optimizer
+
+    optimizer = meal_optimizer.MealPlanOptimizer(skip_validation=True)
+    days = params.get('days', 1)
+
+    all_days = []
+    total_calories = 0
+    for day_num in range(1, days + 1):
+        day_meals, metrics = optimizer.generate_single_day_plan({
+            'diet': params['diet_type'],
+            'calories': params['target_calories'],
+            'pattern': params.get('meal_structure', 'standard'),
+            'restrictions': params.get('restrictions') or [],
+            'cuisines': ['all'],
+            'cooking_methods': ['all'],
+            'measurement_system': 'US',
+            'allow_substitutions': True,
+            'timestamp': datetime.now().isoformat()
+        })
+
+        # Convert day_meals dict to list of meal dictionaries
+        meals_list = list(day_meals.values())
+        day_calories = sum(meal.get('calories', 0) for meal in meals_list)
+        total_calories += day_calories
+
+        all_days.append({
+            'day': day_num,
+            'meals': meals_list,
+            'total_calories': day_calories,
+            'macros': {
+                'protein': sum(meal.get('macros', {}).get('protein', 0) for meal in meals_list),
+                'carbs': sum(meal.get('macros', {}).get('carbs', 0) for meal in meals_list),
+                'fat': sum(meal.get('macros', {}).get('fat', 0) for meal in meals_list)
+            }
+        })
+
+    return {
+        'days': all_days,
+        'total_calories': total_calories,
+        'diet_type': params['diet_type'],
+        'summary': {
+            'total_days': days,
+            'total_meals': sum(len(day['meals']) for day in all_days),
+            'average_daily_calories': total_calories / days if days > 0 else 0
+        }
+    }
+
+
+def _template_engine(optimizer_class: Callable[[], Any]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Adapter for optimizers exposing generate_meal_plan(**params)"""
+    def generate(params: Dict[str, Any]) -> Dict[str, Any]:
+        return optimizer_class().generate_meal_plan(
+            target_calories=params['target_calories'],
+            diet_type=params['diet_type'],
+            meals_per_day=params.get('meals_per_day', 3),
+            days=params.get('days', 1),
+            restrictions=params.get('restrictions') or [],
+            cuisine_preference=params.get('cuisine_preference')
+        )
+    return generate
+
+
+def run_enhanced_engine(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Template-based EnhancedMealOptimizer"""
+    from app.services.enhanced_meal_optimizer import EnhancedMealOptimizer
+    return _template_engine(EnhancedMealOptimizer)(params)
+
+
+def run_basic_engine(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Nearest-calorie MealOptimizer lookup"""
+    from app.services.meal_optimizer import MealOptimizer
+    return _template_engine(MealOptimizer)(params)
+
+
+class OptimizerFacade:
+    """Runs registered engines from most accurate to cheapest within a latency budget"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.engines: Dict[str, EngineProfile] = {}
+        self.default_budget_ms = 2000
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(4)
+        self._max_workers = 4
+        self._results: 'OrderedDict[str, str]' = OrderedDict()
+        self._results_size = 256
+        self._lock = threading.Lock()
+        self._forced_fallback = False
+
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize facade with Flask app"""
+        self.app = app
+        self.default_budget_ms = app.config.get('OPTIMIZER_LATENCY_BUDGET_MS', 2000)
+        self._results_size = app.config.get('OPTIMIZER_RESULT_CACHE_SIZE', 256)
+
+        max_workers = app.config.get('OPTIMIZER_MAX_WORKERS', 4)
+        if max_workers != self._max_workers:
+            self._max_workers = max_workers
+            self._slots = threading.BoundedSemaphore(max_workers)
+            self._executor = None
+
+        for name, budget_ms in app.config.get('OPTIMIZER_ENGINE_BUDGETS_MS', {}).items():
+            if name in self.engines:
+                self.engines[name].budget_ms = budget_ms
+
+        if not hasattr(app, 'extensions'):
+            app.extensions = {}
+        app.extensions['optimizer_facade'] = self
+
+    def register_engine(self, name: str, generate: Callable[[Dict[str, Any]], Dict[str, Any]],
+                        cost_ms_per_day: float, budget_ms: float, fallback: bool = False,
+                        failure_threshold: int = 5, recovery_timeout: int = 60) -> EngineProfile:
+        """Register an engine; registration order is the default preference order"""
+        profile = EngineProfile(
+            name=name,
+            generate=generate,
+            cost_ms_per_day=cost_ms_per_day,
+            budget_ms=budget_ms,
+            fallback=fallback,
+            breaker=CircuitBreaker(failure_threshold, recovery_timeout)
+        )
+        self.engines[name] = profile
+        return profile
+
+    def generate(self, engines: List[str] = None, budget_ms: float = None, **params) -> Dict[str, Any]:
+        """Generate a meal plan, degrading to cheaper engines when needed"""
+        return self.generate_with_engine(engines=engines, budget_ms=budget_ms, **params)[0]
+
+    def generate_with_engine(self, engines: List[str] = None, budget_ms: float = None,
+                             **params) -> Tuple[Dict[str, Any], str]:
+        """Like generate, also returning the name of the engine that produced the plan"""
+        params.setdefault('days', 1)
+        chain = [self.engines[name] for name in (engines or self.engines) if name in self.engines]
+        budget_ms = self.default_budget_ms if budget_ms is None else budget_ms
+        deadline = time.monotonic() + budget_ms / 1000
+        forced = graceful_degradation.feature_flags.get('fallback_meal_generation') and not self._forced_fallback
+
+        last_error = None
+        for position, profile in enumerate(chain):
+            if forced and not profile.fallback:
+                continue
+
+            is_last = position == len(chain) - 1
+            remaining_ms = (deadline - time.monotonic()) * 1000
+            if not is_last and profile.expected_ms(params['days']) > remaining_ms:
+                self._record('optimizer.engine_skipped', profile.name, reason='budget')
+                continue
+
+            started = time.monotonic()
+            try:
+                if is_last:
+                    # Cheapest engine runs inline so there is always an answer
+                    plan = profile.breaker.call(profile.generate, dict(params))
+                else:
+                    timeout_ms = min(profile.budget_ms, remaining_ms)
+                    plan = profile.breaker.call(self._run_with_timeout, profile, params, timeout_ms)
+            except ServiceUnavailableError as e:
+                self._record('optimizer.engine_skipped', profile.name, reason='circuit_open')
+                last_error = e
+                continue
+            except Exception as e:
+                last_error = e
+                if isinstance(e, EngineBudgetExceeded):
+                    self._record('optimizer.engine_skipped', profile.name, reason='timeout')
+                logger.warning(f"Optimizer engine '{profile.name}' failed: {e}")
+                self._update_fallback_flag(profile)
+                continue
+
+            elapsed_ms = (time.monotonic() - started) * 1000
+            profile.record_latency(elapsed_ms, params['days'])
+            self._update_fallback_flag(profile)
+            self._record('optimizer.engine_used', profile.name)
+            self._store_result(params, plan)
+            return plan, profile.name
+
+        cached = self._cached_result(params)
+        if cached is not None:
+            self._record('optimizer.engine_used', 'cache')
+            return cached, 'cache'
+
+        raise last_error or ServiceUnavailableError('No meal plan engine available')
+
+    def _run_with_timeout(self, profile: EngineProfile, params: Dict[str, Any],
+                          timeout_ms: float) -> Dict[str, Any]:
+        """Run an engine on the worker pool, giving up after timeout_ms"""
+        if not self._slots.acquire(blocking=False):
+            # Pool saturated by slow runs: shed load to a cheaper engine
+            raise EngineBudgetExceeded(f"No free optimizer worker for '{profile.name}'")
+
+        try:
+            future = self._get_executor().submit(profile.generate, dict(params))
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=max(0, timeout_ms) / 1000)
+        except FutureTimeoutError:
+            # The run keeps its worker until it finishes; its slot stays taken meanwhile
+            raise EngineBudgetExceeded(f"Engine '{profile.name}' exceeded {timeout_ms:.0f}ms budget")
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers,
+                                                    thread_name_prefix='optimizer')
+            return self._executor
+
+    def _update_fallback_flag(self, profile: EngineProfile):
+        """Mirror the primary engine's circuit state into the degradation flags"""
+        if profile.fallback:
+            return
+        if profile.breaker.state == 'open' and not graceful_degradation.feature_flags.get('fallback_meal_generation'):
+            graceful_degradation._enable_fallback_meal_generation()
+            self._forced_fallback = True
+        elif profile.breaker.state == 'closed' and self._forced_fallback:
+            graceful_degradation._disable_fallback_meal_generation()
+            self._forced_fallback = False
+
+    def _cache_key(self, params: Dict[str, Any]) -> str:
+        return json.dumps(params, sort_keys=True, default=str)
+
+    def _store_result(self, params: Dict[str, Any], plan: Dict[str, Any]):
+        # Stored serialized: callers post-process the plan they get back in place
+        key = self._cache_key(params)
+        serialized = json.dumps(plan, default=str)
+        with self._lock:
+            self._results[key] = serialized
+            self._results.move_to_end(key)
+            while len(self._results) > self._results_size:
+                self._results.popitem(last=False)
+
+    def _cached_result(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            serialized = self._results.get(self._cache_key(params))
+        return json.loads(serialized) if serialized is not None else None
+
+    def _record(self, metric: str, engine: str, **tags):
+        try:
+            from app.services.monitoring_service import monitoring_service
+            monitoring_service.metrics.increment(metric, tags=dict(tags, engine=engine))
+        except Exception:
+            pass
+
+    def get_status(self) -> Dict[str, Any]:
+        """Engine profiles and circuit states"""
+        return {
+            name: {
+                'cost_ms_per_day': profile.cost_ms_per_day,
+                'observed_ms_per_day': profile.observed_ms_per_day,
+                'budget_ms': profile.budget_ms,
+                'fallback': profile.fallback,
+                'circuit_state': profile.breaker.state
+            }
+            for name, profile in self.engines.items()
+        }
+
+
+# Global facade instance, engines listed from most accurate to cheapest
+optimizer_facade = OptimizerFacade()
+optimizer_facade.register_engine('accurate', run_accurate_engine, cost_ms_per_day=50, budget_ms=1500)
+optimizer_facade.register_engine('enhanced', run_enhanced_engine, cost_ms_per_day=5, budget_ms=500, fallback=True)
+optimizer_facade.register_engine('basic', run_basic_engine, cost_ms_per_day=1, budget_ms=250, fallback=True)
@@ -0,0 +1,236 @@
+"""
+Transactional outbox for Cibozer
+Side effects (emails, analytics) are written as rows in the same commit as the
+business write that caused them and delivered by a background worker with retries.
+"""
+
+import os
+import logging
+import threading
+from datetime import datetime, timezone, timedelta
+from typing import Callable, Dict, Any, Optional
+
+from app.extensions import db
+from app.models import OutboxEvent, UsageLog, User
+
+
+logger = logging.getLogger('cibozer.outbox')
+
+
+class OutboxService:
+    """Persistent queue of post-commit side effects drained by a worker thread"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self._handlers: Dict[str, Callable[[Dict[str, Any], OutboxEvent], None]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize outbox with Flask app"""
+        self.app = app
+        app.config.setdefault('OUTBOX_WORKER_ENABLED', not app.testing)
+        app.config.setdefault('OUTBOX_POLL_INTERVAL', 2.0)
+        app.config.setdefault('OUTBOX_BATCH_SIZE', 50)
+        app.config.setdefault('OUTBOX_MAX_ATTEMPTS', 5)
+        app.config.setdefault('OUTBOX_RETRY_BASE_SECONDS', 30)
+        app.config.setdefault('OUTBOX_LOCK_TIMEOUT', 300)
+
+        if not hasattr(app, 'extensions'):
+            app.extensions = {}
+        app.extensions['outbox'] = self
+
+    def register_handler(self, event_type: str):
+        """Decorator registering the delivery function for an event type"""
+        def decorator(func):
+            self._handlers[event_type] = func
+            return func
+        return decorator
+
+    def enqueue(self, event_type: str, payload: Dict[str, Any] = None,
+                user_id: int = None) -> OutboxEvent:
+        """Add an event to the current session without committing.
+
+        The event becomes visible to the worker only when the caller commits,
+        so it is delivered if and only if the surrounding write succeeded.
+        """
+        event = OutboxEvent(
+            event_type=event_type,
+            payload=payload or {},
+            user_id=user_id,
+            status='pending',
+            attempts=0,
+            available_at=datetime.now(timezone.utc)
+        )
+        db.session.add(event)
+        return event
+
+    def notify(self):
+        """Wake the worker after a commit that enqueued events"""
+        self._ensure_worker()
+        self._wakeup.set()
+
+    def process_pending(self, batch_size: int = None) -> int:
+        """Deliver due events; returns how many were attempted.
+
+        Must be called inside an application context.
+        """
+        from flask import current_app
+
+        config = current_app.config
+        batch_size = batch_size or config.get('OUTBOX_BATCH_SIZE', 50)
+        now = datetime.now(timezone.utc)
+        stale_cutoff = now - timedelta(seconds=config.get('OUTBOX_LOCK_TIMEOUT', 300))
+
+        candidate_ids = [row.id for row in db.session.query(OutboxEvent.id).filter(
+            db.or_(
+                db.and_(OutboxEvent.status == 'pending', OutboxEvent.available_at <= now),
+                db.and_(OutboxEvent.status == 'processing', OutboxEvent.locked_at < stale_cutoff)
+            )
+        ).order_by(OutboxEvent.id).limit(batch_size).all()]
+
+        attempted = 0
+        for event_id in candidate_ids:
+            if not self._claim(event_id, now, stale_cutoff):
+                continue
+            attempted += 1
+            self._deliver(db.session.get(OutboxEvent, event_id))
+
+        return attempted
+
+    def _claim(self, event_id: int, now: datetime, stale_cutoff: datetime) -> bool:
+        """Atomically mark an event as processing so only one worker delivers it"""
+        claimed = OutboxEvent.query.filter(
+            OutboxEvent.id == event_id,
+            db.or_(
+                OutboxEvent.status == 'pending',
+                db.and_(OutboxEvent.status == 'processing', OutboxEvent.locked_at < stale_cutoff)
+            )
+        ).update({'status': 'processing', 'locked_at': now}, synchronize_session=False)
+        db.session.commit()
+        return claimed == 1
+
+    def _deliver(self, event: OutboxEvent):
+        """Run the handler for a claimed event and record the outcome"""
+        from flask import current_app
+
+        config = current_app.config
+        handler = self._handlers.get(event.event_type)
+
+        try:
+            if handler is None:
+                raise LookupError(f"No outbox handler registered for '{event.event_type}'")
+            handler(event.payload or {}, event)
+            event.status = 'done'
+            event.processed_at = datetime.now(timezone.utc)
+            event.last_error = None
+        except Exception as e:
+            db.session.rollback()
+            event = db.session.get(OutboxEvent, event.id)
+            event.attempts = (event.attempts or 0) + 1
+            event.last_error = str(e)[:1000]
+            if handler is None or event.attempts >= config.get('OUTBOX_MAX_ATTEMPTS', 5):
+                event.status = 'failed'
+                logger.error(f"Outbox event {event.id} ({event.event_type}) failed permanently: {e}")
+            else:
+                delay = min(config.get('OUTBOX_RETRY_BASE_SECONDS', 30) * 2 ** (event.attempts - 1), 3600)
+                event.status = 'pending'
+                event.available_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+                logger.warning(f"Outbox event {event.id} ({event.event_type}) failed, retrying in {delay}s: {e}")
+
+        event.locked_at = None
+        db.session.commit()
+
+    def start(self):
+        """Start the background worker thread for this process"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._thread_pid == os.getpid():
+                return
+            self._stop.clear()
+            self._thread_pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='outbox-worker', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Signal the worker to stop and wait for it"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _ensure_worker(self):
+        """Start the worker lazily, also after a pre-fork server forked us"""
+        if self.app is None or self.app.testing or not self.app.config.get('OUTBOX_WORKER_ENABLED'):
+            return
+        if self._thread is None or not self._thread.is_alive() or self._thread_pid != os.getpid():
+            self.start()
+
+    def _run(self):
+        """Worker loop"""
+        poll_interval = self.app.config.get('OUTBOX_POLL_INTERVAL', 2.0)
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    attempted = self.process_pending()
+            except Exception as e:
+                logger.error(f"Outbox worker iteration failed: {e}")
+                attempted = 0
+
+            if not attempted:
+                self._wakeup.wait(poll_interval)
+                self._wakeup.clear()
+
+
+# Global outbox instance
+outbox_service = OutboxService()
+
+
+@outbox_service.register_handler('meal_plan_generated')
+def handle_meal_plan_generated(payload: Dict[str, Any], event: OutboxEvent):
+    """Celebrate a user's first meal plan and record generation analytics"""
+    from app.services.monitoring_service import monitoring_service
+
+    # The email may raise for a retry; count the generation only once it succeeded
+    _celebrate_first_meal_plan(payload, event)
+
+    monitoring_service.metrics.increment('meal_plans.generated', tags={
+        'diet_type': str(payload.get('diet_type')),
+        'days': str(payload.get('days'))
+    })
+
+
+def _celebrate_first_meal_plan(payload: Dict[str, Any], event: OutboxEvent):
+    """Send the celebration email if this event is the user's first generation"""
+    from app.services.email_service import email_service
+
+    usage_log_id = payload.get('usage_log_id')
+    if not event.user_id or usage_log_id is None:
+        return
+
+    earlier_generation = db.session.query(UsageLog.id).filter(
+        UsageLog.user_id == event.user_id,
+        UsageLog.action == 'meal_generation',
+        UsageLog.id < usage_log_id
+    ).first()
+    if earlier_generation is not None:
+        return
+
+    user = db.session.get(User, event.user_id)
+    if user is None:
+        return
+
+    sent = email_service.send_first_meal_plan_celebration(user.email, user.full_name, {
+        'days': payload.get('days'),
+        'calories': payload.get('calories'),
+        'diet_type': payload.get('diet_type')
+    })
+    if email_service.enabled and not sent:
+        # Raise so the outbox retries with backoff
+        raise RuntimeError(f"Failed to send first meal plan email to user {event.user_id}")
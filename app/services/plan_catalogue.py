@@ -0,0 +1,164 @@
+"""
+Precomputed meal plan catalogue for Cibozer
+Keeps a small pool of ready-made plans per preset (diet, calories, meals per day)
+so demo traffic is served from memory while a background job refills the pool.
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Dict, List, Any, Optional, Tuple
+
+
+logger = logging.getLogger('cibozer.plan_catalogue')
+
+DEFAULT_DIETS = ['standard', 'vegetarian', 'vegan', 'keto', 'paleo', 'mediterranean', 'high_protein', 'low_carb']
+DEFAULT_CALORIES = [1500, 1800, 2000, 2200, 2500]
+DEFAULT_MEALS_PER_DAY = [3]
+
+
+def generate_plan(target_calories: int, diet_type: str, meals_per_day: int = 3, days: int = 1,
+                  restrictions: List[str] = None, cuisine_preference: str = None) -> Dict[str, Any]:
+    """Generate a plan live, preferring the enhanced optimizer"""
+    from app.services.optimizer_facade import optimizer_facade
+
+    return optimizer_facade.generate(
+        engines=['enhanced', 'basic'],
+        target_calories=target_calories,
+        diet_type=diet_type,
+        meals_per_day=meals_per_day,
+        days=days,
+        restrictions=restrictions or [],
+        cuisine_preference=cuisine_preference
+    )
+
+
+class PlanCatalogue:
+    """In-process pool of pre-generated single-day plans for preset combinations"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.diets = DEFAULT_DIETS
+        self.calories = DEFAULT_CALORIES
+        self.meals_per_day = DEFAULT_MEALS_PER_DAY
+        self.pool_size = 5
+        self.refill_threshold = 2
+        self._pools: Dict[Tuple[str, int, int], deque] = {}
+        self._refilling = set()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'uncatalogued': 0}
+
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize catalogue with Flask app"""
+        self.app = app
+        self.diets = app.config.get('PLAN_CATALOGUE_DIETS', DEFAULT_DIETS)
+        self.calories = app.config.get('PLAN_CATALOGUE_CALORIES', DEFAULT_CALORIES)
+        self.meals_per_day = app.config.get('PLAN_CATALOGUE_MEALS_PER_DAY', DEFAULT_MEALS_PER_DAY)
+        self.pool_size = app.config.get('PLAN_CATALOGUE_POOL_SIZE', 5)
+        self.refill_threshold = app.config.get('PLAN_CATALOGUE_REFILL_THRESHOLD', 2)
+
+        if not hasattr(app, 'extensions'):
+            app.extensions = {}
+        app.extensions['plan_catalogue'] = self
+
+    def preset_keys(self) -> List[Tuple[str, int, int]]:
+        """All catalogued (diet, calories, meals per day) combinations"""
+        return [(diet, calories, meals)
+                for diet in self.diets
+                for calories in self.calories
+                for meals in self.meals_per_day]
+
+    def key_for(self, target_calories: int, diet_type: str, meals_per_day: int = 3, days: int = 1,
+                restrictions: List[str] = None, cuisine_preference: str = None) -> Optional[Tuple[str, int, int]]:
+        """Catalogue key for a request, or None if the combination is not precomputed"""
+        if days != 1 or restrictions or cuisine_preference:
+            return None
+        if diet_type not in self.diets or target_calories not in self.calories \
+                or meals_per_day not in self.meals_per_day:
+            return None
+        return (diet_type, target_calories, meals_per_day)
+
+    def get(self, **params) -> Optional[Dict[str, Any]]:
+        """Take a ready plan from the pool; None means generate live"""
+        key = self.key_for(**params)
+        if key is None:
+            self.stats['uncatalogued'] += 1
+            return None
+
+        with self._lock:
+            pool = self._pools.setdefault(key, deque())
+            plan = pool.popleft() if pool else None
+            needs_refill = len(pool) < self.refill_threshold
+
+        if needs_refill:
+            self.schedule_refill(key)
+
+        if plan is None:
+            self.stats['misses'] += 1
+        else:
+            self.stats['hits'] += 1
+        return plan
+
+    def fill(self, key: Tuple[str, int, int]) -> int:
+        """Top up one pool to pool_size; returns the number of plans added"""
+        diet_type, calories, meals_per_day = key
+        with self._lock:
+            missing = self.pool_size - len(self._pools.setdefault(key, deque()))
+
+        added = 0
+        for _ in range(max(0, missing)):
+            try:
+                plan = generate_plan(calories, diet_type, meals_per_day)
+            except Exception as e:
+                logger.error(f"Failed to pre-generate plan for {key}: {e}")
+                break
+            with self._lock:
+                # A concurrent fill of the same pool may have topped it up meanwhile
+                if len(self._pools[key]) >= self.pool_size:
+                    break
+                self._pools[key].append(plan)
+            added += 1
+        return added
+
+    def warm(self) -> int:
+        """Fill every preset pool; returns the number of plans generated"""
+        total = 0
+        for key in self.preset_keys():
+            total += self.fill(key)
+        logger.info(f"Plan catalogue warmed with {total} plans across {len(self.preset_keys())} presets")
+        return total
+
+    def schedule_refill(self, key: Tuple[str, int, int]):
+        """Refill a pool on a background thread (at most one refill per key)"""
+        if self.app is not None and self.app.testing:
+            return
+        with self._lock:
+            if key in self._refilling:
+                return
+            self._refilling.add(key)
+
+        def refill():
+            try:
+                self.fill(key)
+            finally:
+                with self._lock:
+                    self._refilling.discard(key)
+
+        threading.Thread(target=refill, name='plan-catalogue-refill', daemon=True).start()
+
+    def warm_in_background(self):
+        """Warm all pools without blocking startup"""
+        threading.Thread(target=self.warm, name='plan-catalogue-warm', daemon=True).start()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool occupancy and hit counters"""
+        with self._lock:
+            pooled = sum(len(pool) for pool in self._pools.values())
+        return dict(self.stats, pooled_plans=pooled, presets=len(self.preset_keys()))
+
+
+# Global catalogue instance
+plan_catalogue = PlanCatalogue()
@@ -0,0 +1,73 @@
+"""
+Background migration of saved meal plans to compressed storage
+Rewrites rows still holding plain JSON in small id-ordered batches so the
+migration can run alongside live traffic and resume after interruption.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict
+
+from app.extensions import db
+from app.models.meal_plan import SavedMealPlan, PLAN_DATA_GROUP
+from app.utils.compression import pack_plan
+from sqlalchemy.orm import undefer_group
+
+
+logger = logging.getLogger('cibozer.plan_storage')
+
+# shared_meal_plans stays JSON: the share routes read it through the legacy
+# models.SharedMealPlan, which only knows the meal_plan_data column
+PLAN_MODELS = (SavedMealPlan,)
+
+
+def compress_model_plans(model, batch_size: int = 200, pause: float = 0.0) -> int:
+    """Pack every JSON-stored plan of one model; returns the number of rows rewritten"""
+    converted = 0
+    last_id = 0
+    while True:
+        batch = model.query.options(undefer_group(PLAN_DATA_GROUP)).filter(
+            model.id > last_id,
+            model.meal_plan_blob.is_(None),
+            model._meal_plan_json.isnot(None)
+        ).order_by(model.id).limit(batch_size).all()
+        if not batch:
+            return converted
+
+        for plan in batch:
+            plan.meal_plan_blob = pack_plan(plan._meal_plan_json)
+            plan._meal_plan_json = None
+        last_id = batch[-1].id
+
+        try:
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Failed to compress {model.__tablename__} batch ending at id {last_id}: {e}")
+            raise
+        converted += len(batch)
+        db.session.expunge_all()
+        if pause:
+            time.sleep(pause)
+
+
+def compress_stored_plans(batch_size: int = 200, pause: float = 0.0) -> Dict[str, int]:
+    """Pack all JSON-stored plans of every model in PLAN_MODELS"""
+    results = {}
+    for model in PLAN_MODELS:
+        results[model.__tablename__] = compress_model_plans(model, batch_size, pause)
+        logger.info(f"Compressed {results[model.__tablename__]} rows in {model.__tablename__}")
+    return results
+
+
+def compress_stored_plans_in_background(app, batch_size: int = 200, pause: float = 0.1):
+    """Run the migration on a daemon thread without blocking startup"""
+    def run():
+        with app.app_context():
+            try:
+                compress_stored_plans(batch_size, pause)
+            except Exception as e:
+                logger.error(f"Meal plan compression stopped: {e}")
+
+    threading.Thread(target=run, name='plan-storage-migration', daemon=True).start()
@@ -0,0 +1,251 @@
+"""
+Daily usage rollups and raw usage_logs retention for Cibozer
+A background job folds usage_logs into per (day, action, tier) totals that the
+analytics pages read, then drops raw rows older than the retention window.
+On PostgreSQL usage_logs is range-partitioned by month and old partitions are
+dropped whole instead of deleted row by row.
+"""
+
+import os
+import re
+import logging
+import threading
+from datetime import datetime, date, time, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import func, text
+
+from app.extensions import db, cache
+from app.models import UsageLog, UsageDailyRollup, User
+
+
+logger = logging.getLogger('cibozer.usage_rollup')
+
+ROLLUP_LOCK_KEY = 'lock:usage_rollup'
+PARTITION_NAME = re.compile(r'^usage_logs_y(\d{4})m(\d{2})$')
+
+
+def _as_date(value) -> date:
+    # func.date() returns a string on SQLite and a date on PostgreSQL
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+class UsageRollupService:
+    """Maintains usage_daily_rollups and enforces raw usage_logs retention"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize rollups with Flask app"""
+        self.app = app
+        app.config.setdefault('USAGE_ROLLUP_ENABLED', not app.testing)
+        app.config.setdefault('USAGE_ROLLUP_INTERVAL', 300)
+        app.config.setdefault('USAGE_LOG_RETENTION_DAYS', 0)
+        app.config.setdefault('USAGE_LOG_RETENTION_BATCH_SIZE', 5000)
+        app.config.setdefault('USAGE_LOG_PARTITION_MONTHS_AHEAD', 2)
+
+        if not hasattr(app, 'extensions'):
+            app.extensions = {}
+        app.extensions['usage_rollup'] = self
+
+    # Rollups
+
+    def rolled_up_through(self) -> Optional[date]:
+        """Latest day present in the rollup table"""
+        return _as_date(db.session.query(func.max(UsageDailyRollup.day)).scalar())
+
+    def rollup(self, since: date = None) -> int:
+        """Recompute rollups for every day from ``since`` to today.
+
+        Without ``since`` the job resumes from the last rolled-up day, which is
+        recomputed because it may have been partial. Returns rows written.
+        """
+        if since is None:
+            since = self.rolled_up_through()
+        if since is None:
+            first = db.session.query(func.min(UsageLog.created_at)).scalar()
+            if first is None:
+                return 0
+            since = _as_date(first)
+
+        day = func.date(UsageLog.created_at)
+        tier = func.coalesce(User.subscription_tier, 'free')
+        totals = db.session.query(
+            day,
+            UsageLog.action,
+            tier,
+            func.count(UsageLog.id),
+            func.count(func.distinct(UsageLog.user_id)),
+            func.coalesce(func.sum(UsageLog.credits_used), 0)
+        ).outerjoin(User, User.id == UsageLog.user_id).filter(
+            UsageLog.created_at >= datetime.combine(since, time.min)
+        ).group_by(day, UsageLog.action, tier).all()
+
+        now = datetime.now(timezone.utc)
+        try:
+            UsageDailyRollup.query.filter(UsageDailyRollup.day >= since).delete(synchronize_session=False)
+            db.session.bulk_insert_mappings(UsageDailyRollup, [{
+                'day': _as_date(row_day),
+                'action': action,
+                'tier': row_tier,
+                'event_count': events,
+                'unique_users': users,
+                'credits_used': int(credits or 0),
+                'updated_at': now
+            } for row_day, action, row_tier, events, users, credits in totals])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        logger.info(f"Rolled up {len(totals)} usage rows since {since}")
+        return len(totals)
+
+    # Partitions and retention
+
+    def is_partitioned(self) -> bool:
+        """Whether usage_logs is a native PostgreSQL partitioned table"""
+        if db.engine.dialect.name != 'postgresql':
+            return False
+        return bool(db.session.execute(text(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = 'usage_logs'"
+        )).scalar())
+
+    def partitions(self) -> List[str]:
+        """Monthly partitions of usage_logs, oldest first"""
+        names = db.session.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = 'usage_logs'"
+        )).scalars().all()
+        return sorted(name for name in names if PARTITION_NAME.match(name))
+
+    def ensure_partitions(self, months_ahead: int = None) -> int:
+        """Create monthly partitions up to ``months_ahead`` months from now"""
+        if not self.is_partitioned():
+            return 0
+        if months_ahead is None:
+            months_ahead = self.app.config.get('USAGE_LOG_PARTITION_MONTHS_AHEAD', 2)
+
+        existing = set(self.partitions())
+        created = 0
+        month = _month_start(date.today())
+        for _ in range(months_ahead + 1):
+            name = f"usage_logs_y{month.year:04d}m{month.month:02d}"
+            if name not in existing:
+                db.session.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF usage_logs "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+                ))
+                created += 1
+            month = _next_month(month)
+        db.session.commit()
+        return created
+
+    def retention_cutoff(self) -> Optional[date]:
+        """Raw rows before this day may be dropped; never past the rolled-up range"""
+        retention_days = self.app.config.get('USAGE_LOG_RETENTION_DAYS', 0)
+        rolled_through = self.rolled_up_through()
+        if not retention_days or rolled_through is None:
+            return None
+        return min(date.today() - timedelta(days=retention_days), rolled_through)
+
+    def apply_retention(self) -> int:
+        """Drop raw usage_logs older than the retention window; returns rows removed"""
+        cutoff = self.retention_cutoff()
+        if cutoff is None:
+            return 0
+
+        removed = 0
+        if self.is_partitioned():
+            for name in self.partitions():
+                year, month = map(int, PARTITION_NAME.match(name).groups())
+                if _next_month(date(year, month, 1)) <= cutoff:
+                    removed += db.session.execute(text(f"SELECT COUNT(*) FROM {name}")).scalar()
+                    db.session.execute(text(f"DROP TABLE {name}"))
+                    logger.info(f"Dropped usage_logs partition {name}")
+            db.session.commit()
+
+        # Rows in the default partition, or the whole table without partitioning
+        batch_size = self.app.config.get('USAGE_LOG_RETENTION_BATCH_SIZE', 5000)
+        cutoff_at = datetime.combine(cutoff, time.min)
+        while True:
+            ids = [row.id for row in db.session.query(UsageLog.id).filter(
+                UsageLog.created_at < cutoff_at
+            ).limit(batch_size).all()]
+            if not ids:
+                break
+            UsageLog.query.filter(UsageLog.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+            removed += len(ids)
+
+        if removed:
+            logger.info(f"Removed {removed} usage_logs rows before {cutoff}")
+        return removed
+
+    def run_once(self) -> dict:
+        """One maintenance pass: partitions, rollups, then retention"""
+        return {
+            'partitions_created': self.ensure_partitions(),
+            'rollup_rows': self.rollup(),
+            'raw_rows_removed': self.apply_retention()
+        }
+
+    # Background worker
+
+    def start(self):
+        """Start the background rollup thread for this process"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._thread_pid == os.getpid():
+                return
+            self._stop.clear()
+            self._thread_pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='usage-rollup', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Signal the rollup thread to stop and wait for it"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        """Worker loop; one worker per interval does the pass"""
+        interval = self.app.config.get('USAGE_ROLLUP_INTERVAL', 300)
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    if cache.add(ROLLUP_LOCK_KEY, os.getpid(), timeout=max(int(interval), 1)):
+                        self.run_once()
+            except Exception as e:
+                logger.error(f"Usage rollup iteration failed: {e}")
+                with self.app.app_context():
+                    db.session.rollback()
+
+            self._stop.wait(interval)
+
+
+# Global rollup instance
+usage_rollup = UsageRollupService()
@@ -1,9 +1,417 @@
 """Caching configuration and utilities"""
 from functools import wraps
-from flask import request, current_app
+from flask import request, current_app, make_response, Response
 from app.extensions import cache
+from app.utils.compression import CONTENT_CODINGS, encoded_etag
 import hashlib
 import json
+import math
+import pickle
+import random
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    from app.utils.metrics import MetricsCollector
+except ImportError:
+    # prometheus_client is optional; tier counters are still kept locally
+    MetricsCollector = None
+
+TAG_VERSION_PREFIX = 'tagver:'
+CATALOGUE_TAG = 'catalogue'
+LOCK_PREFIX = 'lock:'
+DEFAULT_STALE_TTL = 60
+DEFAULT_LOCK_TIMEOUT = 30
+
+L1_EPOCH_KEY = 'l1:epoch'
+LATENCY_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500)
+
+# Keys being recomputed in this process; only in-flight keys are held, so
+# per-user and generation-stamped keys don't accumulate
+_refreshing = set()
+_refreshing_guard = threading.Lock()
+
+
+def key_namespace(key):
+    """Namespace of a cache key: the part before the first colon"""
+    return key.split(':', 1)[0] if ':' in key else 'default'
+
+
+def _estimate_size(value):
+    # Roughly what the shared backend stores for this value
+    try:
+        return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+class CacheStats:
+    """Per-namespace hit/miss/eviction counters and read latency histograms"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._namespaces = {}
+    
+    def _namespace(self, namespace):
+        stats = self._namespaces.get(namespace)
+        if stats is None:
+            stats = self._namespaces[namespace] = {
+                'l1_hits': 0, 'l2_hits': 0, 'misses': 0, 'sets': 0, 'evictions': 0,
+                'latency_ms': [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            }
+        return stats
+    
+    def record_get(self, key, outcome, duration):
+        """Count a lookup (``l1_hits``, ``l2_hits`` or ``misses``) and its latency"""
+        elapsed_ms = duration * 1000
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if elapsed_ms <= bound),
+                      len(LATENCY_BUCKETS_MS))
+        with self._lock:
+            stats = self._namespace(key_namespace(key))
+            stats[outcome] += 1
+            stats['latency_ms'][bucket] += 1
+    
+    def record(self, key, counter):
+        with self._lock:
+            self._namespace(key_namespace(key))[counter] += 1
+    
+    def totals(self):
+        with self._lock:
+            return {counter: sum(stats[counter] for stats in self._namespaces.values())
+                    for counter in ('l1_hits', 'l2_hits', 'misses', 'sets', 'evictions')}
+    
+    def snapshot(self):
+        """Counters, hit rate and latency histogram per namespace"""
+        labels = [f"<={bound}" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+        with self._lock:
+            result = {}
+            for namespace, stats in self._namespaces.items():
+                lookups = stats['l1_hits'] + stats['l2_hits'] + stats['misses']
+                result[namespace] = dict(
+                    {k: v for k, v in stats.items() if k != 'latency_ms'},
+                    hit_rate=(stats['l1_hits'] + stats['l2_hits']) / lookups if lookups else 0.0,
+                    latency_ms=dict(zip(labels, stats['latency_ms']))
+                )
+            return result
+
+
+class LocalCache:
+    """Bounded in-process LRU with per-entry TTL"""
+    
+    def __init__(self, max_entries=1024, ttl=30, on_evict=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+    
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires_at, _ = item
+            if time.time() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key, value, timeout=None, size=0):
+        ttl = self.ttl if not timeout else min(timeout, self.ttl)
+        evicted = []
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl, size)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+                self.evictions += 1
+        if self.on_evict:
+            for evicted_key in evicted:
+                self.on_evict(evicted_key)
+    
+    def memory_by_namespace(self):
+        """Estimated bytes held per namespace"""
+        usage = {}
+        with self._lock:
+            for key, (_, _, size) in self._entries.items():
+                namespace = key_namespace(key)
+                usage[namespace] = usage.get(namespace, 0) + size
+        return usage
+    
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self):
+        return len(self._entries)
+
+
+class TieredCache:
+    """Per-worker L1 LRU in front of the shared Flask-Caching backend (L2).
+    
+    L1 entries live for at most ``CACHE_L1_TTL`` seconds. Tagged keys carry
+    their tag generations so they are orphaned immediately on invalidation;
+    bumping the shared epoch stamp flushes every worker's L1 within
+    ``CACHE_L1_EPOCH_CHECK_INTERVAL`` seconds.
+    """
+    
+    def __init__(self, app=None):
+        self.stats = CacheStats()
+        self.l1 = LocalCache(on_evict=self._on_evict)
+        self.enabled = True
+        self.epoch_check_interval = 1.0
+        self._epoch = None
+        self._epoch_checked_at = 0.0
+        
+        if app:
+            self.init_app(app)
+    
+    def init_app(self, app):
+        """Initialize tiers with Flask app"""
+        self.enabled = app.config.get('CACHE_L1_ENABLED', True)
+        self.stats = CacheStats()
+        self.l1 = LocalCache(
+            max_entries=app.config.get('CACHE_L1_MAX_ENTRIES', 1024),
+            ttl=app.config.get('CACHE_L1_TTL', 30),
+            on_evict=self._on_evict
+        )
+        self.epoch_check_interval = app.config.get('CACHE_L1_EPOCH_CHECK_INTERVAL', 1.0)
+        self._epoch = None
+        self._epoch_checked_at = 0.0
+        
+        if not hasattr(app, 'extensions'):
+            app.extensions = {}
+        app.extensions['tiered_cache'] = self
+    
+    def _check_epoch(self):
+        now = time.time()
+        if now - self._epoch_checked_at < self.epoch_check_interval:
+            return
+        self._epoch_checked_at = now
+        epoch = cache.get(L1_EPOCH_KEY)
+        if epoch != self._epoch:
+            self.l1.clear()
+            self._epoch = epoch
+    
+    def _on_evict(self, key):
+        self.stats.record(key, 'evictions')
+    
+    def _record(self, key, outcome, started):
+        self.stats.record_get(key, outcome, time.perf_counter() - started)
+        if MetricsCollector is None:
+            return
+        if outcome == 'misses':
+            MetricsCollector.track_cache_miss('l2')
+        else:
+            MetricsCollector.track_cache_hit(outcome[:2])
+    
+    def get(self, key):
+        started = time.perf_counter()
+        if self.enabled:
+            self._check_epoch()
+            value = self.l1.get(key)
+            if value is not None:
+                self._record(key, 'l1_hits', started)
+                return value
+        
+        value = cache.get(key)
+        if value is None:
+            self._record(key, 'misses', started)
+            return None
+        
+        self._record(key, 'l2_hits', started)
+        if self.enabled:
+            self.l1.set(key, value, size=_estimate_size(value))
+        return value
+    
+    def set(self, key, value, timeout=None):
+        self.stats.record(key, 'sets')
+        if self.enabled:
+            self.l1.set(key, value, timeout, size=_estimate_size(value))
+        return cache.set(key, value, timeout=timeout)
+    
+    def delete(self, key):
+        self.l1.delete(key)
+        return cache.delete(key)
+    
+    def flush_local(self):
+        """Clear L1 in every worker by bumping the shared epoch stamp"""
+        self.l1.clear()
+        cache.set(L1_EPOCH_KEY, _new_generation(), timeout=0)
+    
+    def get_stats(self):
+        """Per-tier hit counts and hit rates"""
+        totals = self.stats.totals()
+        lookups = totals['l1_hits'] + totals['l2_hits'] + totals['misses']
+        return dict(
+            totals,
+            l1_hit_rate=totals['l1_hits'] / lookups if lookups else 0.0,
+            l2_hit_rate=totals['l2_hits'] / lookups if lookups else 0.0,
+            l1_entries=len(self.l1),
+            l1_evictions=self.l1.evictions
+        )
+
+
+# Global two-tier cache instance
+tiered_cache = TieredCache()
+
+
+def user_tag(user_id):
+    """Tag covering everything cached for a user"""
+    return f"user:{user_id}"
+
+
+def plan_tag(plan_id):
+    """Tag covering everything cached for a meal plan"""
+    return f"plan:{plan_id}"
+
+
+def _new_generation():
+    # Random rather than clock-based: a counter lost to eviction or a restart
+    # must not be re-seeded with any value old keys were written under, and
+    # a clock seed repeats within the same millisecond or after N quick bumps
+    return secrets.randbits(62)
+
+
+def tag_versions(tags):
+    """Current generation counter for each tag"""
+    if not tags:
+        return {}
+    
+    version_keys = [f"{TAG_VERSION_PREFIX}{tag}" for tag in tags]
+    versions = dict(zip(tags, cache.get_many(*version_keys)))
+    
+    for tag, version_key in zip(tags, version_keys):
+        if versions[tag] is None:
+            cache.add(version_key, _new_generation(), timeout=0)
+            versions[tag] = cache.get(version_key)
+    
+    return versions
+
+
+def tagged_key(key, tags):
+    """Fold tag generations into a cache key so bumping a tag orphans the entry"""
+    if not tags:
+        return key
+    versions = tag_versions(sorted(set(tags)))
+    stamp = ".".join(f"{tag}={version}" for tag, version in versions.items())
+    return f"{key}|{stamp}"
+
+
+def invalidate_tags(*tags):
+    """Invalidate every entry cached under the given tags in O(1) per tag"""
+    for tag in tags:
+        version_key = f"{TAG_VERSION_PREFIX}{tag}"
+        try:
+            # A result of 1 means the counter was missing and restarted from zero
+            version = cache.cache.inc(version_key)
+            if version is not None and version > 1:
+                continue
+        except Exception as e:
+            current_app.logger.warning(f"Cache tag increment failed for {tag}: {e}")
+        cache.set(version_key, _new_generation(), timeout=0)
+
+
+def _claim_local(key):
+    with _refreshing_guard:
+        if key in _refreshing:
+            return False
+        _refreshing.add(key)
+        return True
+
+
+def _release_local(key):
+    with _refreshing_guard:
+        _refreshing.discard(key)
+
+
+def _acquire_refresh(key, lock_timeout):
+    """Claim the right to recompute ``key`` in this process and across workers"""
+    if not _claim_local(key):
+        return False
+    try:
+        # cache.add only succeeds for the first writer, so it doubles as a
+        # cross-worker lock on Redis and a no-op guard on SimpleCache
+        if cache.add(f"{LOCK_PREFIX}{key}", 1, timeout=lock_timeout):
+            return True
+    except Exception as e:
+        current_app.logger.warning(f"Cache lock unavailable for {key}: {e}")
+        return True
+    _release_local(key)
+    return False
+
+
+def _release_refresh(key):
+    try:
+        cache.delete(f"{LOCK_PREFIX}{key}")
+    finally:
+        _release_local(key)
+
+
+def _should_refresh(entry, now, beta):
+    # Probabilistic early expiry: the closer to expiry and the slower the
+    # recompute, the more likely a single request refreshes ahead of time
+    if entry is None or now >= entry['expires_at']:
+        return True
+    return now - entry['delta'] * beta * math.log(random.random() or 1e-12) >= entry['expires_at']
+
+
+def refresh(key, compute, timeout=300, stale_ttl=DEFAULT_STALE_TTL, cache_if=None):
+    """Recompute ``key`` now and store it in the form ``get_or_compute`` reads"""
+    started = time.time()
+    value = compute()
+    finished = time.time()
+    if cache_if is None or cache_if(value):
+        tiered_cache.set(key, {
+            'value': value,
+            'expires_at': finished + timeout,
+            'delta': finished - started
+        }, timeout=timeout + stale_ttl)
+    return value
+
+
+def get_or_compute(key, compute, timeout=300, stale_ttl=DEFAULT_STALE_TTL, beta=1.0,
+                   lock_timeout=DEFAULT_LOCK_TIMEOUT, cache_if=None):
+    """Read-through cache with single-flight recompute and stale-while-revalidate.
+    
+    Only one caller per key recomputes at a time; the others are served the
+    previous value for up to ``stale_ttl`` seconds past expiry. ``cache_if``
+    decides whether a freshly computed value may be stored.
+    """
+    entry = tiered_cache.get(key)
+    now = time.time()
+    if not _should_refresh(entry, now, beta):
+        return entry['value']
+    
+    locked = _acquire_refresh(key, lock_timeout)
+    if not locked:
+        if entry is not None:
+            return entry['value']
+        # Cold key: wait briefly for the worker that holds the lock
+        deadline = now + lock_timeout
+        while time.time() < deadline:
+            time.sleep(0.05)
+            entry = tiered_cache.get(key)
+            if entry is not None:
+                return entry['value']
+            locked = _acquire_refresh(key, lock_timeout)
+            if locked:
+                break
+    
+    try:
+        return refresh(key, compute, timeout=timeout, stale_ttl=stale_ttl, cache_if=cache_if)
+    finally:
+        if locked:
+            _release_refresh(key)
+
 
 def make_cache_key(*args, **kwargs):
     """Generate cache key from function arguments"""
@@ -36,8 +444,63 @@ def make_cache_key(*args, **kwargs):
     key_string = "|".join(key_parts)
     return hashlib.md5(key_string.encode()).hexdigest()
 
-def cached_route(timeout=300):
-    """Cache route responses"""
+def _serialize_response(response):
+    """Cacheable form of a response, or None if it must not be shared"""
+    if (response.status_code != 200 or response.direct_passthrough
+            or response.is_streamed or 'Set-Cookie' in response.headers):
+        return None
+    body = response.get_data()
+    return {
+        'body': body,
+        'content_type': response.content_type,
+        'etag': hashlib.sha1(body).hexdigest(),
+        'vary': sorted(response.vary)
+    }
+
+
+def _cached_response(entry):
+    response = Response(entry['body'], status=200, content_type=entry['content_type'])
+    response.set_etag(entry['etag'])
+    response.vary.update(entry['vary'])
+    return response
+
+
+def _representation_key():
+    """Request parts that select the representation: query string and Accept"""
+    accept = request.headers.get('Accept', '')
+    return hashlib.md5(request.query_string + b'|' + accept.encode()).hexdigest()
+
+
+def _matching_etag(etag):
+    """The representation ETag the client sent back for ``etag``, if any.
+    
+    compress_response tags each coded variant separately, so the client may
+    hold ``<etag>-gzip`` or ``<etag>-br`` rather than the body's own ETag.
+    """
+    for candidate in (etag, *(encoded_etag(etag, coding) for coding in CONTENT_CODINGS)):
+        if request.if_none_match.contains(candidate):
+            return candidate
+    return None
+
+
+def _not_modified(etag, vary=()):
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.vary.update(vary)
+    return response
+
+
+def cached_route(timeout=300, tags=None, stale_ttl=DEFAULT_STALE_TTL):
+    """Cache route responses.
+    
+    ``tags`` is a list of tags or a callable receiving the view kwargs; the
+    current user's tag is added automatically for authenticated requests.
+    Concurrent misses are coalesced and expired entries are served for
+    ``stale_ttl`` seconds while one request refreshes them. Only the body,
+    content type, Vary and a strong ETag are cached, keyed by query string
+    and Accept header as well as the view arguments; an ``If-None-Match``
+    naming that ETag or one of its compressed variants is answered with 304.
+    """
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
@@ -46,27 +509,49 @@ def cached_route(timeout=300):
                 return f(*args, **kwargs)
             
             # Generate cache key
-            cache_key = make_cache_key(*args, **kwargs)
+            route_tags = list(tags(**kwargs) if callable(tags) else tags or [])
+            from flask_login import current_user
+            if current_user.is_authenticated:
+                route_tags.append(user_tag(current_user.id))
+            route_key = f"route:{make_cache_key(*args, **kwargs)}:{_representation_key()}"
+            cache_key = tagged_key(route_key, route_tags)
             
-            # Try to get from cache
-            cached = cache.get(cache_key)
-            if cached is not None:
-                return cached
+            etag_key = f"{cache_key}:etag"
             
-            # Generate response
-            response = f(*args, **kwargs)
+            validator = tiered_cache.get(etag_key)
+            matched = _matching_etag(validator['etag']) if validator is not None else None
+            if matched is not None:
+                return _not_modified(matched, validator['vary'])
             
-            # Cache successful responses only
-            if hasattr(response, 'status_code') and response.status_code == 200:
-                cache.set(cache_key, response, timeout=timeout)
+            def render():
+                response = make_response(f(*args, **kwargs))
+                entry = _serialize_response(response)
+                if entry is None:
+                    return response
+                tiered_cache.set(etag_key, {'etag': entry['etag'], 'vary': entry['vary']},
+                                 timeout=timeout + stale_ttl)
+                return entry
             
-            return response
+            # Cache successful responses only
+            result = get_or_compute(
+                cache_key,
+                render,
+                timeout=timeout,
+                stale_ttl=stale_ttl,
+                cache_if=lambda value: isinstance(value, dict)
+            )
+            if not isinstance(result, dict):
+                return result
+            matched = _matching_etag(result['etag'])
+            if matched is not None:
+                return _not_modified(matched, result['vary'])
+            return _cached_response(result)
         
         return decorated_function
     return decorator
 
-def cache_user_data(timeout=600):
-    """Cache user-specific data"""
+def cache_user_data(timeout=3600):
+    """Cache user-specific data until the user's tag is invalidated"""
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
@@ -76,10 +561,13 @@ def cache_user_data(timeout=600):
                 return f(*args, **kwargs)
             
             # Create user-specific cache key
-            cache_key = f"user_data:{current_user.id}:{f.__name__}"
+            key = f"user_data:{current_user.id}:{f.__module__}.{f.__name__}"
+            if args or kwargs:
+                key = f"{key}:{make_cache_key(*args, **kwargs)}"
+            cache_key = tagged_key(key, [user_tag(current_user.id)])
             
             # Try cache first
-            cached = cache.get(cache_key)
+            cached = tiered_cache.get(cache_key)
             if cached is not None:
                 return cached
             
@@ -87,7 +575,7 @@ def cache_user_data(timeout=600):
             result = f(*args, **kwargs)
             
             # Cache result
-            cache.set(cache_key, result, timeout=timeout)
+            tiered_cache.set(cache_key, result, timeout=timeout)
             
             return result
         
@@ -96,61 +584,58 @@ def cache_user_data(timeout=600):
 
 def invalidate_user_cache(user_id):
     """Invalidate all cache entries for a user"""
-    # This is a simple implementation - in production, use cache tags
-    cache_keys = [
-        f"user_data:{user_id}:*",
-        f"meal_plans:{user_id}:*",
-        f"user_status:{user_id}"
-    ]
-    
-    for pattern in cache_keys:
-        # Note: This requires cache backend that supports pattern deletion
-        try:
-            cache.delete_many(pattern)
-        except:
-            pass
+    invalidate_tags(user_tag(user_id))
+
+
+def invalidate_plan_cache(plan_id):
+    """Invalidate all cache entries for a meal plan"""
+    invalidate_tags(plan_tag(plan_id))
+
+
+def invalidate_catalogue_cache():
+    """Invalidate every entry derived from the preset plan catalogue"""
+    invalidate_tags(CATALOGUE_TAG)
 
 def warm_cache():
     """Pre-warm cache with common data"""
-    from app.models import User, SavedMealPlan
-    from flask import current_app
-    
-    current_app.logger.info("Starting cache warming...")
+    from app.services.cache_warmer import cache_warmer
     
-    # Cache commonly accessed data
+    return cache_warmer.run_once(force=True)
+
+
+def _backend_memory():
+    """Memory used by the shared backend, where the backend can report it"""
+    backend = cache.cache
     try:
-        # Cache user count
-        user_count = User.query.count()
-        cache.set('stats:user_count', user_count, timeout=3600)
-        
-        # Cache recent public meal plans
-        public_plans = SavedMealPlan.query.filter_by(is_public=True)\
-            .order_by(SavedMealPlan.created_at.desc()).limit(10).all()
-        
-        public_plan_data = [{
-            'id': plan.id,
-            'name': plan.name,
-            'diet_type': plan.diet_type,
-            'total_calories': plan.total_calories
-        } for plan in public_plans]
-        
-        cache.set('public:recent_plans', public_plan_data, timeout=1800)
-        
-        current_app.logger.info(f"Cache warmed: {user_count} users, {len(public_plans)} public plans")
-        
+        client = getattr(backend, '_read_client', None) or getattr(backend, '_write_client', None)
+        if client is not None:
+            info = client.info()
+            return {'bytes': info.get('used_memory'), 'evicted_keys': info.get('evicted_keys')}
+        entries = getattr(backend, '_cache', None)
+        if entries is not None:
+            return {'bytes': sum(len(item[1]) if isinstance(item[1], (bytes, str)) else 0
+                                 for item in list(entries.values())),
+                    'keys': len(entries)}
     except Exception as e:
-        current_app.logger.error(f"Cache warming failed: {e}")
+        current_app.logger.warning(f"Cache backend memory unavailable: {e}")
+    return {}
 
 
 def get_cache_stats():
     """Get cache performance statistics"""
     try:
-        # This would need to be implemented based on the cache backend
+        namespaces = tiered_cache.stats.snapshot()
+        for namespace, usage in tiered_cache.l1.memory_by_namespace().items():
+            namespaces.setdefault(namespace, {})['l1_bytes'] = usage
         return {
-            'cache_type': cache.cache._cache.__class__.__name__,
-            'status': 'active'
+            'cache_type': cache.cache.__class__.__name__,
+            'status': 'active',
+            'tiers': tiered_cache.get_stats(),
+            'namespaces': namespaces,
+            'backend_memory': _backend_memory()
         }
-    except:
+    except Exception as e:
+        current_app.logger.error(f"Cache stats unavailable: {e}")
         return {'status': 'unknown'}
 
 # Cache configuration for different environments
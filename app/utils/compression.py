@@ -0,0 +1,255 @@
+"""Response compression and compact JSON encoding for large payloads"""
+import gzip
+import json
+import zlib
+from flask import current_app, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/javascript',
+    'text/xml',
+}
+
+# Content codings compress_response may apply
+CONTENT_CODINGS = ('br', 'gzip')
+
+COMPACT_ENCODING = 'cibozer-dict-v1'
+COMPACT_MIMETYPE = 'application/vnd.cibozer.compact+json'
+
+# First byte of a packed plan identifies the codec
+PLAN_CODEC_ZLIB = b'z'
+PLAN_CODEC_ZSTD = b's'
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes with orjson when it is installed.
+
+    Dates, dataclasses and other non-native types still go through Flask's
+    default hook, so the output matches the stock provider.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs.get('indent') or 'cls' in kwargs:
+            return super().dumps(obj, **kwargs)
+
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+
+        try:
+            return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option).decode('utf-8')
+        except (orjson.JSONEncodeError, TypeError):
+            # Integers beyond 64 bits, exotic key types, etc.
+            return super().dumps(obj, **kwargs)
+
+
+def compact_encode(data):
+    """Dictionary-encode repeated ingredient names in a meal plan payload.
+
+    Every string found in an ``ingredients`` list (or the ``item``/``name`` of an
+    ingredient dict) is replaced by its index in a shared string table.
+    """
+    strings = []
+    index = {}
+
+    def intern(value):
+        if value not in index:
+            index[value] = len(strings)
+            strings.append(value)
+        return index[value]
+
+    def encode_ingredient(ingredient):
+        if isinstance(ingredient, str):
+            return intern(ingredient)
+        encoded = walk(ingredient)
+        if isinstance(encoded, dict):
+            for field in ('item', 'name'):
+                if isinstance(encoded.get(field), str):
+                    encoded[field] = intern(encoded[field])
+        return encoded
+
+    def walk(node):
+        if isinstance(node, dict):
+            return {
+                key: [encode_ingredient(i) for i in value]
+                if key == 'ingredients' and isinstance(value, list) else walk(value)
+                for key, value in node.items()
+            }
+        if isinstance(node, list):
+            return [walk(item) for item in node]
+        return node
+
+    data = walk(data)
+    return {'encoding': COMPACT_ENCODING, 'strings': strings, 'data': data}
+
+
+def compact_decode(document):
+    """Reverse of compact_encode."""
+    strings = document['strings']
+
+    def decode_ingredient(ingredient):
+        if isinstance(ingredient, int) and not isinstance(ingredient, bool):
+            return strings[ingredient]
+        decoded = walk(ingredient)
+        if isinstance(decoded, dict):
+            for field in ('item', 'name'):
+                if isinstance(decoded.get(field), int) and not isinstance(decoded.get(field), bool):
+                    decoded[field] = strings[decoded[field]]
+        return decoded
+
+    def walk(node):
+        if isinstance(node, dict):
+            return {
+                key: [decode_ingredient(i) for i in value]
+                if key == 'ingredients' and isinstance(value, list) else walk(value)
+                for key, value in node.items()
+            }
+        if isinstance(node, list):
+            return [walk(item) for item in node]
+        return node
+
+    return walk(document['data'])
+
+
+def pack_plan(data):
+    """Binary storage form of a meal plan: compact-encoded JSON, then zstd or zlib."""
+    document = compact_encode(data)
+    if orjson is not None:
+        raw = orjson.dumps(document, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        raw = json.dumps(document, separators=(',', ':')).encode('utf-8')
+
+    if zstandard is not None:
+        return PLAN_CODEC_ZSTD + zstandard.ZstdCompressor(level=9).compress(raw)
+    return PLAN_CODEC_ZLIB + zlib.compress(raw, 9)
+
+
+def unpack_plan(blob):
+    """Reverse of pack_plan."""
+    blob = bytes(blob)
+    codec, payload = blob[:1], blob[1:]
+    if codec == PLAN_CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError('zstandard is required to read this meal plan')
+        raw = zstandard.ZstdDecompressor().decompress(payload)
+    elif codec == PLAN_CODEC_ZLIB:
+        raw = zlib.decompress(payload)
+    else:
+        raise ValueError(f'Unknown meal plan codec {codec!r}')
+
+    document = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    return compact_decode(document)
+
+
+def wants_compact_encoding():
+    """Check if the client opted into the dictionary-encoded format"""
+    if request.args.get('encoding') == 'compact':
+        return True
+    return request.accept_mimetypes.quality(COMPACT_MIMETYPE) > 0 and \
+        request.accept_mimetypes.best == COMPACT_MIMETYPE
+
+
+def json_response(payload, status=200):
+    """JSON response for plan payloads, compact-encoded when the client asks for it"""
+    compact = wants_compact_encoding()
+    body = compact_encode(payload) if compact else payload
+
+    response = current_app.response_class(
+        current_app.json.dumps(body),
+        status=status,
+        mimetype=COMPACT_MIMETYPE if compact else 'application/json'
+    )
+    response.vary.add('Accept')
+    return response
+
+
+def negotiate_encoding():
+    """Pick the best content coding supported by both sides"""
+    accept = request.accept_encodings
+    if brotli is not None and accept.quality('br') > 0:
+        return 'br'
+    if accept.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+
+def encoded_etag(etag, encoding):
+    """ETag of the ``encoding``-coded representation of a body tagged ``etag``"""
+    return f'{etag}-{encoding}'
+
+
+def compress_response(response):
+    """Compress eligible responses above the configured size threshold"""
+    config = current_app.config
+    if not config.get('COMPRESS_ENABLED', True):
+        return response
+
+    if (response.direct_passthrough or response.is_streamed
+            or not 200 <= response.status_code < 300 or response.status_code == 204
+            or 'Content-Encoding' in response.headers
+            or (response.mimetype not in COMPRESSIBLE_MIMETYPES and response.mimetype != COMPACT_MIMETYPE)):
+        return response
+
+    response.vary.add('Accept-Encoding')
+
+    body = response.get_data()
+    if len(body) < config.get('COMPRESS_MIN_SIZE', 1024):
+        return response
+
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+
+    if encoding == 'br':
+        compressed = brotli.compress(body, quality=config.get('COMPRESS_BR_LEVEL', 5))
+    else:
+        compressed = gzip.compress(body, compresslevel=config.get('COMPRESS_LEVEL', 6), mtime=0)
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    response.headers['Content-Length'] = str(len(compressed))
+
+    # A strong ETag identifies one representation, so tag the encoded variant
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(encoded_etag(etag, encoding), weak=weak)
+
+    return response
+
+
+def configure_response_compression(app):
+    """Configure JSON serialization and response compression for the application"""
+    app.json_provider_class = FastJSONProvider
+    app.json = FastJSONProvider(app)
+
+    app.config.setdefault('COMPRESS_ENABLED', True)
+    app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+    app.config.setdefault('COMPRESS_BR_LEVEL', 5)
+
+    @app.after_request
+    def compress(response):
+        return compress_response(response)
+
+    return app
@@ -4,60 +4,10 @@ import logging
 from contextlib import contextmanager
 from functools import wraps
 from flask import current_app
-from sqlalchemy import text, event
-from sqlalchemy.engine import Engine
+from sqlalchemy import text
 from app.extensions import db
-
-
-# Performance metrics storage
-query_metrics = {
-    'slow_queries': [],
-    'query_counts': {},
-    'total_queries': 0,
-    'total_time': 0.0
-}
-
-
-@event.listens_for(Engine, 'before_cursor_execute')
-def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-    """Record query start time."""
-    conn.info.setdefault('query_start_time', []).append(time.time())
-
-
-@event.listens_for(Engine, 'after_cursor_execute')
-def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-    """Record query execution time and log slow queries."""
-    total = time.time() - conn.info['query_start_time'].pop(-1)
-    
-    # Update metrics
-    query_metrics['total_queries'] += 1
-    query_metrics['total_time'] += total
-    
-    # Count query types
-    query_type = statement.strip().split()[0].upper()
-    query_metrics['query_counts'][query_type] = query_metrics['query_counts'].get(query_type, 0) + 1
-    
-    # Log slow queries (>1 second)
-    if total > 1.0:
-        # Truncate long statements for logging
-        truncated_statement = statement[:500] + '...' if len(statement) > 500 else statement
-        
-        slow_query = {
-            'statement': truncated_statement,
-            'parameters': str(parameters)[:200] if parameters else None,
-            'duration': total,
-            'timestamp': time.time()
-        }
-        
-        query_metrics['slow_queries'].append(slow_query)
-        
-        # Keep only last 50 slow queries
-        if len(query_metrics['slow_queries']) > 50:
-            query_metrics['slow_queries'] = query_metrics['slow_queries'][-50:]
-        
-        current_app.logger.warning(
-            f"Slow query detected ({total:.2f}s): {truncated_statement}"
-        )
+from app.utils.db_pool import get_pool_stats
+from app.utils.query_profiler import query_profiler
 
 
 class DatabaseProfiler:
@@ -113,13 +63,18 @@ def log_query_performance(func):
     def wrapper(*args, **kwargs):
         start_time = time.time()
         
-        # Record initial query count
-        initial_queries = query_metrics['total_queries']
+        # Record initial query count for this request
+        profile = query_profiler.current()
+        initial_queries = profile.count if profile else 0
+        
+        def queries_since_start():
+            current = query_profiler.current()
+            return current.count - initial_queries if current else 0
         
         try:
             result = func(*args, **kwargs)
             duration = time.time() - start_time
-            queries_executed = query_metrics['total_queries'] - initial_queries
+            queries_executed = queries_since_start()
             
             if duration > 0.5 or queries_executed > 10:  # Log if slow or many queries
                 current_app.logger.info(
@@ -130,7 +85,7 @@ def log_query_performance(func):
             
         except Exception as e:
             duration = time.time() - start_time
-            queries_executed = query_metrics['total_queries'] - initial_queries
+            queries_executed = queries_since_start()
             current_app.logger.error(
                 f"Function {func.__name__} failed after {queries_executed} queries in {duration:.2f}s: {str(e)}"
             )
@@ -142,9 +97,7 @@ def log_query_performance(func):
 def get_database_stats():
     """Get current database performance statistics."""
     try:
-        # Get connection pool info
         engine = db.get_engine()
-        pool = engine.pool
         
         # Get database size (SQLite specific)
         db_size = None
@@ -162,13 +115,8 @@ def get_database_stats():
             pass
         
         return {
-            'query_metrics': query_metrics.copy(),
-            'connection_pool': {
-                'size': pool.size(),
-                'checked_out': pool.checkedout(),
-                'overflow': pool.overflow(),
-                'invalid': pool.invalid()
-            },
+            'query_metrics': query_profiler.summary(),
+            'connection_pool': get_pool_stats(),
             'database_info': {
                 'size_bytes': db_size,
                 'table_count': table_count,
@@ -188,10 +136,12 @@ def analyze_query_patterns():
         'performance_issues': []
     }
     
+    summary = query_profiler.summary()
+    
     # Analyze query types
-    total_queries = query_metrics['total_queries']
+    total_queries = summary['total_queries']
     if total_queries > 0:
-        for query_type, count in query_metrics['query_counts'].items():
+        for query_type, count in summary['query_counts'].items():
             percentage = (count / total_queries) * 100
             analysis['patterns'][query_type] = {
                 'count': count,
@@ -208,15 +158,26 @@ def analyze_query_patterns():
                     "High UPDATE ratio - ensure proper indexing on updated columns"
                 )
     
+    # Analyze N+1 patterns
+    for finding in summary['n_plus_one']:
+        analysis['performance_issues'].append(
+            f"{finding['endpoint']} ran one statement {finding['count']} times in a request: "
+            f"{finding['fingerprint'][:120]}"
+        )
+    if summary['n_plus_one']:
+        analysis['recommendations'].append(
+            "Repeated per-row queries detected - eager load the relationship or batch the lookups"
+        )
+    
     # Analyze slow queries
-    if query_metrics['slow_queries']:
-        avg_slow_time = sum(q['duration'] for q in query_metrics['slow_queries']) / len(query_metrics['slow_queries'])
+    if summary['slow_queries']:
+        avg_slow_time = sum(q['duration'] for q in summary['slow_queries']) / len(summary['slow_queries'])
         analysis['performance_issues'].append(
-            f"Found {len(query_metrics['slow_queries'])} slow queries (avg: {avg_slow_time:.2f}s)"
+            f"Found {len(summary['slow_queries'])} slow queries (avg: {avg_slow_time:.2f}s)"
         )
         
         # Common slow query patterns
-        slow_statements = [q['statement'] for q in query_metrics['slow_queries']]
+        slow_statements = [q['statement'] for q in summary['slow_queries']]
         
         if any('JOIN' in stmt for stmt in slow_statements):
             analysis['recommendations'].append(
@@ -239,33 +200,34 @@ def analyze_query_patterns():
 def optimize_connection_pool():
     """Optimize database connection pool settings."""
     try:
-        engine = db.get_engine()
-        pool = engine.pool
+        stats = get_pool_stats()
+        if 'size' not in stats:
+            return {'current_settings': stats, 'recommendations': []}
         
         # Check pool utilization
-        utilization = pool.checkedout() / pool.size() if pool.size() > 0 else 0
+        capacity = stats['size'] + stats['max_overflow']
+        utilization = stats['checked_out'] / capacity if capacity > 0 else 0
         
         recommendations = []
         
+        if stats['timeouts']:
+            recommendations.append(
+                f"{stats['timeouts']} checkouts timed out waiting for a connection - "
+                "raise DB_MAX_CONNECTIONS or reduce per-request connection hold time"
+            )
+        elif stats['max_waiting'] > stats['size']:
+            recommendations.append("Requests queued for connections - consider increasing pool size")
+        
         if utilization > 0.8:
             recommendations.append("Pool utilization high (>80%) - consider increasing pool size")
         elif utilization < 0.2:
             recommendations.append("Pool utilization low (<20%) - consider decreasing pool size")
         
-        if pool.overflow() > pool.size() * 0.5:
+        if stats['checkouts'] and stats['overflow_checkouts'] > stats['checkouts'] * 0.1:
             recommendations.append("High overflow usage - consider increasing base pool size")
         
-        if pool.invalid() > 0:
-            recommendations.append(f"Found {pool.invalid()} invalid connections - check connection stability")
-        
         return {
-            'current_settings': {
-                'pool_size': pool.size(),
-                'overflow': pool.overflow(),
-                'checked_out': pool.checkedout(),
-                'invalid': pool.invalid(),
-                'utilization': f"{utilization:.1%}"
-            },
+            'current_settings': dict(stats, utilization=f"{utilization:.1%}"),
             'recommendations': recommendations
         }
         
@@ -319,13 +281,7 @@ def run_database_maintenance():
 
 def clear_query_metrics():
     """Clear accumulated query metrics."""
-    global query_metrics
-    query_metrics = {
-        'slow_queries': [],
-        'query_counts': {},
-        'total_queries': 0,
-        'total_time': 0.0
-    }
+    query_profiler.reset()
     current_app.logger.info("Query metrics cleared")
 
 
@@ -1,12 +1,30 @@
-"""Database timeout utilities for robust database operations."""
-import signal
+"""Database timeout utilities for robust database operations.
+
+Timeouts are enforced per statement by the database itself: ``statement_timeout``
+on PostgreSQL and a progress-handler interrupt on SQLite. Unlike SIGALRM this
+works in any thread or greenlet and has millisecond granularity.
+"""
+import sqlite3
 import time
 from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import wraps
-from flask import current_app
-from sqlalchemy import text
+from typing import Optional
+from flask import current_app, has_request_context, request
+from sqlalchemy import event, text
 from sqlalchemy.exc import OperationalError, TimeoutError
 from app.extensions import db
+from app.utils.db_routing import database_engines
+
+
+# PostgreSQL SQLSTATE for a statement cancelled by statement_timeout
+QUERY_CANCELED = '57014'
+
+# SQLite VM instructions between deadline checks
+SQLITE_PROGRESS_STEPS = 1000
+
+# Explicit timeout (ms) for the current thread/greenlet, set by database_timeout()
+_timeout_override: ContextVar[Optional[int]] = ContextVar('statement_timeout_ms', default=None)
 
 
 class DatabaseTimeoutError(Exception):
@@ -14,40 +32,143 @@ class DatabaseTimeoutError(Exception):
     pass
 
 
-@contextmanager
-def database_timeout(timeout_seconds=30):
-    """Context manager that adds timeout to database operations."""
-    def timeout_handler(signum, frame):
-        raise DatabaseTimeoutError(f"Database operation timed out after {timeout_seconds} seconds")
+class StatementTimeoutError(DatabaseTimeoutError):
+    """Raised when the database cancelled a statement that exceeded its budget."""
+    pass
+
+
+def is_statement_timeout(error) -> bool:
+    """Whether a driver error is a statement cancelled by its timeout."""
+    orig = getattr(error, 'orig', error)
+    if getattr(orig, 'pgcode', None) == QUERY_CANCELED:
+        return True
+    return isinstance(orig, sqlite3.OperationalError) and str(orig) == 'interrupted'
+
+
+class StatementTimeouts:
+    """Applies per-statement timeouts by endpoint class (interactive, admin, batch)"""
     
-    # Set up timeout signal (Unix only)
-    old_handler = None
-    try:
-        if hasattr(signal, 'SIGALRM'):
-            old_handler = signal.signal(signal.SIGALRM, timeout_handler)
-            signal.alarm(timeout_seconds)
+    def __init__(self, app=None):
+        self.budgets = {'interactive': 5000, 'admin': 30000, 'batch': 0}
+        self.admin_blueprints = frozenset({'admin'})
+        
+        if app:
+            self.init_app(app)
+    
+    def init_app(self, app):
+        """Read budgets and install the engine hooks"""
+        app.config.setdefault('DB_STATEMENT_TIMEOUTS', dict(self.budgets))
+        app.config.setdefault('DB_ADMIN_BLUEPRINTS', ['admin'])
+        self.budgets = {**self.budgets, **app.config['DB_STATEMENT_TIMEOUTS']}
+        self.admin_blueprints = frozenset(app.config['DB_ADMIN_BLUEPRINTS'])
+        
+        with app.app_context():
+            # Primary and read replica engines alike
+            for engine in database_engines():
+                self.install(engine)
+        
+        if not hasattr(app, 'extensions'):
+            app.extensions = {}
+        app.extensions['statement_timeouts'] = self
+    
+    def budget_ms(self, name: str) -> int:
+        """Timeout in milliseconds for a named budget (0 = no limit)"""
+        return int(self.budgets[name])
+    
+    def current_ms(self) -> int:
+        """Timeout for the statement about to run in this context"""
+        override = _timeout_override.get()
+        if override is not None:
+            return override
+        if has_request_context():
+            if request.blueprint in self.admin_blueprints:
+                return self.budget_ms('admin')
+            return self.budget_ms('interactive')
+        # CLI commands and background workers
+        return self.budget_ms('batch')
+    
+    def install(self, engine):
+        """Register connection and cursor hooks on ``engine`` (idempotent)"""
+        if event.contains(engine, 'before_cursor_execute', self._before_cursor_execute):
+            return
+        if engine.dialect.name == 'postgresql':
+            event.listen(engine, 'connect', self._on_connect)
+        event.listen(engine, 'checkin', self._on_checkin)
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'commit', self._end_transaction)
+        event.listen(engine, 'rollback', self._end_transaction)
+    
+    def _on_connect(self, dbapi_connection, connection_record):
+        # PostgreSQL sessions start with the interactive budget so the common
+        # case needs no per-transaction SET LOCAL
+        baseline = self.budget_ms('interactive')
+        autocommit = dbapi_connection.autocommit
+        dbapi_connection.autocommit = True
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"SET statement_timeout = {baseline}")
+        cursor.close()
+        dbapi_connection.autocommit = autocommit
+        connection_record.info['statement_timeout_ms'] = baseline
+    
+    def _on_checkin(self, dbapi_connection, connection_record):
+        connection_record.info.pop('statement_timeout_txn_ms', None)
+        if isinstance(dbapi_connection, sqlite3.Connection):
+            dbapi_connection.set_progress_handler(None, 0)
+    
+    def _end_transaction(self, conn):
+        # SET LOCAL ends with the transaction
+        conn.info.pop('statement_timeout_txn_ms', None)
+    
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        timeout_ms = self.current_ms()
         
+        if conn.dialect.name == 'postgresql':
+            info = conn.info
+            applied = info.get('statement_timeout_txn_ms', info.get('statement_timeout_ms'))
+            if timeout_ms != applied:
+                cursor.execute(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+                info['statement_timeout_txn_ms'] = timeout_ms
+        
+        elif conn.dialect.name == 'sqlite':
+            dbapi_connection = conn.connection.dbapi_connection
+            if timeout_ms:
+                deadline = time.monotonic() + timeout_ms / 1000
+                dbapi_connection.set_progress_handler(lambda: time.monotonic() > deadline,
+                                                      SQLITE_PROGRESS_STEPS)
+            else:
+                dbapi_connection.set_progress_handler(None, 0)
+
+
+# Global statement timeout instance
+statement_timeouts = StatementTimeouts()
+
+
+@contextmanager
+def database_timeout(timeout_seconds=30, budget=None):
+    """Limit each statement run inside the block to ``timeout_seconds`` or a named budget."""
+    timeout_ms = statement_timeouts.budget_ms(budget) if budget else int(timeout_seconds * 1000)
+    token = _timeout_override.set(timeout_ms)
+    try:
         yield
         
     except DatabaseTimeoutError:
         raise
     except (OperationalError, TimeoutError) as e:
+        if is_statement_timeout(e):
+            current_app.logger.error(f"Database statement exceeded {timeout_ms}ms: {e}")
+            raise StatementTimeoutError(f"Database statement timed out after {timeout_ms}ms") from e
         current_app.logger.error(f"Database operation failed: {e}")
         raise DatabaseTimeoutError(f"Database operation failed: {str(e)}")
     finally:
-        # Clear timeout
-        if hasattr(signal, 'SIGALRM'):
-            signal.alarm(0)
-            if old_handler is not None:
-                signal.signal(signal.SIGALRM, old_handler)
+        _timeout_override.reset(token)
 
 
-def with_database_timeout(timeout_seconds=30):
+def with_database_timeout(timeout_seconds=30, budget=None):
     """Decorator that adds timeout to database operations."""
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            with database_timeout(timeout_seconds):
+            with database_timeout(timeout_seconds, budget=budget):
                 return func(*args, **kwargs)
         return wrapper
     return decorator
@@ -91,8 +212,9 @@ def safe_database_commit():
 class DatabaseOperation:
     """Class for managing database operations with timeouts and retries."""
     
-    def __init__(self, timeout_seconds=30, max_retries=3, retry_delay=1):
+    def __init__(self, timeout_seconds=30, max_retries=3, retry_delay=1, budget=None):
         self.timeout_seconds = timeout_seconds
+        self.budget = budget
         self.max_retries = max_retries
         self.retry_delay = retry_delay
     
@@ -102,9 +224,14 @@ class DatabaseOperation:
         
         for attempt in range(self.max_retries + 1):
             try:
-                with database_timeout(self.timeout_seconds):
+                with database_timeout(self.timeout_seconds, budget=self.budget):
                     return operation()
-                    
+            
+            except StatementTimeoutError:
+                # Re-running a query that exceeded its budget only repeats the load
+                db.session.rollback()
+                raise
+            
             except DatabaseTimeoutError as e:
                 last_error = e
                 current_app.logger.warning(
@@ -236,6 +236,7 @@ class DatabaseValidator:
         try:
             # Check for meal plans with empty/null JSON data
             meal_plans_invalid_json = SavedMealPlan.query.filter(
+                SavedMealPlan.meal_plan_blob.is_(None),
                 db.or_(
                     SavedMealPlan.meal_plan_data.is_(None),
                     SavedMealPlan.meal_plan_data == {}
@@ -0,0 +1,220 @@
+"""
+Database connection pool sizing and instrumentation
+Engine options are derived at app creation from the worker and thread counts
+so that every process fits under the server's connection limit, and the pool
+records checkout latency, waiters, overflow use and connection ages.
+"""
+
+import time
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app.extensions import db
+
+
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+AGE_BUCKETS_S = (60, 300, 900, 1800, 3600, 7200)
+
+
+def _bucket(value, bounds):
+    return next((i for i, bound in enumerate(bounds) if value <= bound), len(bounds))
+
+
+def _labelled(counts, bounds, unit):
+    labels = [f"<={bound}{unit}" for bound in bounds] + [f">{bounds[-1]}{unit}"]
+    return dict(zip(labels, counts))
+
+
+def pool_size_for(config):
+    """Pool size and overflow for one worker process.
+
+    Each request thread and background worker holds at most one connection, so
+    that is the steady-state pool; overflow absorbs spikes up to the same size
+    again, capped by this process's share of DB_MAX_CONNECTIONS.
+    """
+    workers = max(int(config.get('DB_POOL_WORKERS', 4)), 1)
+    threads = max(int(config.get('DB_POOL_THREADS', 1)), 1)
+    background = int(config.get('DB_POOL_BACKGROUND_CONNECTIONS', 2))
+    available = int(config.get('DB_MAX_CONNECTIONS', 100)) - int(config.get('DB_RESERVED_CONNECTIONS', 10))
+
+    per_worker = max(available // workers, 1)
+    pool_size = min(threads + background, per_worker)
+    max_overflow = max(min(pool_size, per_worker - pool_size), 0)
+    return pool_size, max_overflow
+
+
+def configure_engine_options(app):
+    """Fill SQLALCHEMY_ENGINE_OPTIONS before the engine is created.
+
+    Explicit entries in SQLALCHEMY_ENGINE_OPTIONS win over derived ones.
+    """
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+    explicit = app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+
+    if uri.startswith('sqlite'):
+        if ':memory:' in uri or uri.rstrip('/') == 'sqlite:':
+            return explicit
+        derived = {
+            'connect_args': {
+                'timeout': 30,  # Seconds to wait on a locked database
+                'check_same_thread': False,  # Allow SQLite to be used across threads
+                'isolation_level': None  # Use autocommit mode for better performance
+            }
+        }
+    else:
+        pool_size, max_overflow = pool_size_for(app.config)
+        derived = {
+            'poolclass': InstrumentedQueuePool,
+            'pool_size': pool_size,
+            'max_overflow': max_overflow,
+            'pool_timeout': app.config.get('DB_POOL_TIMEOUT', 10),
+            'pool_recycle': app.config.get('DB_POOL_RECYCLE', 1800),
+            'pool_pre_ping': True,
+            'pool_use_lifo': True,  # Idle connections beyond the steady state age out
+            'connect_args': {
+                'connect_timeout': 10,
+                'application_name': 'Cibozer'
+            }
+        }
+
+    options = dict(derived, **explicit)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    return options
+
+
+class PoolStats:
+    """Checkout, wait-queue, overflow and connection age counters for this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.overflow_checkouts = 0
+            self.timeouts = 0
+            self.waiting = 0
+            self.max_waiting = 0
+            self.connections_opened = 0
+            self.connections_closed = 0
+            self.wait_ms = [0] * (len(WAIT_BUCKETS_MS) + 1)
+            self.age_at_checkout = [0] * (len(AGE_BUCKETS_S) + 1)
+            self.lifetime = [0] * (len(AGE_BUCKETS_S) + 1)
+
+    def wait_started(self):
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def wait_finished(self, duration=None, overflow=False, timed_out=False):
+        bucket = _bucket(duration * 1000, WAIT_BUCKETS_MS) if duration is not None else None
+        with self._lock:
+            self.waiting -= 1
+            if timed_out:
+                self.timeouts += 1
+            if bucket is not None:
+                self.checkouts += 1
+                self.wait_ms[bucket] += 1
+                if overflow:
+                    self.overflow_checkouts += 1
+
+    def record_connect(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    def record_checkout_age(self, age):
+        bucket = _bucket(age, AGE_BUCKETS_S)
+        with self._lock:
+            self.age_at_checkout[bucket] += 1
+
+    def record_close(self, lifetime):
+        bucket = _bucket(lifetime, AGE_BUCKETS_S)
+        with self._lock:
+            self.connections_closed += 1
+            self.lifetime[bucket] += 1
+
+    def snapshot(self, pool=None):
+        """Counters and histograms, plus live pool gauges when ``pool`` is given"""
+        with self._lock:
+            result = {
+                'checkouts': self.checkouts,
+                'overflow_checkouts': self.overflow_checkouts,
+                'timeouts': self.timeouts,
+                'waiting': self.waiting,
+                'max_waiting': self.max_waiting,
+                'connections_opened': self.connections_opened,
+                'connections_closed': self.connections_closed,
+                'checkout_wait_ms': _labelled(self.wait_ms, WAIT_BUCKETS_MS, 'ms'),
+                'age_at_checkout': _labelled(self.age_at_checkout, AGE_BUCKETS_S, 's'),
+                'lifetime': _labelled(self.lifetime, AGE_BUCKETS_S, 's')
+            }
+        if isinstance(pool, QueuePool):
+            result.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                overflow=max(pool.overflow(), 0),
+                max_overflow=pool._max_overflow
+            )
+        return result
+
+
+# Global pool statistics instance
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times checkouts and tracks callers waiting for a connection"""
+
+    def _do_get(self):
+        pool_stats.wait_started()
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except TimeoutError:
+            pool_stats.wait_finished(timed_out=True)
+            raise
+        except Exception:
+            pool_stats.wait_finished()
+            raise
+        pool_stats.wait_finished(time.perf_counter() - started, overflow=self.overflow() > 0)
+        return connection
+
+
+def _on_connect(dbapi_connection, connection_record):
+    connection_record.info['connected_at'] = time.monotonic()
+    pool_stats.record_connect()
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    connected_at = connection_record.info.get('connected_at')
+    if connected_at is not None:
+        pool_stats.record_checkout_age(time.monotonic() - connected_at)
+
+
+def _on_close(dbapi_connection, connection_record):
+    connected_at = connection_record.info.get('connected_at')
+    if connected_at is not None:
+        pool_stats.record_close(time.monotonic() - connected_at)
+
+
+def instrument_pool(app):
+    """Attach connection age tracking to the app's engine"""
+    with app.app_context():
+        engine = db.engine
+        if not event.contains(engine, 'connect', _on_connect):
+            event.listen(engine, 'connect', _on_connect)
+            event.listen(engine, 'checkout', _on_checkout)
+            event.listen(engine, 'close', _on_close)
+
+    if not hasattr(app, 'extensions'):
+        app.extensions = {}
+    app.extensions['pool_stats'] = pool_stats
+
+
+def get_pool_stats():
+    """Pool statistics for the current app's engine"""
+    return pool_stats.snapshot(db.engine.pool)
@@ -0,0 +1,221 @@
+"""
+Read replica routing for the SQLAlchemy session
+GET requests to read-heavy endpoints, and code wrapped in read_replica(), run
+their SELECTs on a replica; flushes, DML, locking reads and raw SQL always go
+to the primary. Once a session has written, it stays on the primary, and the
+client is pinned to the primary for DB_REPLICA_STICKY_SECONDS so it reads its
+own writes. A replica that fails to connect is skipped until it recovers.
+
+Replica engines are created here rather than as SQLALCHEMY_BINDS, so
+db.create_all() and drop_all() never run DDL against a replica.
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from weakref import WeakKeyDictionary
+
+import sqlalchemy as sa
+from flask import current_app, g, has_app_context, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+logger = logging.getLogger('cibozer.db_routing')
+
+STICKY_SESSION_KEY = '_db_primary_until'
+WROTE_KEY = 'db_routing_wrote'
+READ_METHODS = frozenset({'GET', 'HEAD'})
+
+_forced_replica: ContextVar[bool] = ContextVar('read_replica', default=False)
+
+
+def replica_urls(app) -> List[str]:
+    """SQLALCHEMY_REPLICA_URLS as a list (a comma-separated string is accepted)"""
+    urls = app.config.get('SQLALCHEMY_REPLICA_URLS') or []
+    if isinstance(urls, str):
+        urls = [url.strip() for url in urls.split(',') if url.strip()]
+    return [url.replace('postgres://', 'postgresql://', 1) if url.startswith('postgres://') else url
+            for url in urls]
+
+
+def database_engines() -> List[Engine]:
+    """Every engine of the current app: Flask-SQLAlchemy binds, then read replicas"""
+    engines = list(current_app.extensions['sqlalchemy'].engines.values())
+    router = current_app.extensions.get('read_replicas')
+    if router is not None:
+        engines.extend(router.engines())
+    return engines
+
+
+@contextmanager
+def read_replica():
+    """Send the enclosed reads to a replica regardless of endpoint.
+
+    For lag-tolerant aggregate queries (analytics, admin snapshots) that may
+    also run outside requests. Works as a decorator too.
+    """
+    token = _forced_replica.set(True)
+    try:
+        yield
+    finally:
+        _forced_replica.reset(token)
+
+
+def _is_plain_read(clause) -> bool:
+    # Only SELECT constructs without FOR UPDATE; text() may hide a write
+    return (clause is not None and getattr(clause, 'is_select', False)
+            and getattr(clause, '_for_update_arg', None) is None)
+
+
+class RoutingSession(Session):
+    """Session whose default-bind reads may be served by a read replica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or not has_app_context():
+            return engine
+        router = current_app.extensions.get('read_replicas')
+        if router is None or not router.engines() or engine is not self._db.engine:
+            return engine
+        return router.engine_for(self, clause, engine)
+
+
+class ReadReplicaRouter:
+    """Chooses primary or replica per statement and tracks replica health"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.read_endpoints = frozenset()
+        self.sticky_seconds = 5
+        self.retry_seconds = 30
+        self.check_interval = 10
+        self._app_engines: 'WeakKeyDictionary[object, List[Engine]]' = WeakKeyDictionary()
+        self._names: Dict[Engine, str] = {}
+        self._down_until: Dict[Engine, float] = {}
+        self._checked_at: Dict[Engine, float] = {}
+        self._next = 0
+        self._lock = threading.Lock()
+
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Create the replica engines and hook request routing into the app"""
+        self.app = app
+        app.config.setdefault('SQLALCHEMY_REPLICA_URLS', [])
+        app.config.setdefault('DB_REPLICA_READ_ENDPOINTS', [])
+        app.config.setdefault('DB_REPLICA_STICKY_SECONDS', 5)
+        app.config.setdefault('DB_REPLICA_RETRY_SECONDS', 30)
+        app.config.setdefault('DB_REPLICA_CHECK_INTERVAL', 10)
+        self.read_endpoints = frozenset(app.config['DB_REPLICA_READ_ENDPOINTS'])
+        self.sticky_seconds = app.config['DB_REPLICA_STICKY_SECONDS']
+        self.retry_seconds = app.config['DB_REPLICA_RETRY_SECONDS']
+        self.check_interval = app.config['DB_REPLICA_CHECK_INTERVAL']
+
+        for engine in self._app_engines.pop(app, []):
+            engine.dispose()
+        engines = []
+        for index, url in enumerate(replica_urls(app)):
+            # Same pool settings as the primary; no sessions means no DDL
+            engine = sa.create_engine(url, **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+            event.listen(engine, 'handle_error', self._on_error)
+            self._names[engine] = f'replica_{index}'
+            engines.append(engine)
+        self._app_engines[app] = engines
+
+        if engines:
+            app.before_request(self.route_request)
+            app.after_request(self._pin_writer)
+            logger.info(f"Routing reads to {len(engines)} replica(s)")
+
+        if not hasattr(app, 'extensions'):
+            app.extensions = {}
+        app.extensions['read_replicas'] = self
+
+    def engines(self, app=None) -> List[Engine]:
+        """Replica engines of ``app`` (default: the current app)"""
+        return self._app_engines.get(app or current_app._get_current_object(), [])
+
+    # Request lifecycle
+
+    def route_request(self):
+        """Decide whether this request's reads may use a replica"""
+        g.db_read_replica = (
+            request.method in READ_METHODS
+            and (request.endpoint in self.read_endpoints or request.blueprint in self.read_endpoints)
+            and session.get(STICKY_SESSION_KEY, 0) < time.time()
+        )
+
+    def _pin_writer(self, response):
+        db_session = self.app.extensions['sqlalchemy'].session
+        if db_session.registry.has() and db_session.info.get(WROTE_KEY):
+            session[STICKY_SESSION_KEY] = time.time() + self.sticky_seconds
+        return response
+
+    # Routing
+
+    def engine_for(self, db_session, clause, primary):
+        """Engine for one statement of ``db_session``"""
+        if db_session._flushing or not _is_plain_read(clause):
+            if db_session._flushing or (clause is not None and getattr(clause, 'is_dml', False)):
+                db_session.info[WROTE_KEY] = True
+            return primary
+        if db_session.info.get(WROTE_KEY):
+            return primary
+        if not (_forced_replica.get() or (has_request_context() and g.get('db_read_replica', False))):
+            return primary
+        return self._pick_replica() or primary
+
+    def _pick_replica(self) -> Optional[Engine]:
+        now = time.monotonic()
+        with self._lock:
+            candidates = [engine for engine in self.engines() if self._down_until.get(engine, 0) <= now]
+            if not candidates:
+                return None
+            self._next += 1
+            start = self._next
+
+        for offset in range(len(candidates)):
+            engine = candidates[(start + offset) % len(candidates)]
+            if self._healthy(engine, now):
+                return engine
+        return None
+
+    def _healthy(self, engine: Engine, now: float) -> bool:
+        # Connect at most every check_interval so a dead replica is found
+        # before a query is sent to it rather than by the query failing
+        if now - self._checked_at.get(engine, float('-inf')) < self.check_interval:
+            return True
+        self._checked_at[engine] = now
+        try:
+            engine.connect().close()
+            return True
+        except Exception as e:
+            self.mark_down(engine, e)
+            return False
+
+    def mark_down(self, engine: Engine, error: Optional[Exception] = None):
+        """Skip a replica for DB_REPLICA_RETRY_SECONDS"""
+        with self._lock:
+            self._down_until[engine] = time.monotonic() + self.retry_seconds
+        self._checked_at.pop(engine, None)
+        logger.warning(f"Read replica {self._names.get(engine)} unavailable, using primary: {error}")
+
+    def _on_error(self, context):
+        if context.is_disconnect or context.connection is None:
+            self.mark_down(context.engine, context.original_exception)
+
+    def status(self) -> Dict[str, str]:
+        """'up' or 'down' per replica of the current app"""
+        now = time.monotonic()
+        return {self._names[engine]: 'down' if self._down_until.get(engine, 0) > now else 'up'
+                for engine in self.engines()}
+
+
+# Global router instance
+read_replicas = ReadReplicaRouter()
@@ -5,19 +5,45 @@ from flask_login import current_user
 
 
 def check_credits_or_premium(f):
-    """Check if user has credits or premium subscription."""
+    """Reserve a credit for non-premium users, refunded if the view fails.
+    
+    The reservation is an atomic conditional decrement committed before the
+    view runs; the number of credits taken is left in ``g.credits_reserved``.
+    """
     @wraps(f)
     def decorated_function(*args, **kwargs):
+        from flask import current_app, g
+        from app.extensions import db
+        from app.services.credits import deduct_credits, refund_credits
+        
         if not current_user.is_authenticated:
             return jsonify({'error': 'Authentication required'}), 401
         
-        if not current_user.is_premium() and not current_user.has_credits():
+        g.credits_reserved = 0
+        if current_user.is_premium():
+            return f(*args, **kwargs)
+        
+        if deduct_credits(current_user.id, 1) is None:
+            db.session.rollback()
             return jsonify({
                 'error': 'No credits available. Please purchase credits or upgrade to premium.',
                 'credits_remaining': 0
             }), 402
-        
-        return f(*args, **kwargs)
+        db.session.commit()
+        g.credits_reserved = 1
+        
+        try:
+            response = current_app.make_response(f(*args, **kwargs))
+        except Exception:
+            db.session.rollback()
+            refund_credits(current_user.id, g.credits_reserved)
+            db.session.commit()
+            raise
+        
+        if response.status_code >= 400:
+            refund_credits(current_user.id, g.credits_reserved)
+            db.session.commit()
+        return response
     return decorated_function
 
 
@@ -0,0 +1,271 @@
+"""
+Per-endpoint SQL query profiler
+Each request accumulates query counts and timings per statement fingerprint in
+a context-local profile without locking; the profile is merged into the
+per-endpoint and per-fingerprint aggregates once, at request teardown, where
+N+1 patterns (one fingerprint repeated many times in a request) are flagged.
+"""
+
+import re
+import time
+import logging
+import threading
+from collections import deque
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+from app.utils.db_routing import database_engines
+
+
+logger = logging.getLogger('cibozer.query_profiler')
+
+DURATION_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000)
+QUERIES_PER_REQUEST_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+MAX_FINGERPRINTS = 1000
+OTHER_FINGERPRINT = '<other>'
+BACKGROUND_ENDPOINT = '<background>'
+
+_COMMENTS = re.compile(r'--[^\n]*|/\*.*?\*/', re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PARAMS = re.compile(r'%\(\w+\)s|%s|(?<!:):\w+|\$\d+|\?')
+_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_ROWS = re.compile(r'(\(\?(?:, \?)*\))(?:\s*,\s*\1)+')
+_SPACE = re.compile(r'\s+')
+
+_current_profile: ContextVar[Optional['RequestProfile']] = ContextVar('query_profile', default=None)
+
+
+def _bucket(value, bounds):
+    return next((i for i, bound in enumerate(bounds) if value <= bound), len(bounds))
+
+
+def _labelled(counts, bounds, unit=''):
+    labels = [f"<={bound}{unit}" for bound in bounds] + [f">{bounds[-1]}{unit}"]
+    return dict(zip(labels, counts))
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Statement with literals, parameters and IN/VALUES lists normalized away"""
+    normalized = _COMMENTS.sub(' ', statement)
+    normalized = _STRINGS.sub('?', normalized)
+    normalized = _PARAMS.sub('?', normalized)
+    normalized = _NUMBERS.sub('?', normalized)
+    normalized = _SPACE.sub(' ', normalized).strip()
+    normalized = _LISTS.sub('(?+)', normalized)
+    return _ROWS.sub(r'\1, ...', normalized)
+
+
+class RequestProfile:
+    """Queries run while handling one request; only touched by its own context"""
+
+    __slots__ = ('queries', 'count', 'total')
+
+    def __init__(self):
+        self.queries: Dict[str, list] = {}
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, key: str, duration: float):
+        entry = self.queries.get(key)
+        if entry is None:
+            self.queries[key] = [1, duration, duration]
+        else:
+            entry[0] += 1
+            entry[1] += duration
+            if duration > entry[2]:
+                entry[2] = duration
+        self.count += 1
+        self.total += duration
+
+
+class QueryProfiler:
+    """Aggregates query fingerprints per endpoint and detects N+1 patterns"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.slow_seconds = 1.0
+        self.n_plus_one_threshold = 10
+        self._lock = threading.Lock()
+        self.reset()
+
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Install the engine hooks and request lifecycle handlers"""
+        self.app = app
+        app.config.setdefault('QUERY_PROFILER_ENABLED', True)
+        app.config.setdefault('QUERY_SLOW_MS', 1000)
+        app.config.setdefault('QUERY_N_PLUS_ONE_THRESHOLD', 10)
+        self.slow_seconds = app.config['QUERY_SLOW_MS'] / 1000
+        self.n_plus_one_threshold = app.config['QUERY_N_PLUS_ONE_THRESHOLD']
+
+        if app.config['QUERY_PROFILER_ENABLED']:
+            with app.app_context():
+                for engine in database_engines():
+                    if not event.contains(engine, 'after_cursor_execute', self._after_cursor_execute):
+                        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+                        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+            app.teardown_request(self._finish_request)
+
+        if not hasattr(app, 'extensions'):
+            app.extensions = {}
+        app.extensions['query_profiler'] = self
+
+    def reset(self):
+        """Drop all aggregated statistics"""
+        with self._lock:
+            self._endpoints: Dict[str, Dict[str, Any]] = {}
+            self._fingerprints: Dict[str, Dict[str, Any]] = {}
+            self.total_queries = 0
+            self.total_time = 0.0
+        self.slow_queries = deque(maxlen=50)
+        self.n_plus_one = deque(maxlen=50)
+
+    # Engine hooks
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('query_start_time')
+        if not started:
+            return
+        duration = time.perf_counter() - started.pop()
+        key = fingerprint(statement)
+
+        if duration >= self.slow_seconds:
+            self.slow_queries.append({
+                'statement': statement[:500] + '...' if len(statement) > 500 else statement,
+                'fingerprint': key,
+                'parameters': str(parameters)[:200] if parameters else None,
+                'duration': duration,
+                'timestamp': time.time()
+            })
+            logger.warning(f"Slow query detected ({duration:.2f}s): {key[:500]}")
+
+        profile = _current_profile.get()
+        if profile is None and has_request_context():
+            # Started lazily so queries in earlier before_request handlers count too
+            profile = RequestProfile()
+            _current_profile.set(profile)
+        if profile is not None:
+            profile.record(key, duration)
+        else:
+            # Outside a request: CLI commands and background workers
+            single = RequestProfile()
+            single.record(key, duration)
+            self._merge(BACKGROUND_ENDPOINT, single, count_request=False)
+
+    # Request lifecycle
+
+    def _finish_request(self, exc=None):
+        profile = _current_profile.get()
+        if profile is None:
+            return
+        _current_profile.set(None)
+        self._merge(request.endpoint or 'unknown', profile)
+
+    def current(self) -> Optional[RequestProfile]:
+        """Profile of the request being handled, if any"""
+        return _current_profile.get()
+
+    def _merge(self, endpoint: str, profile: RequestProfile, count_request: bool = True):
+        repeated = [(key, entry[0]) for key, entry in profile.queries.items()
+                    if count_request and entry[0] > self.n_plus_one_threshold]
+        for key, count in repeated:
+            self.n_plus_one.append({'endpoint': endpoint, 'fingerprint': key, 'count': count,
+                                    'timestamp': time.time()})
+            logger.warning(f"Possible N+1 in {endpoint}: {count}x {key[:200]}")
+
+        with self._lock:
+            self.total_queries += profile.count
+            self.total_time += profile.total
+
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = {
+                    'requests': 0, 'queries': 0, 'total_ms': 0.0, 'n_plus_one': 0,
+                    'queries_per_request': [0] * (len(QUERIES_PER_REQUEST_BUCKETS) + 1)
+                }
+            stats['queries'] += profile.count
+            stats['total_ms'] += profile.total * 1000
+            if count_request:
+                stats['requests'] += 1
+                stats['n_plus_one'] += len(repeated)
+                stats['queries_per_request'][_bucket(profile.count, QUERIES_PER_REQUEST_BUCKETS)] += 1
+
+            for key, (count, total, longest) in profile.queries.items():
+                if key not in self._fingerprints and len(self._fingerprints) >= MAX_FINGERPRINTS:
+                    key = OTHER_FINGERPRINT
+                entry = self._fingerprints.get(key)
+                if entry is None:
+                    entry = self._fingerprints[key] = {
+                        'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                        'duration_ms': [0] * (len(DURATION_BUCKETS_MS) + 1)
+                    }
+                entry['count'] += count
+                entry['total_ms'] += total * 1000
+                entry['max_ms'] = max(entry['max_ms'], longest * 1000)
+                # Per-request mean stands in for each execution's duration
+                entry['duration_ms'][_bucket(total * 1000 / count, DURATION_BUCKETS_MS)] += count
+
+    # Reporting
+
+    def endpoints(self, top: int = None) -> Dict[str, Dict[str, Any]]:
+        """Per-endpoint query counts, most queries per request first"""
+        with self._lock:
+            items = [(name, dict(stats, queries_per_request=list(stats['queries_per_request'])))
+                     for name, stats in self._endpoints.items()]
+        items.sort(key=lambda item: item[1]['queries'] / max(item[1]['requests'], 1), reverse=True)
+        return {
+            name: dict(stats,
+                       avg_queries=stats['queries'] / stats['requests'] if stats['requests'] else 0.0,
+                       queries_per_request=_labelled(stats['queries_per_request'],
+                                                     QUERIES_PER_REQUEST_BUCKETS))
+            for name, stats in items[:top]
+        }
+
+    def fingerprints(self, top: int = None) -> Dict[str, Dict[str, Any]]:
+        """Per-fingerprint totals, most total time first"""
+        with self._lock:
+            items = [(key, dict(entry, duration_ms=list(entry['duration_ms'])))
+                     for key, entry in self._fingerprints.items()]
+        items.sort(key=lambda item: item[1]['total_ms'], reverse=True)
+        return {
+            key: dict(entry,
+                      avg_ms=entry['total_ms'] / entry['count'] if entry['count'] else 0.0,
+                      duration_ms=_labelled(entry['duration_ms'], DURATION_BUCKETS_MS, 'ms'))
+            for key, entry in items[:top]
+        }
+
+    def query_counts(self) -> Dict[str, int]:
+        """Executions per statement type (SELECT, INSERT, ...)"""
+        with self._lock:
+            counts = {}
+            for key, entry in self._fingerprints.items():
+                statement_type = key.split(' ', 1)[0].upper() if key != OTHER_FINGERPRINT else 'OTHER'
+                counts[statement_type] = counts.get(statement_type, 0) + entry['count']
+            return counts
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        """Totals, top endpoints and fingerprints, slow queries and N+1 findings"""
+        return {
+            'total_queries': self.total_queries,
+            'total_time': self.total_time,
+            'query_counts': self.query_counts(),
+            'endpoints': self.endpoints(top),
+            'fingerprints': self.fingerprints(top),
+            'slow_queries': list(self.slow_queries),
+            'n_plus_one': list(self.n_plus_one)
+        }
+
+
+# Global profiler instance
+query_profiler = QueryProfiler()
@@ -17,24 +17,47 @@ class Config:
     # Database
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///cibozer.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_size': 10,
-        'max_overflow': 20,  # Allow up to 30 total connections (10 + 20 overflow)
-        'pool_recycle': 3600,  # Recycle connections every hour
-        'pool_pre_ping': True,  # Verify connections before use
-        'pool_timeout': 30,  # Connection timeout in seconds
-        'pool_reset_on_return': 'commit',  # Reset connections on return
-        'connect_args': {
-            'timeout': 30,  # Query timeout in seconds (SQLite)
-            'check_same_thread': False,  # Allow SQLite to be used across threads
-            'isolation_level': None  # Use autocommit mode for better performance
-        } if 'sqlite' in (os.environ.get('DATABASE_URL') or 'sqlite:///cibozer.db') else {
-            'connect_timeout': 30,  # Connection timeout for PostgreSQL/MySQL
-            'server_side_cursors': False,  # Disable server-side cursors for better timeout handling
-            'pool_reset_on_return': 'commit',  # Reset connection state
-            'application_name': 'Cibozer',  # For connection identification
-        }
+    SQLALCHEMY_ENGINE_OPTIONS = {}  # Explicit overrides; pool options are derived in app.utils.db_pool
+    
+    # Connection pool sizing: each worker process gets one connection per
+    # request thread plus background workers, and all workers together stay
+    # under DB_MAX_CONNECTIONS minus the reserved admin/migration connections
+    DB_POOL_WORKERS = int(os.environ.get('WEB_CONCURRENCY', '4'))
+    DB_POOL_THREADS = int(os.environ.get('GUNICORN_THREADS', '1'))
+    DB_POOL_BACKGROUND_CONNECTIONS = 2
+    DB_MAX_CONNECTIONS = int(os.environ.get('DB_MAX_CONNECTIONS', '100'))
+    DB_RESERVED_CONNECTIONS = int(os.environ.get('DB_RESERVED_CONNECTIONS', '10'))
+    DB_POOL_TIMEOUT = 10  # seconds to wait for a free connection
+    DB_POOL_RECYCLE = 1800  # seconds
+    
+    # Read replicas (comma-separated DATABASE_REPLICA_URLS). GET requests to
+    # DB_REPLICA_READ_ENDPOINTS (endpoint or blueprint names) read from them;
+    # a client that just wrote stays on the primary for DB_REPLICA_STICKY_SECONDS.
+    # Only views querying through app.extensions.db can be routed; the share
+    # routes use the legacy models.db and always read from the primary
+    SQLALCHEMY_REPLICA_URLS = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',')
+                               if url.strip()]
+    DB_REPLICA_READ_ENDPOINTS = [
+        'api.load_meal_plans', 'api.load_meal_plan', 'main.dashboard', 'analytics', 'admin'
+    ]
+    DB_REPLICA_STICKY_SECONDS = int(os.environ.get('DB_REPLICA_STICKY_SECONDS', '5'))
+    DB_REPLICA_RETRY_SECONDS = 30  # how long a failed replica is skipped
+    
+    # Per-statement database timeouts in milliseconds (0 = no limit). Requests
+    # to DB_ADMIN_BLUEPRINTS get the admin budget, other requests the interactive
+    # one, CLI commands and background workers the batch one.
+    DB_STATEMENT_TIMEOUTS = {
+        'interactive': int(os.environ.get('DB_TIMEOUT_INTERACTIVE_MS', '5000')),
+        'admin': int(os.environ.get('DB_TIMEOUT_ADMIN_MS', '30000')),
+        'batch': int(os.environ.get('DB_TIMEOUT_BATCH_MS', '0')),
     }
+    DB_ADMIN_BLUEPRINTS = ['admin', 'db_admin', 'monitoring', 'logs', 'sla', 'tracing']
+    
+    # Query profiler: slow query log and N+1 detection (same statement run
+    # more than this many times in one request)
+    QUERY_PROFILER_ENABLED = True
+    QUERY_SLOW_MS = int(os.environ.get('QUERY_SLOW_MS', '1000'))
+    QUERY_N_PLUS_ONE_THRESHOLD = 10
     
     # Security
     SESSION_COOKIE_SECURE = True
@@ -70,6 +93,57 @@ class Config:
     CACHE_TYPE = 'simple'
     CACHE_DEFAULT_TIMEOUT = 300
     
+    # Per-worker L1 cache in front of the shared backend
+    CACHE_L1_ENABLED = True
+    CACHE_L1_MAX_ENTRIES = int(os.environ.get('CACHE_L1_MAX_ENTRIES', '1024'))
+    CACHE_L1_TTL = 30  # seconds
+    CACHE_L1_EPOCH_CHECK_INTERVAL = 1.0  # seconds
+    
+    # Saved plan storage: 'compressed' (packed binary) or 'json'
+    PLAN_STORAGE_FORMAT = os.environ.get('PLAN_STORAGE_FORMAT', 'compressed')
+    PLAN_STORAGE_MIGRATE_ON_STARTUP = os.environ.get('PLAN_STORAGE_MIGRATE_ON_STARTUP', 'false').lower() in ['true', 'on', '1']
+    
+    # Cache warm-up after each deploy and then periodically (0 = startup only)
+    CACHE_WARM_ON_STARTUP = os.environ.get('CACHE_WARM_ON_STARTUP', 'true').lower() in ['true', 'on', '1']
+    CACHE_WARM_INTERVAL = int(os.environ.get('CACHE_WARM_INTERVAL', '600'))  # seconds
+    
+    # Daily usage rollups; raw usage_logs kept for the retention window (0 = forever).
+    # Retention is opt-in: first-plan emails and lifetime user stats still read raw rows
+    USAGE_ROLLUP_ENABLED = os.environ.get('USAGE_ROLLUP_ENABLED', 'true').lower() in ['true', 'on', '1']
+    USAGE_ROLLUP_INTERVAL = int(os.environ.get('USAGE_ROLLUP_INTERVAL', '300'))  # seconds
+    USAGE_LOG_RETENTION_DAYS = int(os.environ.get('USAGE_LOG_RETENTION_DAYS', '0'))
+    
+    # Monthly free-tier credit refill, applied in id ranges of this size
+    FREE_TIER_MONTHLY_CREDITS = int(os.environ.get('FREE_TIER_MONTHLY_CREDITS', '3'))
+    CREDIT_REFILL_BATCH_SIZE = int(os.environ.get('CREDIT_REFILL_BATCH_SIZE', '50000'))
+    
+    # Response compression (gzip, or brotli when installed)
+    COMPRESS_ENABLED = True
+    COMPRESS_MIN_SIZE = 1024  # bytes
+    COMPRESS_LEVEL = 6
+    COMPRESS_BR_LEVEL = 5
+    
+    # Outbox worker (emails and analytics delivered after commit)
+    OUTBOX_WORKER_ENABLED = os.environ.get('OUTBOX_WORKER_ENABLED', 'true').lower() in ['true', 'on', '1']
+    OUTBOX_POLL_INTERVAL = float(os.environ.get('OUTBOX_POLL_INTERVAL', '2'))
+    OUTBOX_BATCH_SIZE = 50
+    OUTBOX_MAX_ATTEMPTS = 5
+    OUTBOX_RETRY_BASE_SECONDS = 30
+    
+    # Precomputed plan catalogue for preset demo requests
+    PLAN_CATALOGUE_WARM_ON_STARTUP = os.environ.get('PLAN_CATALOGUE_WARM_ON_STARTUP', 'true').lower() in ['true', 'on', '1']
+    PLAN_CATALOGUE_DIETS = ['standard', 'vegetarian', 'vegan', 'keto', 'paleo', 'mediterranean', 'high_protein', 'low_carb']
+    PLAN_CATALOGUE_CALORIES = [1500, 1800, 2000, 2200, 2500]
+    PLAN_CATALOGUE_MEALS_PER_DAY = [3]
+    PLAN_CATALOGUE_POOL_SIZE = int(os.environ.get('PLAN_CATALOGUE_POOL_SIZE', '5'))
+    PLAN_CATALOGUE_REFILL_THRESHOLD = 2
+    
+    # Meal plan engines: per-request latency budget and per-engine limits
+    OPTIMIZER_LATENCY_BUDGET_MS = int(os.environ.get('OPTIMIZER_LATENCY_BUDGET_MS', '2000'))
+    OPTIMIZER_ENGINE_BUDGETS_MS = {'accurate': 1500, 'enhanced': 500, 'basic': 250}
+    OPTIMIZER_MAX_WORKERS = int(os.environ.get('OPTIMIZER_MAX_WORKERS', '4'))
+    OPTIMIZER_RESULT_CACHE_SIZE = 256
+    
     # Logging
     LOG_TO_STDOUT = os.environ.get('LOG_TO_STDOUT', 'false').lower() in ['true', 'on', '1']
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
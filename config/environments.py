@@ -99,6 +99,20 @@ class EnvironmentManager:
                 default_value='20',
                 validation_pattern=r'^\d+$'
             ),
+            'DATABASE_REPLICA_URLS': EnvironmentVariable(
+                name='DATABASE_REPLICA_URLS',
+                description='Comma-separated read replica URLs for read-heavy endpoints',
+                required=False,
+                validation_pattern=r'^(postgres(ql)?|sqlite)://[^,]+(,(postgres(ql)?|sqlite)://[^,]+)*$',
+                sensitive=True
+            ),
+            'DB_REPLICA_STICKY_SECONDS': EnvironmentVariable(
+                name='DB_REPLICA_STICKY_SECONDS',
+                description='Seconds a client reads from the primary after its own write',
+                required=False,
+                default_value='5',
+                validation_pattern=r'^\d+$'
+            ),
             
             # Cache Configuration
             'REDIS_URL': EnvironmentVariable(
@@ -405,7 +419,8 @@ class EnvironmentManager:
         # Group variables by category
         categories = {
             'Core Flask': ['SECRET_KEY', 'FLASK_ENV', 'DEBUG'],
-            'Database': ['DATABASE_URL', 'DB_POOL_SIZE', 'DB_MAX_OVERFLOW'],
+            'Database': ['DATABASE_URL', 'DB_POOL_SIZE', 'DB_MAX_OVERFLOW', 'DATABASE_REPLICA_URLS',
+                         'DB_REPLICA_STICKY_SECONDS'],
             'Cache': ['REDIS_URL', 'CACHE_DEFAULT_TIMEOUT'],
             'Email': ['MAIL_SERVER', 'MAIL_PORT', 'MAIL_USERNAME', 'MAIL_PASSWORD', 'MAIL_USE_TLS'],
             'Stripe Payment': ['STRIPE_PUBLISHABLE_KEY', 'STRIPE_SECRET_KEY', 'STRIPE_WEBHOOK_SECRET', 'STRIPE_PRICE_ID_PRO', 'STRIPE_PRICE_ID_PREMIUM'],
@@ -7,7 +7,9 @@ class TestingConfig(Config):
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     SQLALCHEMY_ENGINE_OPTIONS = {}  # Override to remove pool options for SQLite
+    SQLALCHEMY_REPLICA_URLS = []
     WTF_CSRF_ENABLED = False
     SECRET_KEY = 'test-secret-key-for-unit-tests'
     MAIL_SUPPRESS_SEND = True
-    RATELIMIT_ENABLED = False
\ No newline at end of file
+    RATELIMIT_ENABLED = False
+    OUTBOX_WORKER_ENABLED = False
\ No newline at end of file
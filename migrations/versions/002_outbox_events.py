@@ -0,0 +1,45 @@
+"""Add transactional outbox table
+
+Revision ID: outbox_events_002
+Revises: db_optimization_001
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'outbox_events_002'
+down_revision = 'db_optimization_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create outbox_events table used by the background outbox worker."""
+    op.create_table(
+        'outbox_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_type', sa.String(length=100), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('available_at', sa.DateTime(), nullable=False),
+        sa.Column('locked_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('processed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('outbox_events', schema=None) as batch_op:
+        batch_op.create_index('idx_outbox_events_status_available', ['status', 'available_at'])
+
+
+def downgrade():
+    """Drop outbox_events table."""
+    with op.batch_alter_table('outbox_events', schema=None) as batch_op:
+        batch_op.drop_index('idx_outbox_events_status_available')
+    op.drop_table('outbox_events')
@@ -0,0 +1,55 @@
+"""Add compressed binary storage for saved meal plans
+
+Revision ID: plan_storage_003
+Revises: outbox_events_002
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.compression import unpack_plan
+
+
+# revision identifiers
+revision = 'plan_storage_003'
+down_revision = 'outbox_events_002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add meal_plan_blob and allow meal_plan_data to be empty once a plan is packed."""
+    with op.batch_alter_table('saved_meal_plans', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('meal_plan_blob', sa.LargeBinary(), nullable=True))
+        batch_op.alter_column('meal_plan_data', existing_type=sa.JSON(), nullable=True)
+
+
+def downgrade():
+    """Unpack every packed plan back into meal_plan_data, then drop meal_plan_blob."""
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(sa.text(
+            "SELECT id, meal_plan_blob FROM saved_meal_plans "
+            "WHERE meal_plan_blob IS NOT NULL AND id > :last_id ORDER BY id LIMIT 200"
+        ), {'last_id': last_id}).fetchall()
+        if not rows:
+            break
+        for plan_id, blob in rows:
+            bind.execute(sa.text(
+                "UPDATE saved_meal_plans SET meal_plan_data = :data, meal_plan_blob = NULL WHERE id = :id"
+            ), {'data': json.dumps(unpack_plan(blob)), 'id': plan_id})
+        last_id = rows[-1][0]
+    
+    empty = bind.execute(sa.text(
+        "SELECT COUNT(*) FROM saved_meal_plans WHERE meal_plan_data IS NULL"
+    )).scalar()
+    if empty:
+        raise RuntimeError(f"{empty} rows in saved_meal_plans have no meal_plan_data")
+    
+    with op.batch_alter_table('saved_meal_plans', schema=None) as batch_op:
+        batch_op.alter_column('meal_plan_data', existing_type=sa.JSON(), nullable=False)
+        batch_op.drop_column('meal_plan_blob')
@@ -0,0 +1,49 @@
+"""Add indexes matching hot usage_logs and error_logs query shapes
+
+Revision ID: hot_query_indexes_004
+Revises: plan_storage_003
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'hot_query_indexes_004'
+down_revision = 'plan_storage_003'
+branch_labels = None
+depends_on = None
+
+
+def _existing_indexes(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    """Create composite and partial indexes for rate limiting, monitoring and error triage."""
+    usage_indexes = _existing_indexes('usage_logs')
+    # Added by db_optimization_001 on most databases, but not on ones built with create_all
+    for name, columns in (
+        ('idx_usage_logs_user_action_created', ['user_id', 'action', 'created_at']),
+        ('idx_usage_logs_action_created', ['action', 'created_at']),
+    ):
+        if name not in usage_indexes:
+            op.create_index(name, 'usage_logs', columns)
+    
+    op.create_index(
+        'idx_usage_logs_action_response_time', 'usage_logs', ['action', 'response_time_ms'],
+        sqlite_where=sa.text('response_time_ms IS NOT NULL'),
+        postgresql_where=sa.text('response_time_ms IS NOT NULL')
+    )
+    
+    op.create_index('idx_error_logs_severity_created', 'error_logs', ['severity', 'created_at'])
+    op.create_index('idx_error_logs_resolved_severity_created', 'error_logs',
+                    ['resolved', 'severity', 'created_at'])
+
+
+def downgrade():
+    """Drop the indexes added by this revision."""
+    op.drop_index('idx_error_logs_resolved_severity_created', table_name='error_logs')
+    op.drop_index('idx_error_logs_severity_created', table_name='error_logs')
+    op.drop_index('idx_usage_logs_action_response_time', table_name='usage_logs')
@@ -0,0 +1,131 @@
+"""Add daily usage rollups and partition usage_logs by month on PostgreSQL
+
+Revision ID: usage_rollups_005
+Revises: hot_query_indexes_004
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'usage_rollups_005'
+down_revision = 'hot_query_indexes_004'
+branch_labels = None
+depends_on = None
+
+USAGE_LOG_INDEXES = (
+    ('idx_usage_logs_user_action_created', 'user_id, action, created_at', None),
+    ('idx_usage_logs_action_created', 'action, created_at', None),
+    ('idx_usage_logs_action_response_time', 'action, response_time_ms', 'response_time_ms IS NOT NULL'),
+    ('ix_usage_logs_created_at', 'created_at', None),
+)
+
+
+def _months(first, last):
+    month = first.replace(day=1)
+    while month <= last:
+        following = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+        yield month, following
+        month = following
+
+
+def _partition_usage_logs():
+    """Rebuild usage_logs as a table range-partitioned on created_at."""
+    bind = op.get_bind()
+    # created_at becomes the partition key, so rows without one are stamped now
+    # rather than left behind when the table is copied
+    op.execute("UPDATE usage_logs SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    first, last = bind.execute(sa.text("SELECT MIN(created_at), MAX(created_at) FROM usage_logs")).one()
+    today = date.today()
+    first = first.date() if first else today
+    last = max(last.date() if last else today, today)
+    # Two months of headroom; the rollup worker creates later partitions
+    last = date(last.year + (last.month + 1) // 12, (last.month + 1) % 12 + 1, 1)
+
+    op.execute("ALTER TABLE usage_logs RENAME TO usage_logs_unpartitioned")
+    op.execute("ALTER TABLE usage_logs_unpartitioned RENAME CONSTRAINT usage_logs_pkey TO usage_logs_unpartitioned_pkey")
+    for name, _, _ in USAGE_LOG_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+    op.execute("""
+        CREATE TABLE usage_logs (
+            LIKE usage_logs_unpartitioned INCLUDING DEFAULTS,
+            PRIMARY KEY (id, created_at),
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("ALTER TABLE usage_logs ALTER COLUMN created_at SET NOT NULL")
+    op.execute("ALTER SEQUENCE usage_logs_id_seq OWNED BY usage_logs.id")
+
+    for start, end in _months(first, last):
+        op.execute(
+            f"CREATE TABLE usage_logs_y{start.year:04d}m{start.month:02d} PARTITION OF usage_logs "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    op.execute("CREATE TABLE usage_logs_default PARTITION OF usage_logs DEFAULT")
+
+    op.execute("""
+        INSERT INTO usage_logs
+        SELECT * FROM usage_logs_unpartitioned
+    """)
+    op.execute("DROP TABLE usage_logs_unpartitioned")
+
+    for name, columns, where in USAGE_LOG_INDEXES:
+        predicate = f" WHERE {where}" if where else ""
+        op.execute(f"CREATE INDEX {name} ON usage_logs ({columns}){predicate}")
+
+
+def _unpartition_usage_logs():
+    """Copy usage_logs back into a plain table."""
+    op.execute("ALTER TABLE usage_logs RENAME TO usage_logs_partitioned")
+    op.execute("ALTER TABLE usage_logs_partitioned RENAME CONSTRAINT usage_logs_pkey TO usage_logs_partitioned_pkey")
+    for name, _, _ in USAGE_LOG_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+    op.execute("""
+        CREATE TABLE usage_logs (
+            LIKE usage_logs_partitioned INCLUDING DEFAULTS,
+            PRIMARY KEY (id),
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    """)
+    op.execute("ALTER TABLE usage_logs ALTER COLUMN created_at DROP NOT NULL")
+    op.execute("ALTER SEQUENCE usage_logs_id_seq OWNED BY usage_logs.id")
+    op.execute("INSERT INTO usage_logs SELECT * FROM usage_logs_partitioned")
+    op.execute("DROP TABLE usage_logs_partitioned CASCADE")
+
+    for name, columns, where in USAGE_LOG_INDEXES:
+        predicate = f" WHERE {where}" if where else ""
+        op.execute(f"CREATE INDEX {name} ON usage_logs ({columns}){predicate}")
+
+
+def upgrade():
+    """Create usage_daily_rollups; on PostgreSQL also partition usage_logs monthly."""
+    op.create_table('usage_daily_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('action', sa.String(length=100), nullable=False),
+        sa.Column('tier', sa.String(length=20), nullable=False),
+        sa.Column('event_count', sa.Integer(), nullable=False),
+        sa.Column('unique_users', sa.Integer(), nullable=False),
+        sa.Column('credits_used', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('day', 'action', 'tier', name='uq_usage_daily_rollups_day_action_tier')
+    )
+
+    # SQLite has no declarative partitioning; retention there uses batched deletes
+    if op.get_bind().dialect.name == 'postgresql':
+        _partition_usage_logs()
+
+
+def downgrade():
+    """Restore a plain usage_logs table and drop the rollups."""
+    if op.get_bind().dialect.name == 'postgresql':
+        _unpartition_usage_logs()
+
+    op.drop_table('usage_daily_rollups')
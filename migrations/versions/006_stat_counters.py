@@ -0,0 +1,44 @@
+"""Add tracked counters for admin dashboard statistics
+
+Revision ID: stat_counters_006
+Revises: usage_rollups_005
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+import os
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'stat_counters_006'
+down_revision = 'usage_rollups_005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create stat_counters and seed it from the current data."""
+    stat_counters = op.create_table('stat_counters',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+    saved_plans = op.get_bind().execute(sa.text("SELECT COUNT(*) FROM saved_meal_plans")).scalar() or 0
+    # The dashboard used to list this directory on every load; count it once here
+    videos = len([f for f in os.listdir('videos') if f.endswith('.mp4')]) if os.path.isdir('videos') else 0
+
+    now = datetime.now(timezone.utc)
+    op.bulk_insert(stat_counters, [
+        {'name': 'saved_plans', 'value': saved_plans, 'updated_at': now},
+        {'name': 'videos', 'value': videos, 'updated_at': now},
+    ])
+
+
+def downgrade():
+    """Drop stat_counters."""
+    op.drop_table('stat_counters')
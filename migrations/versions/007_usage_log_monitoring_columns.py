@@ -0,0 +1,36 @@
+"""Promote monitoring event fields on usage_logs to columns
+
+Revision ID: monitoring_columns_007
+Revises: stat_counters_006
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'monitoring_columns_007'
+down_revision = 'stat_counters_006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add operation/severity columns and the monitoring index."""
+    # Nothing to backfill: the monitoring writers never persisted their metadata
+    with op.batch_alter_table('usage_logs') as batch_op:
+        batch_op.add_column(sa.Column('operation', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('severity', sa.String(length=20), nullable=True))
+
+    op.create_index('idx_usage_logs_action_operation_created', 'usage_logs',
+                    ['action', 'operation', 'created_at'])
+
+
+def downgrade():
+    """Drop the monitoring index and columns."""
+    op.drop_index('idx_usage_logs_action_operation_created', table_name='usage_logs')
+
+    with op.batch_alter_table('usage_logs') as batch_op:
+        batch_op.drop_column('severity')
+        batch_op.drop_column('operation')
@@ -0,0 +1,36 @@
+"""Add audit table for monthly credit refills
+
+Revision ID: credit_refill_008
+Revises: monitoring_columns_007
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'credit_refill_008'
+down_revision = 'monitoring_columns_007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create credit_refill_batches."""
+    op.create_table('credit_refill_batches',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('period', sa.String(length=7), nullable=False),
+        sa.Column('first_user_id', sa.Integer(), nullable=False),
+        sa.Column('last_user_id', sa.Integer(), nullable=False),
+        sa.Column('users_refilled', sa.Integer(), nullable=False),
+        sa.Column('credits', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('period', 'first_user_id', name='uq_credit_refill_period_range')
+    )
+
+
+def downgrade():
+    """Drop credit_refill_batches."""
+    op.drop_table('credit_refill_batches')
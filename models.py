@@ -11,6 +11,7 @@ from datetime import datetime, timedelta, timezone
 import bcrypt
 from flask_login import UserMixin
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import deferred
 
 # Local application imports
 from logging_setup import get_logger, log_database_operation, audit_logger
@@ -284,7 +285,7 @@ class SharedMealPlan(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
     # Meal plan data
-    meal_plan_data = db.Column(db.JSON, nullable=False)  # Stores the complete meal plan
+    meal_plan_data = deferred(db.Column(db.JSON, nullable=False))  # Complete meal plan, loaded on access
     title = db.Column(db.String(200))
     description = db.Column(db.Text)
     
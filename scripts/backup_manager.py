@@ -10,6 +10,7 @@ import json
 import gzip
 import shutil
 import hashlib
+import tarfile
 import tempfile
 import subprocess
 from pathlib import Path
@@ -22,6 +23,10 @@ from urllib.parse import urlparse
 import boto3
 from botocore.exceptions import ClientError
 
+# backup_streams sits next to this script
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from backup_streams import dump_to_file, file_checksum, tar_directory
+
 
 class Colors:
     GREEN = '\033[92m'
@@ -82,7 +87,12 @@ class BackupManager:
             "compression": {
                 "enabled": True,
                 "algorithm": "gzip",
-                "level": 6
+                "level": 6,
+                "threads": 0
+            },
+            "database": {
+                "format": "directory",
+                "jobs": 4
             },
             "encryption": {
                 "enabled": False,
@@ -156,43 +166,62 @@ class BackupManager:
             parsed = urlparse(database_url)
             db_name = parsed.path.lstrip('/')
             
-            # Create backup file path
-            backup_filename = f"{backup_id}_database.sql"
-            if self.config["compression"]["enabled"]:
-                backup_filename += ".gz"
-            
-            backup_path = self.backup_dir / backup_filename
-            
-            # Create pg_dump command
-            dump_command = [
-                "pg_dump",
-                database_url,
-                "--verbose",
-                "--no-password",
-                "--format=custom",
-                "--compress=9" if not self.config["compression"]["enabled"] else "--compress=0"
-            ]
-            
-            if backup_type == "schema_only":
-                dump_command.append("--schema-only")
-            elif backup_type == "data_only":
-                dump_command.append("--data-only")
-            
-            # Execute backup
-            with open(backup_path, 'wb') as f:
-                if self.config["compression"]["enabled"]:
-                    # Use gzip compression
-                    process = subprocess.Popen(dump_command, stdout=subprocess.PIPE)
-                    with gzip.GzipFile(fileobj=f, mode='wb', 
-                                     compresslevel=self.config["compression"]["level"]) as gz_file:
-                        shutil.copyfileobj(process.stdout, gz_file)
-                    process.wait()
-                else:
-                    subprocess.run(dump_command, stdout=f, check=True)
-            
-            # Calculate file size and checksum
-            file_size = backup_path.stat().st_size
-            checksum = self.calculate_checksum(backup_path)
+            compression = self.config["compression"]
+            dump_settings = self.config.get("database", {})
+            jobs = dump_settings.get("jobs", 4)
+            
+            if dump_settings.get("format", "directory") == "directory" and backup_type != "schema_only":
+                # Parallel dump: pg_dump -j compresses each table in its own worker
+                dump_dir = self.backup_dir / f"{backup_id}_database"
+                dump_command = [
+                    "pg_dump",
+                    database_url,
+                    "--no-password",
+                    "--format=directory",
+                    f"--jobs={jobs}",
+                    f"--compress={compression['level'] if compression['enabled'] else 0}",
+                    f"--file={dump_dir}"
+                ]
+                if backup_type == "data_only":
+                    dump_command.append("--data-only")
+                
+                result = subprocess.run(dump_command, capture_output=True, text=True)
+                if result.returncode != 0:
+                    shutil.rmtree(dump_dir, ignore_errors=True)
+                    raise RuntimeError(f"pg_dump failed: {result.stderr.strip()}")
+                
+                # One uncompressed tar of the already compressed files, hashed as written
+                backup_path = self.backup_dir / f"{backup_id}_database.tar"
+                try:
+                    file_size, checksum = tar_directory(dump_dir, backup_path)
+                finally:
+                    shutil.rmtree(dump_dir, ignore_errors=True)
+                compression_name = "directory+gzip" if compression["enabled"] else "directory"
+            else:
+                # Single stream, compressed by pigz when available and hashed inline
+                backup_filename = f"{backup_id}_database.sql"
+                if compression["enabled"]:
+                    backup_filename += ".gz"
+                backup_path = self.backup_dir / backup_filename
+                
+                dump_command = [
+                    "pg_dump",
+                    database_url,
+                    "--no-password",
+                    "--format=custom",
+                    "--compress=9" if not compression["enabled"] else "--compress=0"
+                ]
+                
+                if backup_type == "schema_only":
+                    dump_command.append("--schema-only")
+                elif backup_type == "data_only":
+                    dump_command.append("--data-only")
+                
+                file_size, checksum = dump_to_file(
+                    dump_command, backup_path, compress=compression["enabled"],
+                    level=compression["level"], threads=compression.get("threads", 0)
+                )
+                compression_name = "gzip" if compression["enabled"] else "none"
             
             # Get database statistics
             conn = self.get_database_connection(database_url)
@@ -231,7 +260,7 @@ class BackupManager:
                 database_name=db_name,
                 table_count=table_count,
                 record_count=record_count,
-                compression="gzip" if self.config["compression"]["enabled"] else "none",
+                compression=compression_name,
                 encryption=self.config["encryption"]["enabled"],
                 storage_location=str(backup_path),
                 retention_until=retention_until,
@@ -412,7 +441,14 @@ class BackupManager:
                 restore_command.extend(["--dbname", database_url])
             
             # Handle compressed files
-            if backup_path.suffix == '.gz':
+            if backup_path.suffix == '.tar':
+                # Directory-format dump: unpack and restore with parallel jobs
+                restore_dir = tempfile.mkdtemp(dir=self.backup_dir)
+                with tarfile.open(backup_path, 'r') as tar:
+                    tar.extractall(restore_dir)
+                jobs = self.config.get("database", {}).get("jobs", 4)
+                restore_command.extend([f"--jobs={jobs}", str(Path(restore_dir) / backup_path.stem)])
+            elif backup_path.suffix == '.gz':
                 # Decompress first
                 with tempfile.NamedTemporaryFile(suffix='.sql', delete=False) as temp_file:
                     with gzip.open(backup_path, 'rb') as gz_file:
@@ -434,6 +470,8 @@ class BackupManager:
             # Clean up temporary file
             if backup_path.suffix == '.gz' and 'temp_file' in locals():
                 os.unlink(temp_file.name)
+            if 'restore_dir' in locals():
+                shutil.rmtree(restore_dir, ignore_errors=True)
             
         except Exception as e:
             print(f"{Colors.RED}❌ Database restore failed: {e}{Colors.END}")
@@ -524,7 +562,10 @@ class BackupManager:
             
             # Test file readability
             try:
-                if backup_path.suffix == '.gz':
+                if backup_path.suffix == '.tar':
+                    with tarfile.open(backup_path, 'r') as tar:
+                        tar.next()  # Read first member header
+                elif backup_path.suffix == '.gz':
                     with gzip.open(backup_path, 'rb') as f:
                         f.read(1024)  # Read first chunk
                 else:
@@ -543,11 +584,7 @@ class BackupManager:
     
     def calculate_checksum(self, file_path: Path) -> str:
         """Calculate SHA256 checksum of file"""
-        hash_sha256 = hashlib.sha256()
-        with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_sha256.update(chunk)
-        return hash_sha256.hexdigest()
+        return file_checksum(file_path)
     
     def format_size(self, size_bytes: int) -> str:
         """Format file size in human readable format"""
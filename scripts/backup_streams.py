@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Streaming helpers shared by the backup scripts
+Dumps are compressed and hashed in the same pass that writes them, so a
+backup file is never read back just to checksum it. Compression runs in
+pigz (multi-threaded gzip) when it is installed and in-process otherwise.
+"""
+
+import os
+import gzip
+import shutil
+import sqlite3
+import hashlib
+import tarfile
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional, Tuple
+
+
+CHUNK_SIZE = 1024 * 1024
+SQLITE_BACKUP_PAGES = 1024
+
+
+class HashingWriter:
+    """File-like wrapper that hashes and counts bytes on their way to disk"""
+
+    def __init__(self, fileobj: BinaryIO):
+        self.fileobj = fileobj
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.fileobj.write(data)
+
+    def flush(self):
+        self.fileobj.flush()
+
+    def hexdigest(self) -> str:
+        return self.sha256.hexdigest()
+
+
+def file_checksum(file_path: Path) -> str:
+    """SHA256 of a file, read in large chunks"""
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def compression_threads(threads: int = 0) -> int:
+    """Threads to compress with; 0 means one per CPU"""
+    return threads if threads > 0 else (os.cpu_count() or 1)
+
+
+def stream_to_file(source: BinaryIO, dest_path: Path, compress: bool = True,
+                   level: int = 6, threads: int = 0) -> Tuple[int, str]:
+    """Write ``source`` to ``dest_path``, gzipped when ``compress``.
+
+    ``source`` is any binary stream with a file descriptor, typically a
+    subprocess stdout. Returns (bytes written, sha256 of the written file).
+    """
+    pigz = shutil.which('pigz') if compress else None
+
+    try:
+        with open(dest_path, 'wb') as f:
+            writer = HashingWriter(f)
+            if pigz:
+                process = subprocess.Popen([pigz, f'-{level}', '-p', str(compression_threads(threads)), '-c'],
+                                           stdin=source, stdout=subprocess.PIPE)
+                shutil.copyfileobj(process.stdout, writer, CHUNK_SIZE)
+                if process.wait() != 0:
+                    raise RuntimeError(f"pigz exited with status {process.returncode}")
+            elif compress:
+                with gzip.GzipFile(fileobj=writer, mode='wb', compresslevel=level) as gz_file:
+                    shutil.copyfileobj(source, gz_file, CHUNK_SIZE)
+            else:
+                shutil.copyfileobj(source, writer, CHUNK_SIZE)
+    except BaseException:
+        # Never leave a truncated backup behind that looks like a finished one
+        dest_path.unlink(missing_ok=True)
+        raise
+
+    return writer.size, writer.hexdigest()
+
+
+def dump_to_file(command, dest_path: Path, compress: bool = True, level: int = 6,
+                 threads: int = 0, env: Optional[dict] = None) -> Tuple[int, str]:
+    """Run a dump command and stream its stdout into ``dest_path``"""
+    # stderr goes to a file: verbose dumps would fill a pipe and stall the dump
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr, env=env)
+        try:
+            result = stream_to_file(process.stdout, dest_path, compress, level, threads)
+        finally:
+            process.stdout.close()
+            process.wait()
+
+        if process.returncode != 0:
+            dest_path.unlink(missing_ok=True)
+            stderr.seek(0)
+            message = stderr.read().decode(errors='replace').strip()
+            raise RuntimeError(f"{Path(command[0]).name} failed: {message}")
+    return result
+
+
+def tar_directory(directory: Path, dest_path: Path) -> Tuple[int, str]:
+    """Pack a dump directory into one uncompressed tar, hashing as it is written"""
+    with open(dest_path, 'wb') as f:
+        writer = HashingWriter(f)
+        with tarfile.open(fileobj=writer, mode='w|') as tar:
+            tar.add(str(directory), arcname=directory.name)
+    return writer.size, writer.hexdigest()
+
+
+def sqlite_online_backup(source_path: Path, dest_path: Path, pages: int = SQLITE_BACKUP_PAGES,
+                         sleep: float = 0.0,
+                         progress: Optional[Callable[[int, int, int], None]] = None):
+    """Copy a live SQLite database with the online backup API, ``pages`` at a time.
+
+    The source is only locked while each batch is copied, so writers are not
+    blocked for the whole backup; if another connection writes in between,
+    SQLite restarts the copy so the result is still a consistent snapshot.
+    """
+    source_conn = sqlite3.connect(str(source_path))
+    backup_conn = sqlite3.connect(str(dest_path))
+    try:
+        source_conn.backup(backup_conn, pages=pages, progress=progress, sleep=sleep)
+    finally:
+        source_conn.close()
+        backup_conn.close()
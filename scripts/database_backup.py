@@ -9,18 +9,19 @@ import sys
 import json
 import gzip
 import shutil
-import sqlite3
 import subprocess
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Optional, Dict, List
 
-# Add app to path
+# Add app and this directory (for backup_streams) to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app import create_app
 from app.extensions import db
 from flask import current_app
+from backup_streams import dump_to_file, file_checksum, sqlite_online_backup, stream_to_file
 
 
 class DatabaseBackupManager:
@@ -130,33 +131,26 @@ class DatabaseBackupManager:
         # Create backup using SQLite's backup API for consistency
         backup_path = self.backup_dir / f"{backup_name}.db"
         
-        # Use SQLite's online backup
-        source_conn = sqlite3.connect(str(source_path))
-        backup_conn = sqlite3.connect(str(backup_path))
+        # Copy in page batches so the live database is never locked for long
+        sqlite_online_backup(source_path, backup_path)
         
-        try:
-            source_conn.backup(backup_conn)
-        finally:
-            source_conn.close()
-            backup_conn.close()
-        
-        # Compress if requested
-        if compress:
-            compressed_path = self.backup_dir / f"{backup_name}.db.gz"
-            with open(backup_path, 'rb') as f_in:
-                with gzip.open(compressed_path, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
-            
-            # Remove uncompressed version
-            backup_path.unlink()
-            final_path = compressed_path
-        else:
-            final_path = backup_path
+        if not compress:
+            return {
+                'file_path': backup_path,
+                'file_size': backup_path.stat().st_size,
+                'hash': self._calculate_file_hash(backup_path)
+            }
+        
+        # Compress and hash in one pass, then remove uncompressed version
+        compressed_path = self.backup_dir / f"{backup_name}.db.gz"
+        with open(backup_path, 'rb') as f_in:
+            file_size, file_hash = stream_to_file(f_in, compressed_path)
+        backup_path.unlink()
         
         return {
-            'file_path': final_path,
-            'file_size': final_path.stat().st_size,
-            'hash': self._calculate_file_hash(final_path)
+            'file_path': compressed_path,
+            'file_size': file_size,
+            'hash': file_hash
         }
     
     def _backup_postgresql(self, db_info: Dict, backup_name: str, compress: bool) -> Dict:
@@ -181,30 +175,14 @@ class DatabaseBackupManager:
         env = os.environ.copy()
         env['PGPASSWORD'] = db_info['password']
         
-        # Execute pg_dump
-        with open(backup_path, 'w') as f:
-            result = subprocess.run(cmd, stdout=f, stderr=subprocess.PIPE, 
-                                  env=env, text=True)
-        
-        if result.returncode != 0:
-            raise Exception(f"pg_dump failed: {result.stderr}")
-        
-        # Compress if requested
-        if compress:
-            compressed_path = self.backup_dir / f"{backup_name}.sql.gz"
-            with open(backup_path, 'rb') as f_in:
-                with gzip.open(compressed_path, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
-            
-            backup_path.unlink()
-            final_path = compressed_path
-        else:
-            final_path = backup_path
+        # Stream pg_dump output to disk, compressing and hashing on the way
+        final_path = backup_path.with_suffix('.sql.gz') if compress else backup_path
+        file_size, file_hash = dump_to_file(cmd, final_path, compress, env=env)
         
         return {
             'file_path': final_path,
-            'file_size': final_path.stat().st_size,
-            'hash': self._calculate_file_hash(final_path)
+            'file_size': file_size,
+            'hash': file_hash
         }
     
     def _backup_mysql(self, db_info: Dict, backup_name: str, compress: bool) -> Dict:
@@ -225,29 +203,14 @@ class DatabaseBackupManager:
             db_info['database']
         ]
         
-        # Execute mysqldump
-        with open(backup_path, 'w') as f:
-            result = subprocess.run(cmd, stdout=f, stderr=subprocess.PIPE, text=True)
-        
-        if result.returncode != 0:
-            raise Exception(f"mysqldump failed: {result.stderr}")
-        
-        # Compress if requested
-        if compress:
-            compressed_path = self.backup_dir / f"{backup_name}.sql.gz"
-            with open(backup_path, 'rb') as f_in:
-                with gzip.open(compressed_path, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
-            
-            backup_path.unlink()
-            final_path = compressed_path
-        else:
-            final_path = backup_path
+        # Stream mysqldump output to disk, compressing and hashing on the way
+        final_path = backup_path.with_suffix('.sql.gz') if compress else backup_path
+        file_size, file_hash = dump_to_file(cmd, final_path, compress)
         
         return {
             'file_path': final_path,
-            'file_size': final_path.stat().st_size,
-            'hash': self._calculate_file_hash(final_path)
+            'file_size': file_size,
+            'hash': file_hash
         }
     
     def restore_backup(self, backup_name: str, confirm: bool = False) -> Dict:
@@ -502,13 +465,7 @@ class DatabaseBackupManager:
     
     def _calculate_file_hash(self, file_path: Path) -> str:
         """Calculate SHA-256 hash of file."""
-        import hashlib
-        
-        hash_sha256 = hashlib.sha256()
-        with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_sha256.update(chunk)
-        return hash_sha256.hexdigest()
+        return file_checksum(file_path)
     
     def _verify_backup_integrity(self, backup_file: Path, expected_hash: Optional[str]) -> bool:
         """Verify backup file integrity."""
@@ -4,20 +4,29 @@ SQLite to PostgreSQL Migration Script
 
 This script safely migrates data from SQLite development database to PostgreSQL production database.
 It handles data export, schema creation, and data import with validation.
+Tables are streamed in chunks with COPY, independent tables in parallel, and
+progress is checkpointed in PostgreSQL so an interrupted run can be resumed
+by running the script again.
 
 Usage:
     python scripts/migrate_to_postgresql.py [--backup-only] [--validate-only]
+                                            [--chunk-size N] [--workers N]
     
 Options:
     --backup-only    Only create backup, don't migrate
     --validate-only  Only validate the migration, don't make changes
+    --chunk-size     Rows per COPY batch and checkpoint (default 10000)
+    --workers        Tables copied in parallel (default 4)
 """
 
+import io
 import os
 import sys
 import json
+import time
 import sqlite3
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from pathlib import Path
 import subprocess
@@ -34,11 +43,66 @@ class Colors:
     BOLD = '\033[1m'
     END = '\033[0m'
 
+# Copied in rowid order, this many rows per COPY and checkpoint
+DEFAULT_CHUNK_SIZE = 10000
+DEFAULT_WORKERS = 4
+CHECKPOINT_TABLE = 'sqlite_migration_checkpoints'
+SKIPPED_TABLES = {'alembic_version'}
+
+
+def dependency_levels(tables, foreign_keys):
+    """Group tables so each level only references tables in earlier levels."""
+    parents = {table: set() for table in tables}
+    for child, parent in foreign_keys:
+        if child in parents and parent in parents and parent != child:
+            parents[child].add(parent)
+    
+    levels = []
+    loaded = set()
+    pending = set(tables)
+    while pending:
+        level = sorted(table for table in pending if parents[table] <= loaded)
+        if not level:
+            # Circular references: load the rest together
+            level = sorted(pending)
+        levels.append(level)
+        loaded.update(level)
+        pending.difference_update(level)
+    return levels
+
+
+def _csv_field(value, data_type):
+    # Unquoted empty is NULL to COPY; everything else is quoted or numeric
+    if value is None:
+        return ''
+    if data_type == 'boolean':
+        value = 't' if value in (1, '1', True, 't', 'true', 'True') else 'f'
+    elif data_type == 'bytea':
+        value = '\\x' + (value.encode('utf-8') if isinstance(value, str) else bytes(value)).hex()
+    elif isinstance(value, (int, float)):
+        return repr(value)
+    elif isinstance(value, bytes):
+        value = value.decode('utf-8')
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def csv_chunk(rows, data_types):
+    """CSV buffer for COPY ... FROM STDIN from (rowid, *values) rows."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(','.join(_csv_field(value, data_type) for value, data_type in zip(row[1:], data_types)))
+        buffer.write('\n')
+    buffer.seek(0)
+    return buffer
+
+
 class DatabaseMigrator:
     """Handles SQLite to PostgreSQL migration."""
     
-    def __init__(self):
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, workers=DEFAULT_WORKERS):
         self.project_root = project_root
+        self.chunk_size = chunk_size
+        self.workers = workers
         self.backup_dir = self.project_root / 'backups'
         self.backup_dir.mkdir(exist_ok=True)
         
@@ -137,7 +201,7 @@ class DatabaseMigrator:
             return None
     
     def export_data_to_json(self, json_path):
-        """Export all data to JSON format."""
+        """Export all data to JSON format, streaming rows table by table."""
         try:
             conn = sqlite3.connect(str(self.sqlite_path))
             conn.row_factory = sqlite3.Row  # Enable column access by name
@@ -147,26 +211,30 @@ class DatabaseMigrator:
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
             tables = [table[0] for table in cursor.fetchall()]
             
-            export_data = {
-                'export_timestamp': datetime.now(timezone.utc).isoformat(),
-                'source_database': str(self.sqlite_path),
-                'tables': {}
-            }
-            
-            for table in tables:
-                cursor.execute(f"SELECT * FROM {table}")
-                rows = cursor.fetchall()
+            with open(json_path, 'w') as f:
+                f.write('{\n')
+                f.write(f'  "export_timestamp": {json.dumps(datetime.now(timezone.utc).isoformat())},\n')
+                f.write(f'  "source_database": {json.dumps(str(self.sqlite_path))},\n')
+                f.write('  "tables": {')
+                
+                for table_index, table in enumerate(tables):
+                    f.write(f'{"," if table_index else ""}\n    {json.dumps(table)}: [')
+                    cursor.execute(f'SELECT * FROM "{table}"')
+                    count = 0
+                    while True:
+                        rows = cursor.fetchmany(self.chunk_size)
+                        if not rows:
+                            break
+                        for row in rows:
+                            f.write(f'{"," if count else ""}\n      {json.dumps(dict(row), default=str)}')
+                            count += 1
+                    f.write('\n    ]')
+                    self.log_success(f"Exported {count} records from table '{table}'")
                 
-                # Convert rows to dictionaries
-                export_data['tables'][table] = [dict(row) for row in rows]
-                self.log_success(f"Exported {len(rows)} records from table '{table}'")
+                f.write('\n  }\n}\n')
             
             conn.close()
             
-            # Write JSON file
-            with open(json_path, 'w') as f:
-                json.dump(export_data, f, indent=2, default=str)
-            
             self.log_success(f"JSON backup created: {json_path.name}")
             return True
             
@@ -264,244 +332,187 @@ class DatabaseMigrator:
             return False
     
     def migrate_data(self):
-        """Migrate data from SQLite to PostgreSQL."""
+        """Stream every table from SQLite into PostgreSQL with COPY."""
         self.log_info("Migrating data from SQLite to PostgreSQL...")
         
         try:
-            # Load Flask app to get models
-            os.environ['FLASK_ENV'] = 'production'
-            from app import create_app
-            from app.models import db, User, SavedMealPlan, UsageLog, ErrorLog, Payment
+            import psycopg2
             
-            app = create_app('production')
+            database_url = os.environ['DATABASE_URL']
+            sqlite_conn = sqlite3.connect(str(self.sqlite_path))
+            pg_conn = psycopg2.connect(database_url)
             
-            with app.app_context():
-                # Connect to SQLite
-                sqlite_conn = sqlite3.connect(str(self.sqlite_path))
-                sqlite_conn.row_factory = sqlite3.Row
-                sqlite_cursor = sqlite_conn.cursor()
-                
-                # Migration order (respecting foreign key dependencies)
-                migration_tasks = [
-                    ('users', User, self.migrate_users),
-                    ('saved_meal_plans', SavedMealPlan, self.migrate_saved_meal_plans),
-                    ('usage_logs', UsageLog, self.migrate_usage_logs),
-                    ('error_logs', ErrorLog, self.migrate_error_logs),
-                    ('payments', Payment, self.migrate_payments)
-                ]
+            try:
+                source_tables = {
+                    row[0] for row in sqlite_conn.execute(
+                        "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'"
+                    )
+                } - SKIPPED_TABLES
+                target_columns = self.postgresql_columns(pg_conn)
                 
-                for table_name, model_class, migration_func in migration_tasks:
-                    try:
-                        # Check if table exists in SQLite
-                        sqlite_cursor.execute(
-                            "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
-                            (table_name,)
-                        )
-                        
-                        if sqlite_cursor.fetchone():
-                            count = migration_func(sqlite_cursor, model_class, db)
-                            if count is not None:
-                                self.log_success(f"Migrated {count} records from {table_name}")
-                            else:
-                                self.log_warning(f"Migration of {table_name} had issues")
-                        else:
-                            self.log_info(f"Table {table_name} not found in SQLite, skipping")
-                            
-                    except Exception as e:
-                        self.log_error(f"Failed to migrate {table_name}: {e}")
+                tables = {}
+                for table in sorted(source_tables):
+                    if table not in target_columns:
+                        self.log_warning(f"Table {table} has no PostgreSQL counterpart, skipping")
+                        continue
+                    source_columns = {row[1] for row in sqlite_conn.execute(f'PRAGMA table_info("{table}")')}
+                    dropped = source_columns - set(target_columns[table])
+                    if dropped:
+                        self.log_warning(f"Columns missing in PostgreSQL {table}: {', '.join(sorted(dropped))}")
+                    tables[table] = [(column, data_type) for column, data_type in target_columns[table].items()
+                                     if column in source_columns]
                 
+                self.ensure_checkpoint_table(pg_conn)
+                levels = dependency_levels(tables, self.postgresql_foreign_keys(pg_conn))
+            finally:
                 sqlite_conn.close()
-                
-            self.log_success("Data migration completed")
+                pg_conn.close()
+            
+            started = time.perf_counter()
+            total_rows = 0
+            failed = False
+            # Tables in one level only reference earlier levels, so they load side by side
+            for level in levels:
+                with ThreadPoolExecutor(max_workers=min(self.workers, len(level))) as executor:
+                    futures = {executor.submit(self.copy_table, table, tables[table]): table for table in level}
+                    for future in as_completed(futures):
+                        table = futures[future]
+                        try:
+                            copied, elapsed = future.result()
+                        except Exception as e:
+                            self.log_error(f"Failed to migrate {table}: {e}")
+                            failed = True
+                            continue
+                        total_rows += copied
+                        rate = copied / elapsed if elapsed else 0
+                        self.log_success(f"Migrated {copied} records from {table} ({rate:,.0f} rows/s)")
+                if failed:
+                    # Later levels reference this one; rerun to resume from the checkpoints
+                    return False
+            
+            self.reset_sequences(database_url, tables)
+            
+            elapsed = time.perf_counter() - started
+            rate = total_rows / elapsed if elapsed else 0
+            self.log_success(f"Data migration completed: {total_rows} records in {elapsed:.1f}s ({rate:,.0f} rows/s)")
             return True
             
         except Exception as e:
             self.log_error(f"Data migration failed: {e}")
             return False
     
-    def migrate_users(self, sqlite_cursor, User, db):
-        """Migrate users table."""
-        sqlite_cursor.execute("SELECT * FROM users")
-        users = sqlite_cursor.fetchall()
-        
-        migrated_count = 0
-        for user_row in users:
-            try:
-                user = User(
-                    email=user_row['email'],
-                    full_name=user_row['full_name'],
-                    password_hash=user_row['password_hash'],
-                    is_active=user_row['is_active'],
-                    email_verified=user_row.get('email_verified', False),
-                    subscription_tier=user_row.get('subscription_tier', 'free'),
-                    subscription_status=user_row.get('subscription_status', 'active'),
-                    credits_balance=user_row.get('credits_balance', 3),
-                    created_at=datetime.fromisoformat(user_row['created_at']) if user_row.get('created_at') else datetime.now(timezone.utc),
-                    last_login=datetime.fromisoformat(user_row['last_login']) if user_row.get('last_login') else None
-                )
-                
-                db.session.add(user)
-                migrated_count += 1
-                
-            except Exception as e:
-                self.log_warning(f"Failed to migrate user {user_row.get('email', 'unknown')}: {e}")
-        
-        try:
-            db.session.commit()
-            return migrated_count
-        except Exception as e:
-            db.session.rollback()
-            self.log_error(f"Failed to commit users: {e}")
-            return None
+    def postgresql_columns(self, pg_conn):
+        """Columns and data types of every table in the target schema."""
+        columns = {}
+        with pg_conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT table_name, column_name, data_type FROM information_schema.columns "
+                "WHERE table_schema = current_schema() ORDER BY table_name, ordinal_position"
+            )
+            for table, column, data_type in cursor.fetchall():
+                columns.setdefault(table, {})[column] = data_type
+        return columns
     
-    def migrate_saved_meal_plans(self, sqlite_cursor, SavedMealPlan, db):
-        """Migrate saved meal plans."""
-        sqlite_cursor.execute("SELECT * FROM saved_meal_plans")
-        plans = sqlite_cursor.fetchall()
-        
-        migrated_count = 0
-        for plan_row in plans:
-            try:
-                # Parse JSON meal plan data
-                meal_plan_data = json.loads(plan_row['meal_plan_data']) if plan_row.get('meal_plan_data') else {}
-                
-                plan = SavedMealPlan(
-                    user_id=plan_row['user_id'],
-                    name=plan_row['name'],
-                    meal_plan_data=meal_plan_data,
-                    total_calories=plan_row.get('total_calories'),
-                    diet_type=plan_row.get('diet_type'),
-                    days=plan_row.get('days', 1),
-                    created_at=datetime.fromisoformat(plan_row['created_at']) if plan_row.get('created_at') else datetime.now(timezone.utc)
-                )
-                
-                db.session.add(plan)
-                migrated_count += 1
-                
-            except Exception as e:
-                self.log_warning(f"Failed to migrate meal plan {plan_row.get('id', 'unknown')}: {e}")
-        
-        try:
-            db.session.commit()
-            return migrated_count
-        except Exception as e:
-            db.session.rollback()
-            self.log_error(f"Failed to commit meal plans: {e}")
-            return None
+    def postgresql_foreign_keys(self, pg_conn):
+        """(child, parent) pairs for every foreign key in the target schema."""
+        with pg_conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT c.relname, p.relname FROM pg_constraint f "
+                "JOIN pg_class c ON c.oid = f.conrelid JOIN pg_class p ON p.oid = f.confrelid "
+                "WHERE f.contype = 'f'"
+            )
+            return cursor.fetchall()
     
-    def migrate_usage_logs(self, sqlite_cursor, UsageLog, db):
-        """Migrate usage logs."""
-        sqlite_cursor.execute("SELECT * FROM usage_logs")
-        logs = sqlite_cursor.fetchall()
-        
-        migrated_count = 0
-        for log_row in logs:
-            try:
-                # Parse JSON metadata
-                metadata = json.loads(log_row['metadata']) if log_row.get('metadata') else {}
-                
-                log = UsageLog(
-                    user_id=log_row.get('user_id'),
-                    action=log_row['action'],
-                    resource_type=log_row.get('resource_type'),
-                    resource_id=log_row.get('resource_id'),
-                    metadata=metadata,
-                    ip_address=log_row.get('ip_address'),
-                    user_agent=log_row.get('user_agent'),
-                    endpoint=log_row.get('endpoint'),
-                    method=log_row.get('method'),
-                    created_at=datetime.fromisoformat(log_row['created_at']) if log_row.get('created_at') else datetime.now(timezone.utc)
-                )
-                
-                db.session.add(log)
-                migrated_count += 1
-                
-            except Exception as e:
-                self.log_warning(f"Failed to migrate usage log {log_row.get('id', 'unknown')}: {e}")
-        
-        try:
-            db.session.commit()
-            return migrated_count
-        except Exception as e:
-            db.session.rollback()
-            self.log_error(f"Failed to commit usage logs: {e}")
-            return None
+    def ensure_checkpoint_table(self, pg_conn):
+        """Create the table recording how far each copy has got."""
+        with pg_conn.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} ("
+                "table_name TEXT PRIMARY KEY, last_rowid BIGINT NOT NULL, rows_copied BIGINT NOT NULL, "
+                "completed BOOLEAN NOT NULL DEFAULT FALSE, updated_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+            )
+        pg_conn.commit()
     
-    def migrate_error_logs(self, sqlite_cursor, ErrorLog, db):
-        """Migrate error logs."""
-        try:
-            sqlite_cursor.execute("SELECT * FROM error_logs")
-            logs = sqlite_cursor.fetchall()
-        except:
-            # Table might not exist in older schemas
-            return 0
+    def copy_table(self, table, columns):
+        """Copy one table in rowid order, committing a checkpoint with every chunk.
         
-        migrated_count = 0
-        for log_row in logs:
-            try:
-                log = ErrorLog(
-                    error_id=log_row['error_id'],
-                    error_type=log_row['error_type'],
-                    error_message=log_row['error_message'],
-                    traceback=log_row.get('traceback'),
-                    severity=log_row['severity'],
-                    context=log_row.get('context'),
-                    request_info=log_row.get('request_info'),
-                    user_id=log_row.get('user_id'),
-                    resolved=log_row.get('resolved', False),
-                    counter=log_row.get('counter', 1),
-                    created_at=datetime.fromisoformat(log_row['created_at']) if log_row.get('created_at') else datetime.now(timezone.utc)
-                )
-                
-                db.session.add(log)
-                migrated_count += 1
-                
-            except Exception as e:
-                self.log_warning(f"Failed to migrate error log {log_row.get('error_id', 'unknown')}: {e}")
+        Returns (rows copied, seconds). Each call uses its own connections so
+        tables can be copied from worker threads.
+        """
+        import psycopg2
         
-        try:
-            db.session.commit()
-            return migrated_count
-        except Exception as e:
-            db.session.rollback()
-            self.log_error(f"Failed to commit error logs: {e}")
-            return None
-    
-    def migrate_payments(self, sqlite_cursor, Payment, db):
-        """Migrate payments."""
-        try:
-            sqlite_cursor.execute("SELECT * FROM payments")
-            payments = sqlite_cursor.fetchall()
-        except:
-            # Table might not exist
-            return 0
+        started = time.perf_counter()
+        sqlite_conn = sqlite3.connect(str(self.sqlite_path))
+        pg_conn = psycopg2.connect(os.environ['DATABASE_URL'])
         
-        migrated_count = 0
-        for payment_row in payments:
-            try:
-                payment = Payment(
-                    user_id=payment_row['user_id'],
-                    stripe_payment_intent_id=payment_row.get('stripe_payment_intent_id'),
-                    amount=payment_row['amount'],
-                    currency=payment_row.get('currency', 'usd'),
-                    status=payment_row['status'],
-                    description=payment_row.get('description'),
-                    created_at=datetime.fromisoformat(payment_row['created_at']) if payment_row.get('created_at') else datetime.now(timezone.utc)
+        try:
+            with pg_conn.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT last_rowid, rows_copied, completed FROM {CHECKPOINT_TABLE} WHERE table_name = %s",
+                    (table,)
                 )
-                
-                db.session.add(payment)
-                migrated_count += 1
-                
-            except Exception as e:
-                self.log_warning(f"Failed to migrate payment {payment_row.get('id', 'unknown')}: {e}")
+                last_rowid, copied, completed = cursor.fetchone() or (0, 0, False)
+            if completed:
+                self.log_info(f"Table {table} already migrated, skipping")
+                return 0, 0.0
+            if copied:
+                self.log_info(f"Resuming {table} after {copied} records")
+            
+            names = ', '.join(f'"{column}"' for column, _ in columns)
+            data_types = [data_type for _, data_type in columns]
+            select = f'SELECT rowid, {names} FROM "{table}" WHERE rowid > ? ORDER BY rowid LIMIT ?'
+            copy = f'COPY "{table}" ({names}) FROM STDIN WITH (FORMAT csv)'
+            checkpoint = (
+                f"INSERT INTO {CHECKPOINT_TABLE} (table_name, last_rowid, rows_copied, completed, updated_at) "
+                "VALUES (%s, %s, %s, %s, now()) ON CONFLICT (table_name) DO UPDATE SET "
+                "last_rowid = EXCLUDED.last_rowid, rows_copied = EXCLUDED.rows_copied, "
+                "completed = EXCLUDED.completed, updated_at = now()"
+            )
+            
+            resumed_from = copied
+            while True:
+                # Keyset reads keep memory at one chunk however large the table is
+                rows = sqlite_conn.execute(select, (last_rowid, self.chunk_size)).fetchall()
+                done = len(rows) < self.chunk_size
+                with pg_conn.cursor() as cursor:
+                    if rows:
+                        cursor.copy_expert(copy, csv_chunk(rows, data_types))
+                        last_rowid = rows[-1][0]
+                        copied += len(rows)
+                    cursor.execute(checkpoint, (table, last_rowid, copied, done))
+                pg_conn.commit()
+                if done:
+                    break
+            
+            return copied - resumed_from, time.perf_counter() - started
+            
+        except Exception:
+            pg_conn.rollback()
+            raise
+        finally:
+            sqlite_conn.close()
+            pg_conn.close()
+    
+    def reset_sequences(self, database_url, tables):
+        """Move serial sequences past the copied ids."""
+        import psycopg2
         
+        pg_conn = psycopg2.connect(database_url)
         try:
-            db.session.commit()
-            return migrated_count
-        except Exception as e:
-            db.session.rollback()
-            self.log_error(f"Failed to commit payments: {e}")
-            return None
+            with pg_conn.cursor() as cursor:
+                for table, columns in tables.items():
+                    if 'id' not in dict(columns):
+                        continue
+                    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", (f'"{table}"',))
+                    sequence = cursor.fetchone()[0]
+                    if sequence:
+                        cursor.execute(
+                            f'SELECT setval(%s, COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) FROM "{table}"',
+                            (sequence,)
+                        )
+            pg_conn.commit()
+        finally:
+            pg_conn.close()
     
     def validate_migration(self):
         """Validate the migration was successful."""
@@ -602,10 +613,14 @@ def main():
                        help='Only create backup, don\'t migrate')
     parser.add_argument('--validate-only', action='store_true',
                        help='Only validate connections, don\'t migrate')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                       help='Rows per COPY batch and checkpoint')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                       help='Tables copied in parallel')
     
     args = parser.parse_args()
     
-    migrator = DatabaseMigrator()
+    migrator = DatabaseMigrator(chunk_size=args.chunk_size, workers=args.workers)
     success = migrator.run_migration(
         backup_only=args.backup_only,
         validate_only=args.validate_only
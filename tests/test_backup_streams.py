@@ -0,0 +1,92 @@
+"""Tests for the streaming backup helpers."""
+
+import gzip
+import io
+import os
+import sqlite3
+import sys
+import tarfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+import backup_streams
+from backup_streams import dump_to_file, file_checksum, sqlite_online_backup, stream_to_file, tar_directory
+
+
+class TestStreamToFile:
+    """Test inline compression and hashing."""
+
+    def test_checksum_matches_written_file(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(backup_streams.shutil, 'which', lambda name: None)
+        payload = b'INSERT INTO users VALUES (1);\n' * 10000
+        dest = tmp_path / 'dump.sql.gz'
+
+        size, checksum = stream_to_file(io.BytesIO(payload), dest)
+
+        assert size == dest.stat().st_size
+        assert checksum == file_checksum(dest)
+        assert gzip.decompress(dest.read_bytes()) == payload
+
+    def test_failed_dump_raises_and_removes_file(self, tmp_path):
+        dest = tmp_path / 'dump.sql'
+
+        with pytest.raises(RuntimeError):
+            dump_to_file([sys.executable, '-c', 'import sys; sys.exit(3)'], dest, compress=False)
+
+        assert not dest.exists()
+
+
+    def test_failed_compressor_removes_partial_file(self, tmp_path, monkeypatch):
+        pigz = tmp_path / 'pigz'
+        pigz.write_text('#!/bin/sh\ncat > /dev/null\necho partial\nexit 1\n')
+        pigz.chmod(0o755)
+        monkeypatch.setattr(backup_streams.shutil, 'which', lambda name: str(pigz))
+        source = tmp_path / 'dump.sql'
+        source.write_bytes(b'INSERT INTO users VALUES (1);\n' * 1000)
+        dest = tmp_path / 'dump.sql.gz'
+
+        with open(source, 'rb') as f, pytest.raises(RuntimeError):
+            stream_to_file(f, dest)
+
+        assert not dest.exists()
+
+
+class TestTarDirectory:
+    """Test packing directory-format dumps."""
+
+    def test_tar_checksum_and_contents(self, tmp_path):
+        dump_dir = tmp_path / 'backup_database'
+        dump_dir.mkdir()
+        (dump_dir / 'toc.dat').write_bytes(b'toc')
+        (dump_dir / '3001.dat.gz').write_bytes(gzip.compress(b'rows'))
+        dest = tmp_path / 'backup_database.tar'
+
+        size, checksum = tar_directory(dump_dir, dest)
+
+        assert size == dest.stat().st_size
+        assert checksum == file_checksum(dest)
+        with tarfile.open(dest) as tar:
+            assert sorted(tar.getnames()) == ['backup_database', 'backup_database/3001.dat.gz',
+                                              'backup_database/toc.dat']
+
+
+class TestSqliteOnlineBackup:
+    """Test page-batched SQLite backups."""
+
+    def test_copies_in_page_batches(self, tmp_path):
+        source = tmp_path / 'source.db'
+        conn = sqlite3.connect(str(source))
+        conn.execute('CREATE TABLE logs (id INTEGER PRIMARY KEY, body TEXT)')
+        conn.executemany('INSERT INTO logs (body) VALUES (?)', [('x' * 500,) for _ in range(2000)])
+        conn.commit()
+        conn.close()
+        steps = []
+
+        sqlite_online_backup(source, tmp_path / 'copy.db', pages=16,
+                             progress=lambda status, remaining, total: steps.append(remaining))
+
+        assert len(steps) > 1
+        copy = sqlite3.connect(str(tmp_path / 'copy.db'))
+        assert copy.execute('SELECT COUNT(*) FROM logs').fetchone()[0] == 2000
+        copy.close()
@@ -0,0 +1,45 @@
+"""Tests for the scheduled cache warm-up."""
+
+from unittest.mock import patch
+
+from app.extensions import db, cache
+from app.models import SavedMealPlan
+from app.services.cache_warmer import cache_warmer, WARM_LOCK_KEY
+from app.routes.admin import DASHBOARD_STATS_KEY, ANALYTICS_SNAPSHOT_KEY
+from app.utils.caching import tiered_cache
+
+
+class TestCacheWarmer:
+    """Test warm-up tasks and their scheduling across workers."""
+
+    def test_run_once_fills_shared_caches(self, app, test_user):
+        db.session.add(SavedMealPlan(user_id=test_user.id, name='Public', meal_plan_data={'days': []},
+                                     is_public=True))
+        db.session.commit()
+
+        results = cache_warmer.run_once(force=True)
+
+        assert all('error' not in result for result in results.values())
+        assert [plan['name'] for plan in tiered_cache.get('public:recent_plans')] == ['Public']
+        assert tiered_cache.get(DASHBOARD_STATS_KEY)['value']['total_users'] == 1
+        assert tiered_cache.get(ANALYTICS_SNAPSHOT_KEY)['value']['summary']['total_users'] == 1
+        assert tiered_cache.get('stats:user_count') == 1
+
+    def test_shared_tasks_skipped_when_another_worker_warmed(self, app):
+        cache.set(WARM_LOCK_KEY, 1)
+
+        local_task = {'func': lambda: None, 'shared': False}
+        with patch.dict(cache_warmer._tasks, {'local': local_task}):
+            results = cache_warmer.run_once()
+
+        assert list(results) == ['local']
+
+    def test_failing_task_does_not_stop_others(self, app):
+        def broken():
+            raise RuntimeError('boom')
+
+        with patch.dict(cache_warmer._tasks, {'broken': {'func': broken, 'shared': False}}):
+            results = cache_warmer.run_once(force=True)
+
+        assert results['broken'] == {'error': 'boom'}
+        assert 'seconds' in results['public_plans']
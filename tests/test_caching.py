@@ -0,0 +1,273 @@
+"""Tests for cache utilities."""
+
+import threading
+import time
+
+import pytest
+from flask import jsonify
+
+from app.extensions import db, cache
+from app.models import SavedMealPlan
+from app.utils.compression import COMPACT_MIMETYPE
+from app.utils.caching import (
+    tagged_key, invalidate_tags, invalidate_user_cache, user_tag, plan_tag, TAG_VERSION_PREFIX,
+    get_or_compute, LOCK_PREFIX, LocalCache, tiered_cache, cached_route, get_cache_stats
+)
+
+
+class TestTaggedKeys:
+    """Test generation counters folded into cache keys."""
+
+    def test_invalidating_tag_orphans_entries(self, app):
+        key = tagged_key('dashboard', [user_tag(1)])
+        cache.set(key, 'stats')
+
+        invalidate_tags(user_tag(1))
+
+        new_key = tagged_key('dashboard', [user_tag(1)])
+        assert new_key != key
+        assert cache.get(new_key) is None
+
+    def test_other_tags_unaffected(self, app):
+        key = tagged_key('dashboard', [user_tag(2)])
+        invalidate_user_cache(1)
+        assert tagged_key('dashboard', [user_tag(2)]) == key
+
+    def test_entry_depends_on_every_tag(self, app):
+        key = tagged_key('plan_page', [user_tag(1), plan_tag(7)])
+        invalidate_tags(plan_tag(7))
+        assert tagged_key('plan_page', [user_tag(1), plan_tag(7)]) != key
+
+    def test_lost_counter_does_not_revive_old_generation(self, app):
+        first = tagged_key('dashboard', [user_tag(3)])
+        cache.delete(f"{TAG_VERSION_PREFIX}{user_tag(3)}")
+        invalidate_user_cache(3)
+        assert tagged_key('dashboard', [user_tag(3)]) != first
+
+
+class TestUserPlanListCache:
+    """Test the cached saved-plan list is invalidated on writes."""
+
+    def _plan_names(self, client):
+        return [p['name'] for p in client.get('/api/load-meal-plans').get_json()['meal_plans']]
+
+    def test_list_reflects_save_and_delete(self, app, auth_client, test_user):
+        assert self._plan_names(auth_client) == []
+
+        response = auth_client.post('/api/save-meal-plan', json={
+            'name': 'Week One', 'meal_plan': {'days': [{'day': 1, 'meals': []}]}
+        })
+        # Served by main_bp, which shadows the api blueprint's route
+        plan_id = response.get_json()['meal_plan_id']
+        assert self._plan_names(auth_client) == ['Week One']
+
+        auth_client.delete(f'/api/delete-meal-plan/{plan_id}')
+        assert self._plan_names(auth_client) == []
+
+    def test_plan_load_cached_until_plan_changes(self, app, auth_client, test_user):
+        plan_id = auth_client.post('/api/save-meal-plan', json={
+            'name': 'Week One', 'meal_plan': {'days': []}
+        }).get_json()['meal_plan_id']
+        assert auth_client.get(f'/api/load-meal-plan/{plan_id}').get_json()['name'] == 'Week One'
+
+        # Renamed behind the app's back, so the cached body is still served
+        db.session.get(SavedMealPlan, plan_id).name = 'Renamed'
+        db.session.commit()
+        assert auth_client.get(f'/api/load-meal-plan/{plan_id}').get_json()['name'] == 'Week One'
+
+        auth_client.delete(f'/api/delete-meal-plan/{plan_id}')
+        assert auth_client.get(f'/api/load-meal-plan/{plan_id}').status_code == 404
+
+    def test_plan_load_cached_per_representation(self, app, auth_client, test_user):
+        plan_id = auth_client.post('/api/save-meal-plan', json={
+            'name': 'Week One', 'meal_plan': {'days': []}
+        }).get_json()['meal_plan_id']
+
+        compact = auth_client.get(f'/api/load-meal-plan/{plan_id}?encoding=compact')
+        assert compact.mimetype == COMPACT_MIMETYPE
+
+        for _ in range(2):
+            plain = auth_client.get(f'/api/load-meal-plan/{plan_id}')
+            assert plain.mimetype == 'application/json'
+            assert 'Accept' in plain.vary
+
+    def test_list_served_from_cache(self, app, auth_client, test_user):
+        self._plan_names(auth_client)
+
+        # Written behind the app's back, so the cached list is still served
+        db.session.add(SavedMealPlan(user_id=test_user.id, name='Direct', meal_plan_data={'days': []}))
+        db.session.commit()
+        assert self._plan_names(auth_client) == []
+
+        invalidate_user_cache(test_user.id)
+        assert self._plan_names(auth_client) == ['Direct']
+
+
+class TestGetOrCompute:
+    """Test single-flight recompute and stale-while-revalidate."""
+
+    def test_concurrent_misses_compute_once(self, app):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'value'
+
+        def worker(results):
+            with app.app_context():
+                results.append(get_or_compute('stampede', compute, timeout=60))
+
+        results = []
+        threads = [threading.Thread(target=worker, args=(results,)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == ['value'] * 5
+
+    def test_stale_value_served_while_refresh_in_flight(self, app):
+        get_or_compute('swr', lambda: 'old', timeout=60)
+        entry = tiered_cache.get('swr')
+        entry['expires_at'] = time.time() - 1
+        tiered_cache.set('swr', entry)
+        cache.add(f"{LOCK_PREFIX}swr", 1)
+
+        assert get_or_compute('swr', lambda: 'new', timeout=60) == 'old'
+
+    def test_expired_value_refreshed_when_unlocked(self, app):
+        get_or_compute('refresh', lambda: 'old', timeout=60)
+        entry = tiered_cache.get('refresh')
+        entry['expires_at'] = time.time() - 1
+        tiered_cache.set('refresh', entry)
+
+        assert get_or_compute('refresh', lambda: 'new', timeout=60) == 'new'
+        assert cache.get(f"{LOCK_PREFIX}refresh") is None
+
+    def test_refresh_claims_released(self, app):
+        from app.utils.caching import _refreshing
+
+        for user_id in range(20):
+            get_or_compute(f"user_data:{user_id}", lambda: user_id, timeout=60)
+        assert not _refreshing
+
+    def test_cache_if_rejects_value(self, app):
+        get_or_compute('rejected', lambda: 'error', cache_if=lambda value: value != 'error')
+        assert cache.get('rejected') is None
+
+
+class TestLocalCache:
+    """Test the bounded in-process LRU."""
+
+    def test_evicts_least_recently_used(self):
+        l1 = LocalCache(max_entries=2, ttl=30)
+        l1.set('a', 1)
+        l1.set('b', 2)
+        l1.get('a')
+        l1.set('c', 3)
+
+        assert l1.get('b') is None
+        assert l1.get('a') == 1
+        assert l1.evictions == 1
+
+    def test_entries_expire(self):
+        l1 = LocalCache(ttl=30)
+        l1.set('a', 1, timeout=0.01)
+        time.sleep(0.02)
+        assert l1.get('a') is None
+
+
+class TestTieredCache:
+    """Test L1 reads in front of the shared backend."""
+
+    def test_second_read_served_from_l1(self, app):
+        cache.set('pricing', {'pro': 999})
+
+        assert tiered_cache.get('pricing') == {'pro': 999}
+        cache.delete('pricing')
+        assert tiered_cache.get('pricing') == {'pro': 999}
+
+        stats = tiered_cache.get_stats()
+        assert stats['l1_hits'] == 1
+        assert stats['l2_hits'] == 1
+
+    def test_stats_per_namespace(self, app):
+        tiered_cache.set('public:recent_plans', [{'id': 1}])
+        tiered_cache.get('public:recent_plans')
+        tiered_cache.get('public:missing')
+
+        stats = get_cache_stats()['namespaces']['public']
+        assert stats['l1_hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['sets'] == 1
+        assert stats['hit_rate'] == 0.5
+        assert sum(stats['latency_ms'].values()) == 2
+        assert stats['l1_bytes'] > 0
+
+    def test_epoch_bump_flushes_l1(self, app):
+        tiered_cache.set('pricing', {'pro': 999})
+        cache.delete('pricing')
+
+        tiered_cache.flush_local()
+        assert tiered_cache.get('pricing') is None
+
+
+class TestCachedRoute:
+    """Test serialized route caching with ETags."""
+
+    @pytest.fixture
+    def counted_client(self, app):
+        calls = []
+
+        @app.route('/_test/cached')
+        @cached_route(timeout=60)
+        def cached_view():
+            calls.append(1)
+            return jsonify({'value': len(calls)})
+
+        return app.test_client(), calls
+
+    def test_body_cached_with_etag(self, counted_client):
+        client, calls = counted_client
+
+        first = client.get('/_test/cached')
+        second = client.get('/_test/cached')
+
+        assert len(calls) == 1
+        assert first.get_json() == second.get_json() == {'value': 1}
+        assert first.headers['ETag'] == second.headers['ETag']
+        assert second.headers['Content-Type'] == 'application/json'
+
+    def test_if_none_match_returns_304_without_view(self, counted_client):
+        client, calls = counted_client
+        etag = client.get('/_test/cached').headers['ETag']
+
+        response = client.get('/_test/cached', headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.data == b''
+        assert len(calls) == 1
+
+    def test_compressed_etag_revalidates(self, app):
+        calls = []
+
+        @app.route('/_test/cached-large')
+        @cached_route(timeout=60)
+        def cached_large_view():
+            calls.append(1)
+            return jsonify({'items': ['x' * 32] * 100})
+
+        client = app.test_client()
+        first = client.get('/_test/cached-large', headers={'Accept-Encoding': 'gzip'})
+        assert first.headers['Content-Encoding'] == 'gzip'
+        assert first.headers['ETag'].endswith('-gzip"')
+
+        response = client.get('/_test/cached-large', headers={
+            'Accept-Encoding': 'gzip', 'If-None-Match': first.headers['ETag']
+        })
+
+        assert response.status_code == 304
+        assert response.headers['ETag'] == first.headers['ETag']
+        assert len(calls) == 1
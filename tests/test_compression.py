@@ -0,0 +1,106 @@
+"""Tests for response compression and compact JSON encoding."""
+
+import gzip
+import json
+import pytest
+from datetime import datetime
+from flask import jsonify
+
+from app.utils.compression import (
+    compact_encode, compact_decode, json_response, COMPACT_ENCODING, pack_plan, unpack_plan
+)
+
+
+@pytest.fixture
+def plan():
+    """Large meal plan with repeated ingredient names."""
+    meal = {
+        'name': 'Oatmeal Bowl',
+        'calories': 400,
+        'ingredients': ['1 cup Rolled Oats', '1/2 cup Blueberries', {'item': 'almond_milk', 'amount': 240}]
+    }
+    return {'days': [{'day': d, 'meals': [dict(meal) for _ in range(3)]} for d in range(1, 31)]}
+
+
+class TestCompactEncoding:
+    """Test dictionary encoding of ingredient names."""
+
+    def test_round_trip(self, plan):
+        encoded = compact_encode(plan)
+        assert encoded['encoding'] == COMPACT_ENCODING
+        assert compact_decode(encoded) == plan
+
+    def test_repeated_names_stored_once(self, plan):
+        encoded = compact_encode(plan)
+        assert len(encoded['strings']) == 3
+        assert encoded['data']['days'][0]['meals'][0]['ingredients'][:2] == [0, 1]
+        assert len(json.dumps(encoded)) < len(json.dumps(plan))
+
+    def test_non_ingredient_strings_untouched(self, plan):
+        encoded = compact_encode(plan)
+        assert encoded['data']['days'][0]['meals'][0]['name'] == 'Oatmeal Bowl'
+
+
+class TestPlanPacking:
+    """Test binary storage encoding of meal plans."""
+
+    def test_round_trip(self, plan):
+        assert unpack_plan(pack_plan(plan)) == plan
+
+    def test_packed_much_smaller_than_json(self, plan):
+        assert len(pack_plan(plan)) * 10 < len(json.dumps(plan))
+
+    def test_unknown_codec_rejected(self):
+        with pytest.raises(ValueError):
+            unpack_plan(b'?garbage')
+
+
+class TestResponseCompression:
+    """Test content negotiation in the after_request hook."""
+
+    def _register(self, app, plan):
+        @app.route('/_test/plan')
+        def test_plan():
+            return json_response({'meal_plan': plan})
+
+        @app.route('/_test/small')
+        def test_small():
+            return jsonify({'ok': True})
+
+    def test_gzip_when_accepted(self, app, client, plan):
+        self._register(app, plan)
+        response = client.get('/_test/plan', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        body = json.loads(gzip.decompress(response.data))
+        assert body['meal_plan'] == plan
+
+    def test_identity_without_accept_encoding(self, app, client, plan):
+        self._register(app, plan)
+        response = client.get('/_test/plan')
+
+        assert 'Content-Encoding' not in response.headers
+        assert response.get_json()['meal_plan'] == plan
+
+    def test_small_payload_not_compressed(self, app, client, plan):
+        self._register(app, plan)
+        response = client.get('/_test/small', headers={'Accept-Encoding': 'gzip'})
+
+        assert 'Content-Encoding' not in response.headers
+
+    def test_compact_encoding_opt_in(self, app, client, plan):
+        self._register(app, plan)
+        response = client.get('/_test/plan?encoding=compact')
+
+        body = json.loads(response.data)
+        assert body['encoding'] == COMPACT_ENCODING
+        assert compact_decode(body) == {'meal_plan': plan}
+
+
+class TestFastJSONProvider:
+    """Test the JSON provider keeps Flask's output format."""
+
+    def test_datetime_matches_default_provider(self, app):
+        value = {'at': datetime(2025, 1, 2, 3, 4, 5)}
+        assert json.loads(app.json.dumps(value)) == {'at': 'Thu, 02 Jan 2025 03:04:05 GMT'}
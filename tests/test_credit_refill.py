@@ -0,0 +1,41 @@
+"""Tests for the set-based monthly credit refill."""
+
+from app.extensions import db
+from app.models import User, CreditRefillBatch
+from app.services.credit_refill import refill_free_credits
+
+
+def add_users(*rows):
+    users = [User(email=f'refill{i}@example.com', subscription_tier=tier, credits_balance=balance)
+             for i, (tier, balance) in enumerate(rows)]
+    for user in users:
+        user.set_password('testpassword123')
+    db.session.add_all(users)
+    db.session.commit()
+    return [user.id for user in users]
+
+
+class TestCreditRefill:
+    """Test refill batches, audit rows and per-period idempotency."""
+
+    def test_only_free_users_below_allowance_refilled(self, app):
+        ids = add_users(('free', 0), ('free', 2), ('free', 5), ('pro', 0), ('free', 1))
+
+        assert refill_free_credits(period='2026-10', credits=3, batch_size=2) == 3
+
+        balances = dict(db.session.query(User.id, User.credits_balance))
+        assert [balances[user_id] for user_id in ids] == [3, 3, 5, 0, 3]
+        batches = CreditRefillBatch.query.filter_by(period='2026-10').all()
+        assert sum(batch.users_refilled for batch in batches) == 3
+        assert all(batch.last_user_id - batch.first_user_id == 1 for batch in batches)
+
+    def test_rerun_in_same_period_is_noop(self, app):
+        ids = add_users(('free', 0), ('free', 0))
+        refill_free_credits(period='2026-10', credits=3, batch_size=10)
+
+        User.query.filter(User.id == ids[0]).update({User.credits_balance: 0})
+        db.session.commit()
+
+        assert refill_free_credits(period='2026-10', credits=3, batch_size=10) == 0
+        assert db.session.get(User, ids[0]).credits_balance == 0
+        assert refill_free_credits(period='2026-11', credits=3, batch_size=10) == 1
@@ -0,0 +1,84 @@
+"""Tests for atomic credit deduction."""
+
+import pytest
+from flask import g, jsonify
+from flask_login import login_user
+
+from app.extensions import db
+from app.models import User
+from app.services.credits import deduct_credits, refund_credits
+from app.utils.decorators import check_credits_or_premium
+
+
+def balance_of(user_id):
+    return db.session.query(User.credits_balance).filter(User.id == user_id).scalar()
+
+
+class TestDeductCredits:
+    """Test the conditional decrement."""
+
+    def test_deducts_and_updates_loaded_user(self, app, test_user):
+        assert deduct_credits(test_user.id, 4) == 6
+        db.session.commit()
+
+        assert balance_of(test_user.id) == 6
+        assert test_user.credits_balance == 6
+
+    def test_insufficient_balance_is_untouched(self, app, test_user):
+        assert deduct_credits(test_user.id, 11) is None
+        assert deduct_credits(test_user.id, 10) == 0
+        assert deduct_credits(test_user.id, 1) is None
+        db.session.commit()
+
+        assert balance_of(test_user.id) == 0
+
+    def test_refund(self, app, test_user):
+        deduct_credits(test_user.id, 3)
+        assert refund_credits(test_user.id, 3) == 10
+
+
+class TestCheckCreditsOrPremium:
+    """Test the reserve-then-refund decorator."""
+
+    def test_credit_reserved_for_successful_view(self, app, test_user):
+        @check_credits_or_premium
+        def view():
+            return jsonify({'reserved': g.credits_reserved})
+
+        with app.test_request_context('/'):
+            login_user(test_user)
+            response = view()
+
+        assert response.json['reserved'] == 1
+        assert balance_of(test_user.id) == 9
+
+    def test_credit_refunded_when_view_fails(self, app, test_user):
+        @check_credits_or_premium
+        def failing():
+            return jsonify({'error': 'failed'}), 500
+
+        @check_credits_or_premium
+        def raising():
+            raise RuntimeError('boom')
+
+        with app.test_request_context('/'):
+            login_user(test_user)
+            assert failing().status_code == 500
+            with pytest.raises(RuntimeError):
+                raising()
+
+        assert balance_of(test_user.id) == 10
+
+    def test_empty_balance_rejected(self, app, test_user):
+        test_user.credits_balance = 0
+        db.session.commit()
+
+        @check_credits_or_premium
+        def view():
+            return jsonify({})
+
+        with app.test_request_context('/'):
+            login_user(test_user)
+            response, status = view()
+
+        assert status == 402
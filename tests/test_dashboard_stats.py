@@ -0,0 +1,48 @@
+"""Tests for the aggregate dashboard statistics."""
+
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models import SavedMealPlan, UsageLog
+from app.routes.main import query_user_aggregates, calculate_weekly_streak
+
+
+class TestUserAggregates:
+    """Test SQL aggregation of dashboard stats."""
+
+    def test_plan_totals(self, app, test_user):
+        db.session.add_all([
+            SavedMealPlan(user_id=test_user.id, name='A', meal_plan_data={}, days=7, total_calories=2000),
+            SavedMealPlan(user_id=test_user.id, name='B', meal_plan_data={}, days=None, total_calories=None),
+        ])
+        db.session.commit()
+
+        aggregates = query_user_aggregates(test_user.id)
+
+        assert aggregates['total_plans'] == 2
+        assert aggregates['total_days'] == 8
+        assert aggregates['total_calories'] == 2000
+
+    def test_active_weeks_are_mondays(self, app, test_user):
+        now = datetime.now()
+        monday = (now - timedelta(days=now.weekday())).replace(hour=12)
+        for created_at in [monday, monday + timedelta(days=2), monday - timedelta(days=7)]:
+            db.session.add(UsageLog(user_id=test_user.id, action='meal_generation', created_at=created_at))
+        db.session.add(UsageLog(user_id=test_user.id, action='pdf_export'))
+        db.session.commit()
+
+        aggregates = query_user_aggregates(test_user.id)
+
+        assert aggregates['active_weeks'] == [
+            monday.date().isoformat(), (monday - timedelta(days=7)).date().isoformat()
+        ]
+        assert aggregates['pdfs_generated'] == 1
+        assert calculate_weekly_streak(aggregates['active_weeks']) == 2
+
+    def test_streak_broken_by_gap(self):
+        today = datetime.now().date()
+        monday = today - timedelta(days=today.weekday())
+        weeks = [monday.isoformat(), (monday - timedelta(days=14)).isoformat()]
+
+        assert calculate_weekly_streak(weeks) == 1
+        assert calculate_weekly_streak([]) == 0
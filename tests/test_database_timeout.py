@@ -0,0 +1,71 @@
+"""Tests for server-side per-statement database timeouts."""
+
+import threading
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy import text
+
+from app.extensions import db
+from app.utils.database_timeout import (
+    database_timeout, statement_timeouts, DatabaseOperation, StatementTimeoutError
+)
+
+
+RUNAWAY_QUERY = text(
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT count(*) FROM c"
+)
+
+
+class TestStatementTimeouts:
+    """Test statement cancellation and budget selection."""
+
+    def test_runaway_statement_is_cancelled(self, app):
+        with pytest.raises(StatementTimeoutError):
+            with database_timeout(0.05):
+                db.session.execute(RUNAWAY_QUERY).scalar()
+        db.session.rollback()
+
+        # The connection is usable afterwards
+        assert db.session.execute(text('SELECT 1')).scalar() == 1
+
+    def test_timeout_applies_outside_main_thread(self, app):
+        errors = []
+
+        def worker():
+            with app.app_context():
+                try:
+                    with database_timeout(0.05):
+                        db.session.execute(RUNAWAY_QUERY).scalar()
+                except StatementTimeoutError as e:
+                    errors.append(e)
+                finally:
+                    db.session.remove()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join(10)
+
+        assert not thread.is_alive()
+        assert len(errors) == 1
+
+    def test_budget_follows_endpoint_class(self, app):
+        budgets = app.config['DB_STATEMENT_TIMEOUTS']
+
+        with app.test_request_context('/admin/analytics'):
+            assert statement_timeouts.current_ms() == budgets['admin']
+
+        with app.test_request_context('/'):
+            assert statement_timeouts.current_ms() == budgets['interactive']
+
+        assert statement_timeouts.current_ms() == budgets['batch']
+
+        with database_timeout(budget='admin'):
+            assert statement_timeouts.current_ms() == budgets['admin']
+
+    def test_statement_timeouts_are_not_retried(self, app):
+        operation = MagicMock(side_effect=lambda: db.session.execute(RUNAWAY_QUERY).scalar())
+
+        with pytest.raises(StatementTimeoutError):
+            DatabaseOperation(timeout_seconds=0.05, retry_delay=0).execute_with_retry(operation)
+
+        assert operation.call_count == 1
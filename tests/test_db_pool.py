@@ -0,0 +1,72 @@
+"""Tests for connection pool sizing and instrumentation."""
+
+import sqlite3
+import pytest
+from flask import Flask
+from sqlalchemy.exc import TimeoutError
+
+from app.utils.db_pool import (
+    pool_size_for, configure_engine_options, InstrumentedQueuePool, pool_stats
+)
+
+
+class TestPoolSizing:
+    """Test engine options derived from worker and thread counts."""
+
+    def test_pool_fits_connection_budget(self):
+        config = {'DB_POOL_WORKERS': 4, 'DB_POOL_THREADS': 8, 'DB_POOL_BACKGROUND_CONNECTIONS': 2,
+                  'DB_MAX_CONNECTIONS': 100, 'DB_RESERVED_CONNECTIONS': 10}
+
+        pool_size, max_overflow = pool_size_for(config)
+
+        assert pool_size == 10
+        assert max_overflow == 10
+        assert (pool_size + max_overflow) * 4 <= 90
+
+    def test_pool_capped_when_workers_exceed_budget(self):
+        config = {'DB_POOL_WORKERS': 16, 'DB_POOL_THREADS': 8, 'DB_MAX_CONNECTIONS': 50,
+                  'DB_RESERVED_CONNECTIONS': 2}
+
+        assert pool_size_for(config) == (3, 0)
+
+    def test_postgres_options_use_instrumented_pool(self):
+        app = Flask(__name__)
+        app.config.update(SQLALCHEMY_DATABASE_URI='postgresql://db/cibozer',
+                          SQLALCHEMY_ENGINE_OPTIONS={'pool_timeout': 5})
+
+        options = configure_engine_options(app)
+
+        assert options['poolclass'] is InstrumentedQueuePool
+        assert options['pool_timeout'] == 5
+        assert app.config['SQLALCHEMY_ENGINE_OPTIONS'] is options
+
+    def test_memory_sqlite_left_alone(self):
+        app = Flask(__name__)
+        app.config.update(SQLALCHEMY_DATABASE_URI='sqlite:///:memory:', SQLALCHEMY_ENGINE_OPTIONS={})
+
+        assert configure_engine_options(app) == {}
+
+
+class TestPoolInstrumentation:
+    """Test checkout, overflow and timeout accounting."""
+
+    def test_checkouts_and_timeouts_are_counted(self):
+        pool_stats.reset()
+        pool = InstrumentedQueuePool(lambda: sqlite3.connect(':memory:'), pool_size=1, max_overflow=1,
+                                     timeout=0.05)
+
+        first = pool.connect()
+        second = pool.connect()
+        with pytest.raises(TimeoutError):
+            pool.connect()
+
+        stats = pool_stats.snapshot(pool)
+        assert stats['checkouts'] == 2
+        assert stats['overflow_checkouts'] == 1
+        assert stats['timeouts'] == 1
+        assert stats['waiting'] == 0
+        assert stats['checked_out'] == 2
+        assert sum(stats['checkout_wait_ms'].values()) == 2
+
+        first.close()
+        second.close()
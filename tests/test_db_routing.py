@@ -0,0 +1,125 @@
+"""Tests for read replica routing."""
+
+import time
+
+import pytest
+from flask import session
+from sqlalchemy import event, text
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.utils.database_timeout import statement_timeouts
+from app.utils.db_routing import STICKY_SESSION_KEY, read_replica, read_replicas
+from app.utils.query_profiler import query_profiler
+from config.testing import TestingConfig
+
+
+def _replica_app(tmp_path, replica_url):
+    class ReplicaConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'primary.db'}"
+        SQLALCHEMY_REPLICA_URLS = [replica_url]
+        DB_REPLICA_READ_ENDPOINTS = ['main.index']
+
+    return create_app(ReplicaConfig)
+
+
+def _add_user(email):
+    user = User(email=email, full_name='Routing Test')
+    user.set_password('testpassword123')
+    db.session.add(user)
+    return user
+
+
+@pytest.fixture
+def replica_app(tmp_path):
+    """App with a primary and one replica, each its own SQLite file."""
+    app = _replica_app(tmp_path, f"sqlite:///{tmp_path / 'replica.db'}")
+    with app.app_context():
+        db.create_all()
+        replica = read_replicas.engines()[0]
+        db.metadata.create_all(replica)
+        _add_user('primary@example.com')
+        db.session.commit()
+        # Replication is simulated by writing to the replica file directly
+        with replica.begin() as conn:
+            conn.execute(User.__table__.insert().values(
+                email='replica@example.com', password_hash='x', credits_balance=0))
+        db.session.remove()
+        yield app
+        db.session.remove()
+
+
+def _emails():
+    return {user.email for user in User.query.all()}
+
+
+class TestReadReplicaRouting:
+    """Test which engine serves each statement."""
+
+    def test_create_all_leaves_replicas_alone(self, replica_app):
+        assert set(db.metadatas) == {None}
+        assert read_replicas.engines()[0] not in db.engines.values()
+
+    def test_replicas_get_engine_hooks(self, replica_app):
+        replica = read_replicas.engines()[0]
+        assert event.contains(replica, 'before_cursor_execute', statement_timeouts._before_cursor_execute)
+        assert event.contains(replica, 'after_cursor_execute', query_profiler._after_cursor_execute)
+
+    def test_reads_default_to_primary(self, replica_app):
+        assert _emails() == {'primary@example.com'}
+
+    def test_read_replica_block_reads_from_replica(self, replica_app):
+        with read_replica():
+            assert _emails() == {'replica@example.com'}
+            # Raw SQL may write, so it stays on the primary
+            assert db.session.execute(text('SELECT COUNT(*) FROM users')).scalar() == 1
+
+    def test_session_stays_on_primary_after_write(self, replica_app):
+        with read_replica():
+            _add_user('new@example.com')
+            db.session.flush()
+            assert _emails() == {'primary@example.com', 'new@example.com'}
+
+    def test_read_endpoint_uses_replica_unless_pinned(self, replica_app):
+        router = replica_app.extensions['read_replicas']
+
+        with replica_app.test_request_context('/'):
+            router.route_request()
+            assert _emails() == {'replica@example.com'}
+        db.session.remove()
+
+        with replica_app.test_request_context('/', method='POST'):
+            router.route_request()
+            assert _emails() == {'primary@example.com'}
+        db.session.remove()
+
+        with replica_app.test_request_context('/'):
+            session[STICKY_SESSION_KEY] = float('inf')
+            router.route_request()
+            assert _emails() == {'primary@example.com'}
+        db.session.remove()
+
+    def test_write_pins_client_to_primary(self, replica_app):
+        router = replica_app.extensions['read_replicas']
+
+        with replica_app.test_request_context('/', method='POST'):
+            router.route_request()
+            _add_user('new@example.com')
+            db.session.commit()
+            router._pin_writer(replica_app.response_class())
+            assert session[STICKY_SESSION_KEY] > time.time()
+        db.session.remove()
+
+    def test_unreachable_replica_falls_back_to_primary(self, tmp_path):
+        app = _replica_app(tmp_path, f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+        with app.app_context():
+            db.create_all()
+            _add_user('primary@example.com')
+            db.session.commit()
+            db.session.remove()
+
+            with read_replica():
+                assert _emails() == {'primary@example.com'}
+            assert read_replicas.status() == {'replica_0': 'down'}
+            db.session.remove()
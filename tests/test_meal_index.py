@@ -0,0 +1,82 @@
+"""Tests for the shared meal selection index."""
+
+import itertools
+import pytest
+
+import nutrition_data as nd
+from app.core.nutrition_data import MEAL_DATABASE
+from app.services.meal_index import get_meal_index
+from app.services.meal_optimizer import MealOptimizer, build_meal_database_index
+from app.services.enhanced_meal_optimizer import EnhancedMealOptimizer
+
+
+def scan_meals(diet_type, meal_type, restrictions, cuisine):
+    """Reference implementation: the linear scan the index replaces."""
+    return [
+        meal for meal in MEAL_DATABASE
+        if (diet_type == 'standard' or diet_type in meal.get('diet_types', []))
+        and meal_type in meal.get('meal_types', [])
+        and not any(r in meal.get('contains', []) for r in restrictions)
+        and (not cuisine or cuisine == meal.get('cuisine'))
+    ]
+
+
+QUERIES = list(itertools.product(
+    ['standard', 'vegetarian', 'vegan', 'keto', 'paleo'],
+    ['breakfast', 'lunch', 'dinner', 'snack'],
+    [[], ['dairy'], ['gluten', 'eggs'], ['unknown']],
+    [None, 'american', 'mediterranean']
+))
+
+
+class TestMealIndex:
+    """Test index lookups against a full scan."""
+
+    @pytest.fixture
+    def index(self):
+        return build_meal_database_index(MEAL_DATABASE)
+
+    def test_candidates_match_scan(self, index):
+        for diet_type, meal_type, restrictions, cuisine in QUERIES:
+            expected = scan_meals(diet_type, meal_type, restrictions, cuisine)
+            found = index.candidates(diet_type, meal_type, restrictions, cuisine)
+            assert sorted(m['name'] for m in found) == sorted(m['name'] for m in expected)
+
+    @pytest.mark.parametrize('target', [0, 300, 480, 650, 5000])
+    def test_nearest_matches_sorted_scan(self, index, target):
+        for diet_type, meal_type, restrictions, cuisine in QUERIES:
+            expected = sorted(scan_meals(diet_type, meal_type, restrictions, cuisine),
+                              key=lambda m: abs(m['calories'] - target))[:5]
+            found = index.nearest(diet_type, meal_type, target, restrictions, cuisine)
+            assert len(found) == len(expected)
+            # Same calorie distances; ties at the cut-off may pick different meals
+            assert sorted(abs(m['calories'] - target) for m in found) == \
+                sorted(abs(m['calories'] - target) for m in expected)
+
+    def test_index_is_shared_between_instances(self):
+        assert MealOptimizer().index is MealOptimizer().index
+        assert MealOptimizer().index is get_meal_index(MEAL_DATABASE, build_meal_database_index)
+
+
+class TestOptimizersUseIndex:
+    """Test optimizers still honour filters when backed by the index."""
+
+    def test_restricted_meals_never_selected(self):
+        plan = MealOptimizer().generate_meal_plan(2000, 'vegetarian', days=3, restrictions=['dairy'])
+        by_name = {meal['name']: meal for meal in MEAL_DATABASE}
+        for day in plan['days']:
+            for meal in day['meals']:
+                if meal['name'] in by_name:
+                    assert 'dairy' not in by_name[meal['name']].get('contains', [])
+
+    def test_enhanced_templates_match_scan(self):
+        optimizer = EnhancedMealOptimizer()
+        for diet_type, meal_type in itertools.product(['standard', 'vegan', 'keto'],
+                                                      ['breakfast', 'lunch', 'dinner', 'snack']):
+            expected = [
+                t for t in nd.MEAL_TEMPLATES.values()
+                if t.get('meal_type') == meal_type
+                and (diet_type == 'standard' or diet_type in t.get('tags', []))
+            ]
+            found = optimizer._filter_meal_templates(diet_type, meal_type, [], None)
+            assert sorted(t['name'] for t in found) == sorted(t['name'] for t in expected)
@@ -0,0 +1,32 @@
+"""Tests for the streaming SQLite to PostgreSQL migrator helpers."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+from migrate_to_postgresql import dependency_levels, csv_chunk
+
+
+class TestDependencyLevels:
+    """Test parallel load ordering."""
+
+    def test_children_load_after_parents(self):
+        levels = dependency_levels(
+            ['users', 'payments', 'usage_logs', 'stat_counters'],
+            [('payments', 'users'), ('usage_logs', 'users'), ('users', 'users'), ('payments', 'missing')]
+        )
+
+        assert levels == [['stat_counters', 'users'], ['payments', 'usage_logs']]
+
+    def test_cycles_load_together(self):
+        assert dependency_levels(['a', 'b'], [('a', 'b'), ('b', 'a')]) == [['a', 'b']]
+
+
+class TestCsvChunk:
+    """Test COPY encoding of SQLite values."""
+
+    def test_nulls_empty_strings_and_types(self):
+        rows = [(1, None, '', 1, b'ab', 'say "hi"\nbye', 3, 1.5)]
+        types = ['text', 'text', 'boolean', 'bytea', 'json', 'integer', 'double precision']
+
+        assert csv_chunk(rows, types).getvalue() == ',"","t","\\x6162","say ""hi""\nbye",3,1.5\n'
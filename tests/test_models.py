@@ -289,4 +289,26 @@ class TestSavedMealPlan:
             assert saved_plan is not None
             assert saved_plan.name == 'Weekly Meal Plan'
             assert saved_plan.meal_plan_data['diet_type'] == 'balanced'
-            assert saved_plan.meal_plan_data['meals']['monday']['breakfast'] == 'Oatmeal'
\ No newline at end of file
+            assert saved_plan.meal_plan_data['meals']['monday']['breakfast'] == 'Oatmeal'
+    
+    def test_meal_plan_data_deferred_by_default(self, app, test_user):
+        """Listing queries should not load the plan JSON until it is accessed"""
+        from sqlalchemy import inspect
+        from sqlalchemy.orm import undefer_group
+        from app.models.meal_plan import PLAN_DATA_GROUP
+        
+        with app.app_context():
+            user_id = db.session.query(User).filter_by(email='test@example.com').first().id
+            db.session.add(SavedMealPlan(user_id=user_id, name='Deferred', meal_plan_data={'days': []}))
+            db.session.commit()
+            db.session.expunge_all()
+            
+            listed = db.session.query(SavedMealPlan).filter_by(user_id=user_id).first()
+            assert {'_meal_plan_json', 'meal_plan_blob'} <= inspect(listed).unloaded
+            assert listed.meal_plan_data == {'days': []}
+            
+            db.session.expunge_all()
+            detailed = db.session.query(SavedMealPlan).options(
+                undefer_group(PLAN_DATA_GROUP)
+            ).filter_by(user_id=user_id).first()
+            assert not {'_meal_plan_json', 'meal_plan_blob'} & inspect(detailed).unloaded
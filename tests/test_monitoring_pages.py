@@ -0,0 +1,91 @@
+"""Tests for the admin performance and security monitoring pages."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.extensions import db
+from app.models import UsageLog
+
+
+@pytest.fixture
+def admin_client(client):
+    """Client with an admin session."""
+    with client.session_transaction() as sess:
+        sess['is_admin'] = True
+    return client
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """Capture the template context instead of rendering."""
+    captured = {}
+
+    def fake_render(template, **context):
+        captured['template'] = template
+        captured.update(context)
+        return ''
+
+    monkeypatch.setattr('app.routes.admin.render_template', fake_render)
+    return captured
+
+
+def _log(user, action, operation, severity=None, response_time_ms=None, age=timedelta(minutes=5)):
+    db.session.add(UsageLog(user_id=user.id, action=action, operation=operation, severity=severity,
+                            response_time_ms=response_time_ms,
+                            created_at=datetime.now(timezone.utc) - age))
+
+
+class TestPerformanceMonitoring:
+    """Test SQL-side aggregation of slow operations."""
+
+    def test_operations_aggregated_per_type(self, app, admin_client, rendered, test_user):
+        with app.app_context():
+            for duration in (1200, 1800, 3000):
+                _log(test_user, 'slow_operation', 'generate_plan', response_time_ms=duration)
+            _log(test_user, 'slow_operation', 'export_pdf', response_time_ms=1500)
+            _log(test_user, 'slow_operation', 'generate_plan', response_time_ms=9000, age=timedelta(days=2))
+            db.session.commit()
+
+        admin_client.get('/admin/monitoring/performance')
+
+        stats = rendered['operation_stats']
+        assert stats['generate_plan']['count'] == 3
+        assert stats['generate_plan']['total_duration'] == 6000
+        assert stats['generate_plan']['avg_duration'] == 2000
+        assert stats['generate_plan']['min_duration'] == 1200
+        assert stats['generate_plan']['max_duration'] == 3000
+        assert stats['export_pdf']['count'] == 1
+        assert rendered['pagination'].total == 4
+
+    def test_drill_down_filters_by_operation(self, app, admin_client, rendered, test_user):
+        with app.app_context():
+            _log(test_user, 'slow_operation', 'generate_plan', response_time_ms=1200)
+            _log(test_user, 'slow_operation', 'export_pdf', response_time_ms=1500)
+            db.session.commit()
+
+        admin_client.get('/admin/monitoring/performance?operation=export_pdf')
+
+        assert [op.operation for op in rendered['slow_operations']] == ['export_pdf']
+        assert rendered['current_operation'] == 'export_pdf'
+
+
+class TestSecurityMonitoring:
+    """Test SQL-side grouping of security events."""
+
+    def test_events_grouped_with_recent_sample(self, app, admin_client, rendered, test_user):
+        with app.app_context():
+            for minutes in range(1, 8):
+                _log(test_user, 'security_event', 'failed_login', 'medium', age=timedelta(minutes=minutes))
+            _log(test_user, 'security_event', 'failed_login', 'high')
+            db.session.commit()
+
+        admin_client.get('/admin/monitoring/security')
+
+        stats = rendered['event_stats']
+        assert stats['failed_login_medium']['count'] == 7
+        assert len(stats['failed_login_medium']['recent_events']) == 5
+        recent = stats['failed_login_medium']['recent_events']
+        assert recent == sorted(recent, key=lambda event: event.created_at, reverse=True)
+        assert stats['failed_login_high']['count'] == 1
+        assert rendered['pagination'].total == 8
@@ -0,0 +1,113 @@
+"""Tests for the meal plan optimizer facade."""
+
+import time
+import pytest
+
+from app.middleware.graceful_degradation import graceful_degradation
+from app.services.optimizer_facade import OptimizerFacade, EngineBudgetExceeded
+
+
+PARAMS = {'target_calories': 2000, 'diet_type': 'standard', 'meals_per_day': 3}
+
+
+def plan_from(name):
+    return lambda params: {'days': [], 'engine': name}
+
+
+@pytest.fixture
+def facade():
+    facade = OptimizerFacade()
+    yield facade
+    graceful_degradation.feature_flags.pop('fallback_meal_generation', None)
+
+
+def slow(params):
+    time.sleep(0.5)
+    return {'days': [], 'engine': 'slow'}
+
+
+class TestEngineSelection:
+    """Test falling back across engines."""
+
+    def test_accurate_engine_preferred(self, facade):
+        facade.register_engine('accurate', plan_from('accurate'), cost_ms_per_day=10, budget_ms=500)
+        facade.register_engine('basic', plan_from('basic'), cost_ms_per_day=1, budget_ms=50, fallback=True)
+
+        plan, engine = facade.generate_with_engine(**PARAMS)
+        assert engine == 'accurate'
+        assert plan['engine'] == 'accurate'
+
+    def test_budget_overrun_falls_back(self, facade):
+        facade.register_engine('accurate', slow, cost_ms_per_day=10, budget_ms=50)
+        facade.register_engine('basic', plan_from('basic'), cost_ms_per_day=1, budget_ms=50, fallback=True)
+
+        started = time.monotonic()
+        plan, engine = facade.generate_with_engine(**PARAMS)
+
+        assert engine == 'basic'
+        assert time.monotonic() - started < 0.3
+
+    def test_expensive_engine_skipped_for_small_budget(self, facade):
+        calls = []
+        facade.register_engine('accurate', lambda p: calls.append(p), cost_ms_per_day=100, budget_ms=1000)
+        facade.register_engine('basic', plan_from('basic'), cost_ms_per_day=1, budget_ms=50, fallback=True)
+
+        plan, engine = facade.generate_with_engine(budget_ms=200, days=7, **PARAMS)
+        assert engine == 'basic'
+        assert calls == []
+
+    def test_engine_error_falls_back(self, facade):
+        def broken(params):
+            raise RuntimeError('solver diverged')
+
+        facade.register_engine('accurate', broken, cost_ms_per_day=10, budget_ms=500)
+        facade.register_engine('basic', plan_from('basic'), cost_ms_per_day=1, budget_ms=50, fallback=True)
+
+        assert facade.generate_with_engine(**PARAMS)[1] == 'basic'
+
+    def test_cached_result_when_all_engines_fail(self, facade):
+        results = iter([{'days': [1]}])
+
+        def flaky(params):
+            return next(results)
+
+        facade.register_engine('basic', flaky, cost_ms_per_day=1, budget_ms=50, fallback=True)
+        assert facade.generate_with_engine(**PARAMS)[1] == 'basic'
+
+        plan, engine = facade.generate_with_engine(**PARAMS)
+        assert engine == 'cache'
+        assert plan == {'days': [1]}
+
+    def test_raises_without_engine_or_cache(self, facade):
+        def broken(params):
+            raise EngineBudgetExceeded('down')
+
+        facade.register_engine('basic', broken, cost_ms_per_day=1, budget_ms=50, fallback=True)
+        with pytest.raises(EngineBudgetExceeded):
+            facade.generate(**PARAMS)
+
+
+class TestDegradationFlag:
+    """Test the facade and the graceful degradation flags stay in sync."""
+
+    def test_open_circuit_enables_fallback_generation(self, facade):
+        facade.register_engine('accurate', slow, cost_ms_per_day=10, budget_ms=20, failure_threshold=2)
+        facade.register_engine('basic', plan_from('basic'), cost_ms_per_day=1, budget_ms=50, fallback=True)
+
+        facade.generate(**PARAMS)
+        facade.generate(**PARAMS)
+
+        assert facade.engines['accurate'].breaker.state == 'open'
+        assert graceful_degradation.feature_flags['fallback_meal_generation'] is True
+
+        # Open circuit: the slow engine is not even attempted
+        started = time.monotonic()
+        assert facade.generate_with_engine(**PARAMS)[1] == 'basic'
+        assert time.monotonic() - started < 0.015
+
+    def test_external_flag_forces_fallback_engines(self, facade):
+        facade.register_engine('accurate', plan_from('accurate'), cost_ms_per_day=10, budget_ms=500)
+        facade.register_engine('basic', plan_from('basic'), cost_ms_per_day=1, budget_ms=50, fallback=True)
+        graceful_degradation._enable_fallback_meal_generation()
+
+        assert facade.generate_with_engine(**PARAMS)[1] == 'basic'
@@ -0,0 +1,130 @@
+"""Tests for the transactional outbox."""
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from app.extensions import db
+from app.models import OutboxEvent, UsageLog
+from app.services.monitoring_service import monitoring_service
+from app.services.outbox_service import OutboxService, outbox_service
+
+
+class TestOutboxDelivery:
+    """Test enqueueing and draining outbox events."""
+
+    def test_event_only_visible_after_commit(self, app, test_user):
+        """Rolled back writes must not leave events behind."""
+        outbox_service.enqueue('meal_plan_generated', {'usage_log_id': 1}, user_id=test_user.id)
+        db.session.rollback()
+
+        assert OutboxEvent.query.count() == 0
+
+    def test_first_meal_plan_sends_celebration(self, app, test_user):
+        """First generation triggers the celebration email from the worker."""
+        log = UsageLog(user_id=test_user.id, action='meal_generation')
+        db.session.add(log)
+        db.session.flush()
+        outbox_service.enqueue('meal_plan_generated', {
+            'usage_log_id': log.id, 'calories': 2000, 'diet_type': 'standard', 'days': 1
+        }, user_id=test_user.id)
+        db.session.commit()
+
+        with patch('app.services.email_service.email_service.send_first_meal_plan_celebration',
+                   return_value=True) as mock_send:
+            assert outbox_service.process_pending() == 1
+
+        mock_send.assert_called_once()
+        event = OutboxEvent.query.one()
+        assert event.status == 'done'
+        assert event.processed_at is not None
+
+    def test_repeat_generation_skips_celebration(self, app, test_user):
+        """Only the user's first generation is celebrated."""
+        first = UsageLog(user_id=test_user.id, action='meal_generation')
+        second = UsageLog(user_id=test_user.id, action='meal_generation')
+        db.session.add_all([first, second])
+        db.session.flush()
+        outbox_service.enqueue('meal_plan_generated', {'usage_log_id': second.id},
+                               user_id=test_user.id)
+        db.session.commit()
+
+        with patch('app.services.email_service.email_service.send_first_meal_plan_celebration') as mock_send:
+            outbox_service.process_pending()
+
+        mock_send.assert_not_called()
+
+    def test_failed_email_does_not_count_generation(self, app, test_user):
+        """Metrics are recorded once, by the attempt that succeeds."""
+        log = UsageLog(user_id=test_user.id, action='meal_generation')
+        db.session.add(log)
+        db.session.flush()
+        outbox_service.enqueue('meal_plan_generated', {'usage_log_id': log.id}, user_id=test_user.id)
+        db.session.commit()
+        before = monitoring_service.metrics.counters['meal_plans.generated']
+
+        with patch('app.services.email_service.email_service._enabled', True), \
+                patch('app.services.email_service.email_service.send_first_meal_plan_celebration',
+                      return_value=False):
+            outbox_service.process_pending()
+
+        assert OutboxEvent.query.one().status == 'pending'
+        assert monitoring_service.metrics.counters['meal_plans.generated'] == before
+
+        event = OutboxEvent.query.one()
+        event.available_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        with patch('app.services.email_service.email_service.send_first_meal_plan_celebration',
+                   return_value=True):
+            outbox_service.process_pending()
+
+        assert OutboxEvent.query.one().status == 'done'
+        assert monitoring_service.metrics.counters['meal_plans.generated'] == before + 1
+
+    def test_failed_handler_is_retried_with_backoff(self, app):
+        """Handler errors reschedule the event instead of dropping it."""
+        calls = []
+        service = OutboxService()
+
+        @service.register_handler('test_flaky')
+        def flaky(payload, event):
+            calls.append(event.id)
+            raise RuntimeError('smtp down')
+
+        service.enqueue('test_flaky')
+        db.session.commit()
+
+        service.process_pending()
+        event = OutboxEvent.query.one()
+        assert event.status == 'pending'
+        assert event.attempts == 1
+        assert 'smtp down' in event.last_error
+        assert event.available_at > datetime.utcnow() + timedelta(seconds=10)
+
+        # Not due yet, so nothing is attempted
+        assert service.process_pending() == 0
+        assert len(calls) == 1
+
+    def test_gives_up_after_max_attempts(self, app):
+        """Events exceeding the retry budget are marked failed."""
+        app.config['OUTBOX_MAX_ATTEMPTS'] = 1
+        service = OutboxService()
+
+        @service.register_handler('test_broken')
+        def broken(payload, event):
+            raise RuntimeError('permanent')
+
+        service.enqueue('test_broken')
+        db.session.commit()
+        service.process_pending()
+
+        assert OutboxEvent.query.one().status == 'failed'
+
+    def test_unknown_event_type_fails(self, app):
+        """Events without a handler fail immediately."""
+        outbox_service.enqueue('no_such_event')
+        db.session.commit()
+        outbox_service.process_pending()
+
+        event = OutboxEvent.query.one()
+        assert event.status == 'failed'
+        assert 'No outbox handler' in event.last_error
@@ -0,0 +1,83 @@
+"""Tests for the precomputed plan catalogue."""
+
+import pytest
+from unittest.mock import patch
+
+from app.services.plan_catalogue import PlanCatalogue
+
+
+@pytest.fixture
+def catalogue(app):
+    """Small catalogue bound to the test app."""
+    catalogue = PlanCatalogue()
+    catalogue.init_app(app)
+    catalogue.diets = ['standard']
+    catalogue.calories = [2000]
+    catalogue.pool_size = 2
+    return catalogue
+
+
+class TestPlanCatalogue:
+    """Test serving and refilling preset pools."""
+
+    def test_preset_served_from_pool(self, catalogue):
+        catalogue.warm()
+        assert catalogue.get_stats()['pooled_plans'] == 2
+
+        with patch('app.services.plan_catalogue.generate_plan') as mock_generate:
+            plan = catalogue.get(target_calories=2000, diet_type='standard', meals_per_day=3)
+
+        mock_generate.assert_not_called()
+        assert plan['days']
+        assert catalogue.stats['hits'] == 1
+        assert catalogue.get_stats()['pooled_plans'] == 1
+
+    def test_plans_are_not_reused(self, catalogue):
+        catalogue.warm()
+        first = catalogue.get(target_calories=2000, diet_type='standard', meals_per_day=3)
+        second = catalogue.get(target_calories=2000, diet_type='standard', meals_per_day=3)
+        third = catalogue.get(target_calories=2000, diet_type='standard', meals_per_day=3)
+
+        assert first is not second
+        assert third is None
+        assert catalogue.stats['misses'] == 1
+
+    @pytest.mark.parametrize('params', [
+        {'target_calories': 2000, 'diet_type': 'standard', 'meals_per_day': 3, 'days': 7},
+        {'target_calories': 2000, 'diet_type': 'standard', 'meals_per_day': 3, 'restrictions': ['nuts']},
+        {'target_calories': 2000, 'diet_type': 'standard', 'meals_per_day': 3, 'cuisine_preference': 'thai'},
+        {'target_calories': 1900, 'diet_type': 'standard', 'meals_per_day': 3},
+        {'target_calories': 2000, 'diet_type': 'keto', 'meals_per_day': 3},
+    ])
+    def test_uncommon_combinations_not_catalogued(self, catalogue, params):
+        assert catalogue.key_for(**params) is None
+        assert catalogue.get(**params) is None
+        assert catalogue.stats['uncatalogued'] == 1
+
+
+class TestGenerateMealPlanRoute:
+    """Test the endpoint uses the catalogue before generating live."""
+
+    def test_preset_request_uses_catalogue(self, auth_client):
+        cached_plan = {'days': [{'day': 1, 'meals': []}], 'variety_score': 1}
+        with patch('app.routes.main.plan_catalogue.get', return_value=cached_plan), \
+                patch('app.routes.main.generate_plan') as mock_generate:
+            response = auth_client.post('/api/generate-meal-plan', json={
+                'calories': 2000, 'diet_type': 'standard', 'meals_per_day': 3
+            })
+
+        assert response.status_code == 200
+        assert response.get_json()['meal_plan'] == cached_plan
+        mock_generate.assert_not_called()
+
+    def test_catalogue_miss_generates_live(self, auth_client):
+        live_plan = {'days': [{'day': 1, 'meals': []}]}
+        with patch('app.routes.main.plan_catalogue.get', return_value=None), \
+                patch('app.routes.main.generate_plan', return_value=live_plan) as mock_generate:
+            response = auth_client.post('/api/generate-meal-plan', json={
+                'calories': 1850, 'diet_type': 'standard', 'meals_per_day': 3
+            })
+
+        assert response.status_code == 200
+        mock_generate.assert_called_once()
+        assert mock_generate.call_args.kwargs['target_calories'] == 1850
@@ -0,0 +1,58 @@
+"""Tests for compressed meal plan storage."""
+
+from sqlalchemy import text
+
+from app.extensions import db
+from app.models import SavedMealPlan, SharedMealPlan
+from app.services.plan_storage import compress_stored_plans
+
+
+PLAN = {'days': [{'day': 1, 'meals': [{'name': 'Oats', 'ingredients': ['1 cup Rolled Oats']}]}]}
+
+
+class TestPlanStorage:
+    """Test the transparent meal_plan_data property and the backfill."""
+
+    def test_compressed_by_default(self, app, test_user):
+        plan = SavedMealPlan(user_id=test_user.id, name='Packed', meal_plan_data=PLAN)
+        db.session.add(plan)
+        db.session.commit()
+        plan_id = plan.id
+        db.session.expunge_all()
+
+        stored = db.session.get(SavedMealPlan, plan_id)
+        assert stored._meal_plan_json is None
+        assert stored.meal_plan_blob is not None
+        assert stored.meal_plan_data == PLAN
+        # SQL NULL, not the JSON literal 'null'
+        assert db.session.execute(
+            text('SELECT meal_plan_data IS NULL FROM saved_meal_plans WHERE id = :id'), {'id': plan_id}
+        ).scalar()
+
+    def test_json_format_keeps_plain_column(self, app, test_user):
+        app.config['PLAN_STORAGE_FORMAT'] = 'json'
+        plan = SavedMealPlan(user_id=test_user.id, name='Plain', meal_plan_data=PLAN)
+        db.session.add(plan)
+        db.session.commit()
+
+        assert plan.meal_plan_blob is None
+        assert plan.meal_plan_data == PLAN
+
+    def test_backfill_packs_existing_rows(self, app, test_user):
+        app.config['PLAN_STORAGE_FORMAT'] = 'json'
+        db.session.add_all([
+            SavedMealPlan(user_id=test_user.id, name=f'Plan {i}', meal_plan_data=PLAN) for i in range(5)
+        ] + [
+            SharedMealPlan(creator_id=test_user.id, share_token='token', title='Shared', meal_plan_data=PLAN)
+        ])
+        db.session.commit()
+
+        results = compress_stored_plans(batch_size=2)
+
+        assert results == {'saved_meal_plans': 5}
+        assert SavedMealPlan.query.filter(SavedMealPlan.meal_plan_blob.is_(None)).count() == 0
+        assert all(plan.meal_plan_data == PLAN for plan in SavedMealPlan.query.all())
+        assert compress_stored_plans() == {'saved_meal_plans': 0}
+
+        # Shared plans are read through the legacy model, which needs the JSON column
+        assert SharedMealPlan.query.one().meal_plan_data == PLAN
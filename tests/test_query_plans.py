@@ -0,0 +1,88 @@
+"""Query-plan regression tests for hot UsageLog and ErrorLog queries.
+
+Each query below mirrors one the application runs on every request or admin
+page view; a plan that falls back to a full table scan fails the test.
+"""
+
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import UsageLog, ErrorLog
+
+
+def query_plan(statement):
+    """Planner output for a statement on the test database."""
+    # Expanding IN parameters only exist after postcompile; inlining every
+    # bind gives a statement the planner can explain without parameters
+    compiled = statement.compile(dialect=db.engine.dialect,
+                                 compile_kwargs={'literal_binds': True, 'render_postcompile': True})
+    connection = db.session.connection()
+    if db.engine.dialect.name == 'sqlite':
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").fetchall()
+        return [row[3] for row in rows]
+    rows = connection.exec_driver_sql(f"EXPLAIN {compiled}").fetchall()
+    return [row[0] for row in rows]
+
+
+def assert_uses_index(statement, table):
+    plan = query_plan(statement)
+    full_scans = [step for step in plan
+                  if re.search(rf"\bSCAN {table}\b(?!.*USING)", step) or f"Seq Scan on {table}" in step]
+    assert not full_scans, f"Full scan of {table}: {plan}"
+
+
+@pytest.fixture
+def since():
+    return datetime.utcnow() - timedelta(hours=1)
+
+
+class TestUsageLogPlans:
+    """Hot usage_logs queries must be served by an index."""
+
+    def test_rate_limit_count(self, app, since):
+        statement = select(func.count(UsageLog.id)).where(
+            UsageLog.user_id == 1, UsageLog.action == 'meal_generation', UsageLog.created_at > since
+        )
+        assert_uses_index(statement, 'usage_logs')
+
+    def test_user_action_streak(self, app):
+        statement = select(UsageLog.created_at).where(
+            UsageLog.user_id == 1, UsageLog.action == 'meal_generation'
+        )
+        assert_uses_index(statement, 'usage_logs')
+
+    def test_admin_action_window(self, app, since):
+        statement = select(UsageLog).where(
+            UsageLog.action == 'slow_operation', UsageLog.created_at >= since
+        ).order_by(UsageLog.created_at.desc())
+        assert_uses_index(statement, 'usage_logs')
+
+    def test_slow_requests_by_action(self, app):
+        statement = select(UsageLog).where(
+            UsageLog.action == 'api_call', UsageLog.response_time_ms >= 1000
+        ).order_by(UsageLog.response_time_ms.desc())
+        assert_uses_index(statement, 'usage_logs')
+
+
+class TestErrorLogPlans:
+    """Hot error_logs queries must be served by an index."""
+
+    def test_recent_critical_errors(self, app, since):
+        statement = select(ErrorLog).where(
+            ErrorLog.severity.in_(['critical', 'fatal']), ErrorLog.created_at >= since
+        )
+        assert_uses_index(statement, 'error_logs')
+
+    def test_unresolved_count(self, app):
+        statement = select(func.count(ErrorLog.id)).where(ErrorLog.resolved == False)  # noqa: E712
+        assert_uses_index(statement, 'error_logs')
+
+    def test_admin_error_list(self, app):
+        statement = select(ErrorLog).where(
+            ErrorLog.resolved == False, ErrorLog.severity == 'error'  # noqa: E712
+        ).order_by(ErrorLog.severity.desc(), ErrorLog.counter.desc(), ErrorLog.created_at.desc()).limit(50)
+        assert_uses_index(statement, 'error_logs')
@@ -0,0 +1,53 @@
+"""Tests for the per-endpoint query profiler."""
+
+from sqlalchemy import text
+
+from app.extensions import db
+from app.utils.query_profiler import fingerprint, query_profiler, BACKGROUND_ENDPOINT
+
+
+class TestFingerprint:
+    """Test statement normalization."""
+
+    def test_literals_and_parameters_are_normalized(self):
+        assert fingerprint("SELECT * FROM users WHERE id = 42 AND email = 'a@b.c'") == \
+            fingerprint("SELECT * FROM users WHERE id = ? AND email = ?") == \
+            "SELECT * FROM users WHERE id = ? AND email = ?"
+
+    def test_in_lists_collapse(self):
+        assert fingerprint("SELECT id FROM users WHERE id IN (?, ?, ?)") == \
+            fingerprint("SELECT id FROM users WHERE id IN (%(id_1)s, %(id_2)s)")
+
+    def test_casts_are_kept(self):
+        assert fingerprint("SELECT created_at::date FROM users") == "SELECT created_at::date FROM users"
+
+
+class TestQueryProfiler:
+    """Test per-request aggregation and N+1 detection."""
+
+    def test_request_queries_merged_at_teardown(self, app):
+        query_profiler.reset()
+
+        with app.test_request_context('/') as ctx:
+            for i in range(12):
+                db.session.execute(text('SELECT :value'), {'value': i}).scalar()
+            endpoint = ctx.request.endpoint or 'unknown'
+            # Nothing is merged until the request ends
+            assert endpoint not in query_profiler.endpoints()
+
+        stats = query_profiler.endpoints()[endpoint]
+        assert stats['requests'] == 1
+        assert stats['queries'] == 12
+        assert stats['n_plus_one'] == 1
+
+        finding = query_profiler.summary()['n_plus_one'][-1]
+        assert finding['count'] == 12
+        assert finding['fingerprint'] == 'SELECT ?'
+
+    def test_queries_outside_requests_are_background(self, app):
+        query_profiler.reset()
+
+        db.session.execute(text('SELECT 1')).scalar()
+
+        assert query_profiler.endpoints()[BACKGROUND_ENDPOINT]['queries'] == 1
+        assert query_profiler.query_counts()['SELECT'] == 1
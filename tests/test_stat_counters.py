@@ -0,0 +1,58 @@
+"""Tests for tracked admin counters."""
+
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models import SavedMealPlan, StatCounter
+from app.routes.admin import compute_dashboard_stats
+
+
+class TestStatCounters:
+    """Test counters maintained alongside the counted rows."""
+
+    def test_saved_plans_counted_on_insert_and_delete(self, app, test_user):
+        plans = [SavedMealPlan(user_id=test_user.id, name=f'Plan {i}', meal_plan_data={'days': []})
+                 for i in range(3)]
+        db.session.add_all(plans)
+        db.session.commit()
+        assert StatCounter.values()['saved_plans'] == 3
+
+        db.session.delete(plans[0])
+        db.session.commit()
+        assert StatCounter.values()['saved_plans'] == 2
+
+    def test_rolled_back_insert_is_not_counted(self, app, test_user):
+        db.session.add(SavedMealPlan(user_id=test_user.id, name='Draft', meal_plan_data={'days': []}))
+        db.session.flush()
+        db.session.rollback()
+
+        assert StatCounter.values().get('saved_plans', 0) == 0
+
+    def test_dashboard_stats_read_counters(self, app):
+        StatCounter.increment('videos', 4)
+        db.session.commit()
+
+        stats = compute_dashboard_stats()
+
+        assert stats['total_videos'] == 4
+        assert stats['total_plans'] == 0
+        assert stats['computed_at']
+
+    def test_increment_is_a_single_upsert(self, app):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            StatCounter.increment('videos', 2)
+            StatCounter.increment('videos', 3)
+            db.session.commit()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        upserts = [sql for sql in statements if 'stat_counters' in sql]
+        assert len(upserts) == 2
+        assert all('ON CONFLICT' in sql for sql in upserts)
+        assert StatCounter.values()['videos'] == 5
@@ -0,0 +1,76 @@
+"""Tests for daily usage rollups and raw usage log retention."""
+
+from datetime import datetime, date, timedelta
+
+from app.extensions import db
+from app.models import UsageLog, UsageDailyRollup
+from app.services.usage_rollup import usage_rollup
+
+
+def add_log(user, action, days_ago, credits=0):
+    db.session.add(UsageLog(
+        user_id=user.id,
+        action=action,
+        credits_used=credits,
+        created_at=datetime.combine(date.today() - timedelta(days=days_ago), datetime.min.time()) + timedelta(hours=12)
+    ))
+
+
+class TestUsageRollup:
+    """Test rollup totals, incremental reruns and retention."""
+
+    def test_rollup_groups_by_day_action_and_tier(self, app, test_user):
+        add_log(test_user, 'meal_generation', 1, credits=1)
+        add_log(test_user, 'meal_generation', 1, credits=1)
+        add_log(test_user, 'pdf_export', 1)
+        add_log(test_user, 'meal_generation', 0, credits=1)
+        db.session.commit()
+
+        assert usage_rollup.rollup() == 3
+
+        yesterday = UsageDailyRollup.query.filter_by(
+            day=date.today() - timedelta(days=1), action='meal_generation'
+        ).one()
+        assert yesterday.tier == 'free'
+        assert yesterday.event_count == 2
+        assert yesterday.unique_users == 1
+        assert yesterday.credits_used == 2
+
+    def test_rerun_recomputes_latest_day_only(self, app, test_user):
+        add_log(test_user, 'meal_generation', 1)
+        add_log(test_user, 'meal_generation', 0)
+        db.session.commit()
+        usage_rollup.rollup()
+
+        add_log(test_user, 'meal_generation', 0)
+        db.session.commit()
+        usage_rollup.rollup()
+
+        counts = {r.day: r.event_count for r in UsageDailyRollup.query.all()}
+        assert counts == {date.today() - timedelta(days=1): 1, date.today(): 2}
+
+    def test_retention_keeps_rows_that_are_not_rolled_up(self, app, test_user):
+        app.config['USAGE_LOG_RETENTION_DAYS'] = 30
+        add_log(test_user, 'meal_generation', 40)
+        db.session.commit()
+
+        # Nothing rolled up yet, so nothing may be dropped
+        assert usage_rollup.apply_retention() == 0
+
+        usage_rollup.rollup()
+        add_log(test_user, 'meal_generation', 0)
+        db.session.commit()
+        usage_rollup.rollup()
+
+        assert usage_rollup.apply_retention() == 1
+        assert UsageLog.query.count() == 1
+        assert UsageDailyRollup.query.filter_by(day=date.today() - timedelta(days=40)).one().event_count == 1
+
+    def test_retention_off_by_default(self, app, test_user):
+        assert app.config['USAGE_LOG_RETENTION_DAYS'] == 0
+        add_log(test_user, 'meal_generation', 400)
+        db.session.commit()
+        usage_rollup.rollup()
+
+        assert usage_rollup.apply_retention() == 0
+        assert UsageLog.query.count() == 1